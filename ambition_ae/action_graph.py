@@ -0,0 +1,88 @@
+from django.core.exceptions import ImproperlyConfigured
+from edc_action_item import site_action_items
+from types import MappingProxyType
+
+from .action_rules import ActionRuleTable
+
+
+class ActionGraph:
+
+    """A frozen graph of the registered action classes, resolved
+    once so the AE actions look up their next actions by name or by
+    reference model in O(1) instead of through `site_action_items`.
+
+    Built and validated by `AppConfig.ready`, once the action items
+    imported by the models are registered. `validate` raises
+    ImproperlyConfigured if a next-action rule targets an action
+    that is not registered.
+
+    A reference model not in the graph, for example the offschedule
+    model of an action registered after `ready`, is looked up in
+    `site_action_items`.
+    """
+
+    def __init__(self, registry=None):
+        self.registry = registry
+        self.built = False
+        self.actions = MappingProxyType({})
+        self.by_model = MappingProxyType({})
+        self.edges = MappingProxyType({})
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(actions={len(self.actions)})'
+
+    def build(self):
+        actions = dict(self.registry.registry)
+        by_model = {}
+        for action_cls in actions.values():
+            by_model.setdefault(action_cls.reference_model, action_cls)
+        edges = {}
+        for name, action_cls in actions.items():
+            rules = getattr(action_cls, 'next_action_rules', None)
+            if isinstance(rules, ActionRuleTable):
+                edges[name] = rules.action_names
+        self.actions = MappingProxyType(actions)
+        self.by_model = MappingProxyType(by_model)
+        self.edges = MappingProxyType(edges)
+        self.built = True
+        return self
+
+    @property
+    def missing(self):
+        """Returns a list of (action name, target action name) for
+        each next-action rule target that is not registered.
+        """
+        return [(name, target) for name, targets in self.edges.items()
+                for target in targets if target not in self.actions]
+
+    def validate(self):
+        missing = self.missing
+        if missing:
+            raise ImproperlyConfigured(
+                'Next action is not registered. Did you register the Action? '
+                f'Got {", ".join(f"{name} -> {target}" for name, target in missing)}.')
+
+    def get(self, name=None):
+        """Returns an action class.
+        """
+        if not self.built:
+            self.build()
+        try:
+            return self.actions[name]
+        except KeyError:
+            raise ImproperlyConfigured(
+                f'Action is not registered. Got {name}. See {repr(self)}.')
+
+    def get_by_model(self, model=None):
+        """Returns the action class linked to this reference model
+        or None.
+        """
+        if not self.built:
+            self.build()
+        try:
+            return self.by_model[model]
+        except KeyError:
+            return self.registry.get_by_model(model=model)
+
+
+action_graph = ActionGraph(registry=site_action_items)
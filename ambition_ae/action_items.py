@@ -1,15 +1,20 @@
 from ambition_prn.action_items import DEATH_REPORT_ACTION
 from edc_action_item import Action, HIGH_PRIORITY, site_action_items
+from edc_constants.choices import YES_NO, YES_NO_UNKNOWN
 from edc_constants.constants import YES, DEAD, LOST_TO_FOLLOWUP, CLOSED
 from edc_reportable import GRADE3
-from edc_visit_schedule.models.subject_schedule_history import SubjectScheduleHistory
-from edc_visit_schedule.site_visit_schedules import site_visit_schedules
 
 from django.core.exceptions import MultipleObjectsReturned
+from django.utils.functional import cached_property
 from django.utils.safestring import mark_safe
 
+from .action_graph import action_graph
+from .action_rules import ActionRule, ActionRuleTable
+from .choices import AE_GRADE, AE_GRADE_SIMPLE, AE_OUTCOME, SAE_REASONS
 from .constants import GRADE4, GRADE5
 from .email_contacts import email_contacts
+from .instrumentation import instrument_next_actions, time_action_hook
+from .offschedule_action_cache import offschedule_action_cache
 
 
 AE_FOLLOWUP_ACTION = 'submit-ae-followup-report'
@@ -17,8 +22,97 @@ AE_INITIAL_ACTION = 'submit-initial-ae-report'
 AE_TMG_ACTION = 'submit-ae-tmg-report'
 RECURRENCE_OF_SYMPTOMS_ACTION = 'submit-recurrence-of-symptoms'
 
+# branches of the action cascade, see `ActionRule`
+G4_BRANCH = 'g4'
+G5_DEATH_BRANCH = 'g5_death'
+SAE_G3_BRANCH = 'sae_g3'
+RECURRENCE_BRANCH = 'recurrence'
+LTFU_BRANCH = 'ltfu'
 
-class BaseNonAeInitialAction(Action):
+
+class NextActionRulesMixin:
+
+    """A mixin for actions whose next actions are declared in
+    an `ActionRuleTable`.
+    """
+
+    next_action_rules = None
+
+    def get_next_action_names(self):
+        return self.next_action_rules.get_action_names(self.model_obj)
+
+    def append_next_actions_from_rules(self, next_actions=None, action_names=None):
+        """Returns next actions with the action classes of the rules
+        that fired for this model instance appended.
+
+        The NEW action items of the actions of the rules that did not
+        fire are deleted, as `append_to_next_if_required` would for
+        an action that is not required, so that a resave that changes
+        the outcome of the rules does not leave stale action items.
+        """
+        next_actions = next_actions or []
+        if action_names is None:
+            action_names = self.get_next_action_names()
+        for action_name in self.next_action_rules.action_names:
+            action_cls = action_graph.get(action_name)
+            if action_name in action_names:
+                next_actions = self.append_to_next_if_required(
+                    next_actions=next_actions, action_cls=action_cls)
+            else:
+                self.delete_if_new(action_cls=action_cls)
+        return next_actions
+
+
+class TimedActionMixin:
+
+    """A mixin that times the hooks of the action cascade into the
+    latency histograms by action name and branch, see
+    `Instrumentation`.
+
+    The branch is the branches of the next-action rules that fire
+    for the model instance, joined by '+', or 'none'.
+
+    The hooks in `timed_hooks` overridden by a subclass are timed
+    too, without a decorator, see `__init_subclass__`.
+    """
+
+    next_action_rules = None
+    timed_hooks = (
+        'append_to_next_if_required', 'delete_if_new', 'close_action_item_on_save')
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for hook in cls.timed_hooks:
+            method = cls.__dict__.get(hook)
+            if method and getattr(method, 'timed_hook', None) != hook:
+                setattr(cls, hook, time_action_hook(hook)(method))
+
+    @cached_property
+    def branch(self):
+        model_obj = getattr(self, 'model_obj', None)
+        if model_obj is None:
+            return None
+        branches = []
+        if self.next_action_rules:
+            branches.extend(self.next_action_rules.get_branches(model_obj))
+        if getattr(model_obj, 'outcome', None) == LOST_TO_FOLLOWUP:
+            branches.append(LTFU_BRANCH)
+        return '+'.join(branches) or None
+
+    @time_action_hook('append_to_next_if_required')
+    def append_to_next_if_required(self, *args, **kwargs):
+        return super().append_to_next_if_required(*args, **kwargs)
+
+    @time_action_hook('delete_if_new')
+    def delete_if_new(self, *args, **kwargs):
+        return super().delete_if_new(*args, **kwargs)
+
+    @time_action_hook('close_action_item_on_save')
+    def close_action_item_on_save(self, *args, **kwargs):
+        return super().close_action_item_on_save(*args, **kwargs)
+
+
+class BaseNonAeInitialAction(TimedActionMixin, Action):
 
     parent_model_fk_attr = 'ae_initial'
     show_link_to_changelist = True
@@ -41,6 +135,7 @@ class AeTmgAction(BaseNonAeInitialAction):
         self.delete_if_new(action_cls=self)
         return self.model_obj.report_status == CLOSED
 
+    @instrument_next_actions
     def get_next_actions(self):
         next_actions = []
         try:
@@ -55,7 +150,7 @@ class AeTmgAction(BaseNonAeInitialAction):
         return next_actions
 
 
-class AeFollowupAction(BaseNonAeInitialAction):
+class AeFollowupAction(NextActionRulesMixin, BaseNonAeInitialAction):
     name = AE_FOLLOWUP_ACTION
     display_name = 'Submit AE Followup Report'
     model = 'ambition_ae.aefollowup'
@@ -67,50 +162,40 @@ class AeFollowupAction(BaseNonAeInitialAction):
         f'{email_contacts.get("ae_reports")}">'
         f'{email_contacts.get("ae_reports")}</a>')
 
+    next_action_rules = ActionRuleTable(
+        fields=(
+            ('followup', YES_NO),
+            ('ae_grade', AE_GRADE_SIMPLE),
+            ('outcome', AE_OUTCOME)),
+        rules=(
+            # add next AE followup
+            ActionRule(AE_FOLLOWUP_ACTION, when=dict(followup=[YES])),
+            # add next AeTmg if severity increased
+            ActionRule(AE_TMG_ACTION, when=dict(ae_grade=[GRADE4]),
+                       branch=G4_BRANCH),
+            # add next Death report and AE TMG if G5/Death
+            ActionRule(DEATH_REPORT_ACTION, when=dict(outcome=[DEAD]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(DEATH_REPORT_ACTION, when=dict(ae_grade=[GRADE5]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(AE_TMG_ACTION, when=dict(outcome=[DEAD]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(AE_TMG_ACTION, when=dict(ae_grade=[GRADE5]),
+                       branch=G5_DEATH_BRANCH),
+        ))
+
     def get_offschedule_action_cls(self):
         """Returns the action class for the offschedule model.
+
+        See `offschedule_action_cache`.
         """
-        action_cls = None
-        for onschedule_model_obj in SubjectScheduleHistory.objects.onschedules(
-                subject_identifier=self.subject_identifier,
-                report_datetime=self.model_obj.report_datetime):
-            _, schedule = site_visit_schedules.get_by_onschedule_model(
-                onschedule_model=onschedule_model_obj._meta.label_lower)
-            offschedule_model = schedule.offschedule_model
-            action_cls = site_action_items.get_by_model(
-                model=offschedule_model)
-        return action_cls
+        return offschedule_action_cache.get_action_cls(
+            subject_identifier=self.subject_identifier,
+            report_datetime=self.model_obj.report_datetime)
 
+    @instrument_next_actions
     def get_next_actions(self):
-        next_actions = []
-
-        # add next AE followup
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=self,
-            required=self.model_obj.followup == YES)
-
-        # add next AeTmg if severity increased
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=AeTmgAction,
-            required=self.model_obj.ae_grade in [GRADE4])
-
-        # add next Death report if G5/Death
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=site_action_items.get(DEATH_REPORT_ACTION),
-            required=(
-                self.model_obj.outcome == DEAD
-                or self.model_obj.ae_grade == GRADE5))
-
-        # add next AE TMG if G5/Death
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=site_action_items.get(AE_TMG_ACTION),
-            required=(
-                self.model_obj.outcome == DEAD
-                or self.model_obj.ae_grade == GRADE5))
+        next_actions = self.append_next_actions_from_rules()
 
         # add next Study termination if LTFU
         offschedule_action_cls = self.get_offschedule_action_cls()
@@ -122,7 +207,7 @@ class AeFollowupAction(BaseNonAeInitialAction):
         return next_actions
 
 
-class AeInitialAction(Action):
+class AeInitialAction(NextActionRulesMixin, TimedActionMixin, Action):
 
     name = AE_INITIAL_ACTION
     display_name = 'Submit AE Initial Report'
@@ -133,48 +218,45 @@ class AeInitialAction(Action):
     instructions = 'Complete the initial AE report'
     priority = HIGH_PRIORITY
 
+    next_action_rules = ActionRuleTable(
+        fields=(
+            ('ae_grade', AE_GRADE),
+            ('sae', YES_NO),
+            ('sae_reason', SAE_REASONS),
+            ('ae_cm_recurrence', YES_NO_UNKNOWN)),
+        rules=(
+            # add next Followup if not G5/Death
+            ActionRule(AE_FOLLOWUP_ACTION,
+                       unless=dict(ae_grade=[GRADE5], sae_reason=[DEAD])),
+            # add next Death report and AE Tmg if G5/Death
+            ActionRule(DEATH_REPORT_ACTION, when=dict(ae_grade=[GRADE5]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(DEATH_REPORT_ACTION, when=dict(sae_reason=[DEAD]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(AE_TMG_ACTION, when=dict(ae_grade=[GRADE5]),
+                       branch=G5_DEATH_BRANCH),
+            ActionRule(AE_TMG_ACTION, when=dict(sae_reason=[DEAD]),
+                       branch=G5_DEATH_BRANCH),
+            # add next AeTmgAction if G4
+            ActionRule(AE_TMG_ACTION, when=dict(ae_grade=[GRADE4]),
+                       branch=G4_BRANCH),
+            # add next AeTmgAction if G3 and is an SAE
+            ActionRule(AE_TMG_ACTION, when=dict(ae_grade=[GRADE3], sae=[YES]),
+                       branch=SAE_G3_BRANCH),
+            # add next Recurrence of Symptoms if YES
+            ActionRule(RECURRENCE_OF_SYMPTOMS_ACTION,
+                       when=dict(ae_cm_recurrence=[YES]),
+                       branch=RECURRENCE_BRANCH),
+        ))
+
+    @instrument_next_actions
     def get_next_actions(self):
         """Returns next actions.
         """
-        next_actions = []
-        deceased = (
-            self.model_obj.ae_grade == GRADE5
-            or self.model_obj.sae_reason == DEAD)
-        # add next Followup
-        if not deceased:
-            next_actions = self.append_to_next_if_required(
-                action_cls=AeFollowupAction)
-        else:
-            self.delete_if_new(AeFollowupAction)
-        # add next Death report if G5/Death
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=site_action_items.get(DEATH_REPORT_ACTION),
-            required=deceased)
-        # add next AE Tmg if G5/Death
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=site_action_items.get(AE_TMG_ACTION),
-            required=deceased)
-        # add next AeTmgAction if G4
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=AeTmgAction,
-            required=self.model_obj.ae_grade == GRADE4)
-        # add next AeTmgAction if G3 and is an SAE
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=AeTmgAction,
-            required=(self.model_obj.ae_grade == GRADE3 and self.model_obj.sae == YES))
-        # add next Recurrence of Symptoms if YES
-        next_actions = self.append_to_next_if_required(
-            next_actions=next_actions,
-            action_cls=site_action_items.get(RECURRENCE_OF_SYMPTOMS_ACTION),
-            required=self.model_obj.ae_cm_recurrence == YES)
-        return next_actions
+        return self.append_next_actions_from_rules()
 
 
-class RecurrenceOfSymptomsAction(Action):
+class RecurrenceOfSymptomsAction(TimedActionMixin, Action):
     name = RECURRENCE_OF_SYMPTOMS_ACTION
     display_name = 'Submit Recurrence of Symptoms Report'
     model = 'ambition_ae.recurrencesymptom'
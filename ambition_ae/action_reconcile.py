@@ -0,0 +1,230 @@
+from collections import defaultdict
+from django.db.models import Case, Count, Value, When
+from edc_action_item.identifiers import ActionIdentifier
+from edc_action_item.models.action_item import ActionItem
+from edc_constants.constants import CLOSED, LOST_TO_FOLLOWUP, NEW, OPEN
+
+from .action_graph import action_graph
+from .action_items import AeFollowupAction, AeTmgAction, NextActionRulesMixin
+from .models import AeTmg
+from .offschedule_action_cache import offschedule_action_cache
+
+
+def update_by_pk(queryset=None, values=None):
+    """Updates the rows of a queryset from a dictionary of
+    {pk: {field_name: value}} in one UPDATE statement.
+    """
+    if not values:
+        return 0
+    field_names = set(name for row in values.values() for name in row)
+    model = queryset.model
+    return queryset.filter(pk__in=values).update(**{
+        name: Case(
+            *[When(pk=pk, then=Value(row[name]))
+              for pk, row in values.items() if name in row],
+            default=name,
+            output_field=model._meta.get_field(name))
+        for name in field_names})
+
+
+class ActionReconciler:
+
+    """Runs the actions of a list of saved AE model instances, in
+    order, with a fixed number of queries.
+
+    Does what the post-save action of each instance does row by
+    row: links the action item of the instance, or creates it, closes
+    it and creates the next action items of the rules that fire or
+    deletes the NEW ones of the rules that do not, see
+    `action_items.py`.
+
+    The action items of the subjects are read in one query and
+    changed in memory. The changes are written with one
+    `bulk_create`, one UPDATE of the changed action items, one
+    UPDATE of the action identifiers by model and one DELETE.
+
+        ActionReconciler(objs, site=site).reconcile()
+    """
+
+    def __init__(self, objs=None, site=None):
+        self.objs = objs
+        self.site = site
+        self.action_types = {}
+        self.by_action_identifier = {}
+        self.by_reference = {}
+        self.by_parent = defaultdict(list)
+        self.unlinked = defaultdict(list)
+        self.created = []
+        self.changed = {}
+        self.deleted = set()
+        self.action_identifiers = defaultdict(dict)
+        self.tmg_counts = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(objs={len(self.objs)})'
+
+    def reconcile(self):
+        """Runs the actions and returns a dictionary of
+        {model: [pk, ...]} of the instances whose action identifier
+        was updated.
+        """
+        self.read()
+        for obj in self.objs:
+            self.run(obj)
+        self.write()
+        return {model: list(values) for model, values in self.action_identifiers.items()}
+
+    def read(self):
+        subject_identifiers = set(obj.subject_identifier for obj in self.objs)
+        for action_item in ActionItem.objects.filter(
+                subject_identifier__in=subject_identifiers).select_related(
+                    'action_type').order_by('created'):
+            self.add(action_item)
+        ae_initial_ids = set(
+            obj.ae_initial_id for obj in self.objs if isinstance(obj, AeTmg))
+        if ae_initial_ids:
+            self.tmg_counts = dict(AeTmg.objects.filter(
+                ae_initial_id__in=ae_initial_ids).values('ae_initial_id').annotate(
+                    count=Count('id')).values_list('ae_initial_id', 'count'))
+
+    def add(self, action_item=None):
+        name = action_item.action_type.name
+        self.by_action_identifier[action_item.action_identifier] = action_item
+        if action_item.reference_identifier:
+            self.by_reference[(
+                action_item.reference_model,
+                action_item.reference_identifier)] = action_item
+        elif action_item.status == NEW:
+            self.unlinked[(action_item.subject_identifier, name)].append(action_item)
+        if action_item.parent_reference_identifier:
+            self.by_parent[(
+                action_item.parent_reference_identifier, name)].append(action_item)
+
+    def run(self, obj=None):
+        action_cls = obj.action_cls
+        action_item = self.get_or_create(obj, action_cls)
+        status = CLOSED
+        if issubclass(action_cls, AeTmgAction):
+            self.delete_if_new(obj, action_cls)
+            status = CLOSED if obj.report_status == CLOSED else OPEN
+        self.update(
+            action_item,
+            reference_identifier=obj.tracking_identifier,
+            reference_model=obj._meta.label_lower,
+            status=status)
+        if obj.action_identifier != action_item.action_identifier:
+            obj.action_identifier = action_item.action_identifier
+            self.action_identifiers[obj.__class__][obj.pk] = dict(
+                action_identifier=action_item.action_identifier)
+        if status == CLOSED:
+            for next_action_cls, required in self.get_next_actions(obj, action_cls):
+                if not required:
+                    self.delete_if_new(obj, next_action_cls)
+                elif not self.by_parent[(obj.tracking_identifier, next_action_cls.name)]:
+                    self.create(obj.subject_identifier, next_action_cls, parent=obj)
+
+    def get_or_create(self, obj=None, action_cls=None):
+        """Returns the action item of the instance by action
+        identifier or reference, otherwise the oldest NEW action item
+        of its action for the subject if created by another action,
+        otherwise a new action item.
+        """
+        action_item = (
+            self.by_action_identifier.get(obj.action_identifier)
+            or self.by_reference.get(
+                (obj._meta.label_lower, obj.tracking_identifier)))
+        if not action_item:
+            unlinked = self.unlinked[(obj.subject_identifier, action_cls.name)]
+            if unlinked and action_cls.create_by_user is False:
+                action_item = unlinked.pop(0)
+            else:
+                parent_model_fk_attr = getattr(action_cls, 'parent_model_fk_attr', None)
+                parent = getattr(obj, parent_model_fk_attr) if parent_model_fk_attr else None
+                action_item = self.create(obj.subject_identifier, action_cls, parent=parent)
+                unlinked.remove(action_item)
+        self.by_reference[(obj._meta.label_lower, obj.tracking_identifier)] = action_item
+        return action_item
+
+    def get_next_actions(self, obj=None, action_cls=None):
+        """Returns a list of (action class, required) for the next
+        actions of an instance.
+        """
+        next_actions = []
+        if issubclass(action_cls, NextActionRulesMixin):
+            action_names = action_cls.next_action_rules.get_action_names(obj)
+            next_actions.extend(
+                (action_graph.get(name), name in action_names)
+                for name in action_cls.next_action_rules.action_names)
+        if issubclass(action_cls, AeFollowupAction):
+            offschedule_action_cls = offschedule_action_cache.get_action_cls(
+                subject_identifier=obj.subject_identifier,
+                report_datetime=obj.report_datetime)
+            if offschedule_action_cls:
+                next_actions.append(
+                    (offschedule_action_cls, obj.outcome == LOST_TO_FOLLOWUP))
+        if issubclass(action_cls, AeTmgAction):
+            next_actions.append((action_cls, (
+                self.tmg_counts.get(obj.ae_initial_id) == 1
+                and obj.ae_initial.ae_classification != obj.ae_classification)))
+        return next_actions
+
+    def get_action_type(self, action_cls=None):
+        try:
+            return self.action_types[action_cls.name]
+        except KeyError:
+            self.action_types[action_cls.name] = action_cls.action_type()
+        return self.action_types[action_cls.name]
+
+    def create(self, subject_identifier=None, action_cls=None, parent=None):
+        action_item = ActionItem(
+            subject_identifier=subject_identifier,
+            action_type=self.get_action_type(action_cls),
+            action_identifier=ActionIdentifier().identifier,
+            reference_model=action_cls.model,
+            parent_reference_identifier=getattr(parent, 'tracking_identifier', None),
+            parent_model=parent._meta.label_lower if parent else None,
+            priority=action_cls.priority,
+            instructions=action_cls.instructions,
+            status=NEW,
+            site=self.site)
+        self.created.append(action_item)
+        self.add(action_item)
+        return action_item
+
+    def update(self, action_item=None, **values):
+        values = {
+            name: value for name, value in values.items()
+            if getattr(action_item, name) != value}
+        if values:
+            for name, value in values.items():
+                setattr(action_item, name, value)
+            if not action_item._state.adding:
+                self.changed.setdefault(action_item.pk, {}).update(**values)
+
+    def delete_if_new(self, obj=None, action_cls=None):
+        """Deletes the NEW next action items of an action for an
+        instance.
+        """
+        action_items = self.by_parent[(obj.tracking_identifier, action_cls.name)]
+        for action_item in [a for a in action_items if a.status == NEW]:
+            action_items.remove(action_item)
+            self.by_action_identifier.pop(action_item.action_identifier)
+            if action_item._state.adding:
+                self.created.remove(action_item)
+            else:
+                self.deleted.add(action_item.pk)
+                self.changed.pop(action_item.pk, None)
+            unlinked = self.unlinked[(action_item.subject_identifier, action_cls.name)]
+            if action_item in unlinked:
+                unlinked.remove(action_item)
+
+    def write(self):
+        if self.deleted:
+            ActionItem.objects.filter(pk__in=self.deleted).delete()
+        ActionItem.objects.bulk_create(self.created)
+        update_by_pk(ActionItem.objects.all(), self.changed)
+        ActionItem.history.bulk_history_create(self.created + [
+            action_item for action_item in self.by_action_identifier.values()
+            if action_item.pk in self.changed])
+        for model, values in self.action_identifiers.items():
+            update_by_pk(model.objects.all(), values)
@@ -0,0 +1,128 @@
+from itertools import product
+
+
+class ActionRuleError(Exception):
+    pass
+
+
+class ActionRule:
+
+    """A declarative next-action rule.
+
+    `when` maps a model field name to the values for which the rule
+    fires, `unless` to the values for which it does not. A field
+    not named in either matches any value.
+
+    `branch` optionally labels the branch of the cascade the rule
+    belongs to, for example for the latency histograms.
+    """
+
+    def __init__(self, action_name=None, when=None, unless=None, branch=None):
+        self.action_name = action_name
+        self.branch = branch
+        self.when = {k: frozenset(v) for k, v in (when or {}).items()}
+        self.unless = {k: frozenset(v) for k, v in (unless or {}).items()}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.action_name})'
+
+    @property
+    def field_names(self):
+        return set(self.when) | set(self.unless)
+
+    def matches(self, values=None):
+        """Returns True if the rule fires for a dictionary of
+        field values.
+        """
+        for field_name, accepted in self.when.items():
+            if values.get(field_name) not in accepted:
+                return False
+        for field_name, rejected in self.unless.items():
+            if values.get(field_name) in rejected:
+                return False
+        return True
+
+
+class ActionRuleTable:
+
+    """A table of next-action rules compiled into a lookup.
+
+    The lookup is keyed on a tuple of the values of `fields` and
+    returns the names of the next actions, in rule order and without
+    duplicates. `fields` is a sequence of (field_name, choices)
+    where `choices` is a choices tuple from `choices.py`. Values not
+    found in the compiled lookup are evaluated against the rules
+    directly.
+    """
+
+    def __init__(self, fields=None, rules=None):
+        self.fields = tuple(fields)
+        self.field_names = tuple(field_name for field_name, _ in self.fields)
+        self.rules = tuple(rules)
+        for rule in self.rules:
+            unknown = rule.field_names - set(self.field_names)
+            if unknown:
+                raise ActionRuleError(
+                    f'Rule refers to fields not in the table. Got {unknown}. '
+                    f'See {repr(rule)}.')
+        self.lookup = self.compile()
+        self.branch_lookup = self.compile(self.evaluate_branches)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.field_names})'
+
+    @property
+    def action_names(self):
+        """Returns the names of all actions referred to by the rules.
+        """
+        return tuple(dict.fromkeys(rule.action_name for rule in self.rules))
+
+    def domain(self, field_name=None, choices=None):
+        """Returns the values to compile for a field; the stored
+        values of its choices plus any values named by the rules.
+        """
+        values = [value for value, _ in choices]
+        for rule in self.rules:
+            for value in (rule.when.get(field_name, set())
+                          | rule.unless.get(field_name, set())):
+                if value not in values:
+                    values.append(value)
+        return values
+
+    def compile(self, evaluate=None):
+        evaluate = evaluate or self.evaluate
+        domains = [self.domain(field_name, choices)
+                   for field_name, choices in self.fields]
+        return {key: evaluate(dict(zip(self.field_names, key)))
+                for key in product(*domains)}
+
+    def evaluate(self, values=None):
+        names = [rule.action_name for rule in self.rules
+                 if rule.matches(values)]
+        return tuple(dict.fromkeys(names))
+
+    def evaluate_branches(self, values=None):
+        branches = [rule.branch for rule in self.rules
+                    if rule.branch and rule.matches(values)]
+        return tuple(dict.fromkeys(branches))
+
+    def get_action_names(self, model_obj=None):
+        """Returns a tuple of next action names for a model instance.
+        """
+        key = tuple(getattr(model_obj, field_name)
+                    for field_name in self.field_names)
+        try:
+            return self.lookup[key]
+        except KeyError:
+            return self.evaluate(dict(zip(self.field_names, key)))
+
+    def get_branches(self, model_obj=None):
+        """Returns a tuple of the branches of the rules that fire
+        for a model instance.
+        """
+        key = tuple(getattr(model_obj, field_name)
+                    for field_name in self.field_names)
+        try:
+            return self.branch_lookup[key]
+        except KeyError:
+            return self.evaluate_branches(dict(zip(self.field_names, key)))
@@ -1,3 +1,5 @@
+import threading
+
 from django.contrib import admin
 
 from edc_model_admin import audit_fieldset_tuple
@@ -5,11 +7,14 @@ from edc_model_admin import audit_fieldset_tuple
 from ..admin_site import ambition_ae_admin
 from ..forms import AeFollowupForm
 from ..models import AeFollowup
+from .keyset_changelist import ModelAdminKeysetPaginationMixin
+from .list_filters import AeFollowupGradeLevelListFilter
 from .modeladmin_mixins import ModelAdminMixin, NonAeInitialModelAdminMixin
 
 
 @admin.register(AeFollowup, site=ambition_ae_admin)
-class AeFollowupAdmin(ModelAdminMixin, NonAeInitialModelAdminMixin, admin.ModelAdmin):
+class AeFollowupAdmin(ModelAdminKeysetPaginationMixin, ModelAdminMixin,
+                      NonAeInitialModelAdminMixin, admin.ModelAdmin):
 
     form = AeFollowupForm
 
@@ -39,8 +44,30 @@ class AeFollowupAdmin(ModelAdminMixin, NonAeInitialModelAdminMixin, admin.ModelA
     list_display = ('identifier', 'dashboard', 'outcome_date', 'description',
                     'initial', 'severity', 'next', 'outcome', 'user_created')
 
-    list_filter = ('ae_grade', 'followup', 'outcome_date', 'report_datetime')
+    list_select_related = ('ae_initial', )
+
+    list_defer = ('relevant_history',
+                  'ae_initial__details_last_study_drug',
+                  'ae_initial__ae_treatment')
+
+    list_filter = (AeFollowupGradeLevelListFilter, 'followup', 'outcome_date',
+                   'report_datetime')
 
     search_fields = ['ae_initial__tracking_identifier',
                      'ae_initial__subject_identifier',
                      'ae_initial__action_identifier']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._local = threading.local()
+
+    def changelist_view(self, request, extra_context=None):
+        self._local.changelist_url = self.model.get_changelist_url()
+        try:
+            return super().changelist_view(request, extra_context=extra_context)
+        finally:
+            self._local.changelist_url = None
+
+    def initial(self, obj=None):
+        return obj.get_initial_link(
+            changelist_url=getattr(self._local, 'changelist_url', None))
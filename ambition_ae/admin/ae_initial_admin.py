@@ -8,11 +8,16 @@ from ..admin_site import ambition_ae_admin
 from ..email_contacts import email_contacts
 from ..forms import AeInitialForm
 from ..models import AeInitial
-from .modeladmin_mixins import ModelAdminMixin
+from .autocomplete import AeInitialAutocompleteJsonView
+from .keyset_changelist import ModelAdminKeysetPaginationMixin
+from .list_filters import AeGradeLevelListFilter, FacetChoicesFieldListFilter
+from .list_filters import FacetDateFieldListFilter
+from .modeladmin_mixins import ModelAdminMixin, ModelAdminPaginatedHistoryMixin
 
 
 @admin.register(AeInitial, site=ambition_ae_admin)
-class AeInitialAdmin(ModelAdminMixin, SimpleHistoryAdmin):
+class AeInitialAdmin(ModelAdminKeysetPaginationMixin, ModelAdminPaginatedHistoryMixin,
+                     ModelAdminMixin, SimpleHistoryAdmin):
 
     form = AeInitialForm
     email_contact = email_contacts.get('ae_reports')
@@ -79,9 +84,16 @@ class AeInitialAdmin(ModelAdminMixin, SimpleHistoryAdmin):
                     'ae_grade', 'sae', 'sae_reason',
                     'susar', 'susar_reported']
 
-    list_filter = ['ae_awareness_date', 'ae_grade', 'ae_classification',
-                   'ae_intensity', 'sae', 'sae_reason', 'susar',
-                   'susar_reported']
+    list_filter = [('ae_awareness_date', FacetDateFieldListFilter),
+                   AeGradeLevelListFilter,
+                   ('ae_classification', FacetChoicesFieldListFilter),
+                   ('ae_intensity', FacetChoicesFieldListFilter),
+                   ('sae', FacetChoicesFieldListFilter),
+                   ('sae_reason', FacetChoicesFieldListFilter),
+                   ('susar', FacetChoicesFieldListFilter),
+                   ('susar_reported', FacetChoicesFieldListFilter)]
+
+    list_defer = ('details_last_study_drug', 'ae_treatment', 'ae_description')
 
     search_fields = ['action_identifier',
                      'tracking_identifier', 'subject_identifier']
@@ -89,3 +101,6 @@ class AeInitialAdmin(ModelAdminMixin, SimpleHistoryAdmin):
     def get_readonly_fields(self, request, obj=None):
         fields = super().get_readonly_fields(request, obj=obj)
         return fields + ('tracking_identifier', 'action_identifier')
+
+    def autocomplete_view(self, request):
+        return AeInitialAutocompleteJsonView.as_view(model_admin=self)(request)
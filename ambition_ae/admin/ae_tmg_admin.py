@@ -18,6 +18,13 @@ class AeTmgAdmin(ModelAdminMixin, NonAeInitialModelAdminMixin, admin.ModelAdmin)
     list_display = ['subject_identifier', 'dashboard', 'status', 'ae_initial', 'report_datetime',
                     'officials_notified', 'report_closed_datetime']
 
+    list_select_related = ('ae_initial', )
+
+    list_defer = ('ae_description', 'investigator_comments',
+                  'ae_initial__details_last_study_drug',
+                  'ae_initial__ae_treatment',
+                  'ae_initial__ae_description')
+
     list_filter = ('report_datetime', 'report_status')
 
     search_fields = ['ae_initial__tracking_identifier',
@@ -0,0 +1,58 @@
+import hashlib
+
+from django.contrib.admin.views.autocomplete import AutocompleteJsonView
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import JsonResponse
+
+
+class AeInitialAutocompleteJsonView(AutocompleteJsonView):
+
+    """The autocomplete view for the `ae_initial` field of the
+    follow-up and TMG forms.
+
+    Searches the reports of the current site by tracking identifier
+    prefix or subject identifier prefix, both indexed, newest first.
+    Responses are cached per site, term and page for `timeout`
+    seconds. The admin widget (select2) already debounces requests.
+    """
+
+    key_prefix = 'ambition_ae.autocomplete'
+    timeout = 30
+    paginate_by = 20
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_perm(request):
+            return JsonResponse({'error': '403 Forbidden'}, status=403)
+        self.term = request.GET.get('term', '').strip()
+        key = self.get_key(request)
+        data = cache.get(key)
+        if data is None:
+            self.paginator_class = self.model_admin.paginator
+            self.object_list = self.get_queryset()
+            context = self.get_context_data()
+            data = {
+                'results': [
+                    {'id': str(obj.pk), 'text': str(obj)}
+                    for obj in context['object_list']],
+                'pagination': {'more': context['page_obj'].has_next()},
+            }
+            cache.set(key, data, self.timeout)
+        return JsonResponse(data)
+
+    def get_key(self, request=None):
+        digest = hashlib.md5(self.term.encode('utf-8')).hexdigest()
+        return (f'{self.key_prefix}.{self.model_admin.model._meta.label_lower}.'
+                f'{Site.objects.get_current().pk}.{digest}.'
+                f'{request.GET.get(self.page_kwarg, 1)}')
+
+    def get_queryset(self):
+        model = self.model_admin.model
+        queryset = model.objects.filter(site=Site.objects.get_current())
+        if self.term:
+            queryset = queryset.filter(
+                Q(tracking_identifier__startswith=self.term.upper())
+                | Q(subject_identifier__startswith=self.term))
+        return queryset.only('id', *model.str_fields).order_by(
+            '-report_datetime', '-id')
@@ -0,0 +1,229 @@
+import json
+
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .modeladmin_mixins import PrefetchRelatedChangeList
+
+
+AFTER_VAR = 'after'
+BEFORE_VAR = 'before'
+
+TABLE_ESTIMATE_SQL = {
+    'mysql': ('SELECT table_rows FROM information_schema.tables '
+              'WHERE table_schema = DATABASE() AND table_name = %s'),
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+}
+
+
+def get_table_estimate(model=None):
+    """Returns the row count estimate of the database statistics for
+    the table of a model or None.
+    """
+    sql = TABLE_ESTIMATE_SQL.get(connection.vendor)
+    if not sql:
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [model._meta.db_table])
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None else None
+
+
+def get_query_estimate(queryset=None):
+    """Returns the row count estimate of the query planner for a
+    queryset or None.
+    """
+    if connection.vendor not in TABLE_ESTIMATE_SQL:
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+        cursor.execute(f'EXPLAIN {sql}', params)
+        row = dict(zip([column[0] for column in cursor.description], cursor.fetchone()))
+    return int(row['rows'] * float(row.get('filtered') or 100) / 100)
+
+
+def get_estimated_count(queryset=None, threshold=None):
+    """Returns a tuple of (count, exact).
+
+    Counts at most `threshold` + 1 rows. Above the threshold, returns
+    the table estimate for an unfiltered queryset, otherwise the
+    query planner's estimate, for example for the changelist of the
+    current site, or the threshold if neither is available.
+    """
+    count = queryset.order_by()[:threshold + 1].count()
+    if count <= threshold:
+        return count, True
+    if queryset.query.where:
+        estimate = get_query_estimate(queryset)
+    else:
+        estimate = get_table_estimate(queryset.model)
+    if estimate:
+        return max(estimate, count), False
+    return threshold, False
+
+
+def get_keyset_filter(fields=None, values=None, lookup=None):
+    """Returns a Q of the rows after a keyset, the values of the
+    fields, in the order of `lookup`, 'lt' or 'gt'.
+    """
+    q = Q()
+    for index, field in enumerate(fields):
+        q |= Q(**dict(zip(fields[:index], values[:index])),
+               **{f'{field}__{lookup}': values[index]})
+    return q
+
+
+class EstimatedCountPaginator(Paginator):
+
+    """A paginator that counts exactly up to `threshold` rows and
+    estimates above it.
+    """
+
+    threshold = 1000
+
+    @cached_property
+    def count(self):
+        count, self.exact = get_estimated_count(self.object_list, self.threshold)
+        return count
+
+
+class KeysetChangeList(PrefetchRelatedChangeList):
+
+    """A changelist that pages by keyset instead of OFFSET, with an
+    estimated result count.
+
+    The keyset is the fields of the admin `ordering` followed by the
+    pk, all descending or all ascending, otherwise ('-modified',
+    '-id'). The keyset is used unless the user sorts by a column or
+    searches, see `ModelAdminSearchIndexMixin`. Pages are linked by
+    the `after` and `before` cursors, the keyset of the last or first
+    row of the page. Not for use with `list_editable`.
+    """
+
+    default_keyset_ordering = ('-modified', '-id')
+
+    def __init__(self, request, *args, **kwargs):
+        self.after = request.GET.get(AFTER_VAR)
+        self.before = request.GET.get(BEFORE_VAR)
+        self.keyset_pagination = False
+        self.keyset_fields = ()
+        self.keyset_descending = True
+        self.next_cursor = None
+        self.previous_cursor = None
+        self.result_count_exact = True
+        if AFTER_VAR in request.GET or BEFORE_VAR in request.GET:
+            request.GET = request.GET.copy()
+            request.GET.pop(AFTER_VAR, None)
+            request.GET.pop(BEFORE_VAR, None)
+        super().__init__(request, *args, **kwargs)
+
+    def get_keyset_ordering(self, request):
+        """Returns the admin ordering with the pk appended if its
+        fields are all descending or all ascending, otherwise the
+        default keyset ordering.
+        """
+        ordering = list(self.model_admin.get_ordering(request) or [])
+        pk_name = self.lookup_opts.pk.name
+        if ordering and all(isinstance(field, str) for field in ordering):
+            descending = set(field.startswith('-') for field in ordering)
+            if len(descending) == 1:
+                prefix = '-' if descending.pop() else ''
+                if f'{prefix}{pk_name}' not in ordering:
+                    ordering.append(f'{prefix}{pk_name}')
+                return ordering
+        return list(self.default_keyset_ordering)
+
+    def get_ordering(self, request, queryset):
+        if ORDER_VAR in self.params or self.query:
+            return super().get_ordering(request, queryset)
+        ordering = self.get_keyset_ordering(request)
+        self.keyset_pagination = True
+        self.keyset_descending = ordering[0].startswith('-')
+        self.keyset_fields = tuple(field.lstrip('-') for field in ordering)
+        return ordering
+
+    def get_cursor(self, obj=None):
+        return '|'.join(
+            self.lookup_opts.get_field(field).value_to_string(obj)
+            for field in self.keyset_fields)
+
+    def parse_cursor(self, cursor=None):
+        values = cursor.split('|')
+        if len(values) != len(self.keyset_fields):
+            raise IncorrectLookupParameters(f'Invalid cursor. Got {cursor}.')
+        try:
+            return [self.lookup_opts.get_field(field).to_python(value)
+                    for field, value in zip(self.keyset_fields, values)]
+        except ValidationError:
+            raise IncorrectLookupParameters(f'Invalid cursor. Got {cursor}.')
+
+    def get_results(self, request):
+        if not self.keyset_pagination:
+            super().get_results(request)
+            self.result_count_exact = getattr(self.paginator, 'exact', True)
+            return
+        paginator = self.model_admin.get_paginator(
+            request, self.queryset, self.list_per_page)
+        older, newer = ('lt', 'gt') if self.keyset_descending else ('gt', 'lt')
+        if self.before:
+            values = self.parse_cursor(self.before)
+            rows = list(self.queryset.filter(
+                get_keyset_filter(self.keyset_fields, values, newer)).reverse()[
+                    :self.list_per_page + 1])
+            has_newer = len(rows) > self.list_per_page
+            rows = list(reversed(rows[:self.list_per_page]))
+            has_older = True
+        else:
+            queryset = self.queryset
+            if self.after:
+                values = self.parse_cursor(self.after)
+                queryset = queryset.filter(
+                    get_keyset_filter(self.keyset_fields, values, older))
+            rows = list(queryset[:self.list_per_page + 1])
+            has_older = len(rows) > self.list_per_page
+            rows = rows[:self.list_per_page]
+            has_newer = bool(self.after)
+        if rows:
+            self.next_cursor = self.get_cursor(rows[-1]) if has_older else None
+            self.previous_cursor = self.get_cursor(rows[0]) if has_newer else None
+        self.result_count = paginator.count
+        self.result_count_exact = paginator.exact
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.full_result_count = None
+        self.result_list = rows
+        self.can_show_all = False
+        self.multi_page = has_older or has_newer
+        self.paginator = paginator
+
+    @property
+    def next_url(self):
+        return self.get_query_string({AFTER_VAR: self.next_cursor})
+
+    @property
+    def previous_url(self):
+        return self.get_query_string({BEFORE_VAR: self.previous_cursor})
+
+
+class ModelAdminKeysetPaginationMixin:
+
+    """A mixin to opt in to the keyset changelist, estimated counts
+    and the cached date hierarchy rollup.
+    """
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
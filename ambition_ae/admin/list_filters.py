@@ -0,0 +1,144 @@
+from django.contrib.admin import SimpleListFilter
+from django.contrib.admin.filters import ChoicesFieldListFilter, DateFieldListFilter
+from django.contrib.sites.models import Site
+from django.db.models import Q
+from django.http import QueryDict
+
+from ..facet_counts import facet_counts
+
+
+def get_changelist_facet_counts(changelist=None):
+    """Returns the facet counts of all the list filters of a
+    changelist, computed once per changelist.
+    """
+    if not hasattr(changelist, 'facet_counts'):
+        lookups = {}
+        for spec in changelist.filter_specs:
+            if isinstance(spec, FacetCountsMixin):
+                lookups.update({
+                    (spec.facet_name, value): q
+                    for value, q in spec.get_facet_lookups().items()})
+        changelist.facet_counts = facet_counts.get_counts(
+            changelist.root_queryset, lookups, Site.objects.get_current().pk)
+    return changelist.facet_counts
+
+
+class FacetCountsMixin:
+
+    """A mixin for list filters that shows the number of reports
+    next to each option.
+
+    Counts are over all the reports of the site, not narrowed by
+    the other filters, see `FacetCounts`.
+    """
+
+    def get_facet_lookups(self):
+        """Returns a dictionary of {option value: Q}.
+        """
+        raise NotImplementedError
+
+    def get_choice_value(self, choice=None):
+        return QueryDict(choice['query_string'].lstrip('?')).get(self.facet_param)
+
+    def choices(self, changelist):
+        counts = get_changelist_facet_counts(changelist)
+        for choice in super().choices(changelist):
+            count = counts.get((self.facet_name, self.get_choice_value(choice)))
+            if count is not None:
+                choice['display'] = f'{choice["display"]} ({count})'
+            yield choice
+
+
+class FacetChoicesFieldListFilter(FacetCountsMixin, ChoicesFieldListFilter):
+
+    @property
+    def facet_name(self):
+        return self.field_path
+
+    @property
+    def facet_param(self):
+        return self.lookup_kwarg
+
+    def get_facet_lookups(self):
+        return {
+            str(value): Q(**{self.field_path: value})
+            for value, _ in self.field.flatchoices if value is not None}
+
+
+class FacetDateFieldListFilter(FacetCountsMixin, DateFieldListFilter):
+
+    @property
+    def facet_name(self):
+        return self.field_path
+
+    def get_choice_value(self, choice=None):
+        return str(choice['display'])
+
+    def get_facet_lookups(self):
+        lookups = {}
+        for title, params in self.links:
+            if params:
+                lookups[str(title)] = Q(**{
+                    k: {'True': True, 'False': False}.get(v, v)
+                    for k, v in params.items()})
+        return lookups
+
+
+class AeGradeLevelListFilter(FacetCountsMixin, SimpleListFilter):
+
+    """Filters on `ae_grade_level` by range, for example
+    Grade 4 and above.
+    """
+
+    title = 'Severity of AE'
+    parameter_name = 'ae_grade_level'
+
+    @property
+    def facet_name(self):
+        return self.parameter_name
+
+    @property
+    def facet_param(self):
+        return self.parameter_name
+
+    def lookups(self, request, model_admin):
+        return (
+            ('3', 'Grade III and above'),
+            ('4', 'Grade 4 and above'),
+            ('5', 'Grade 5'),
+        )
+
+    def get_facet_lookups(self):
+        return {
+            value: Q(ae_grade_level__gte=int(value))
+            for value, _ in self.lookup_choices}
+
+    def queryset(self, request, queryset):
+        try:
+            ae_grade_level = int(self.value())
+        except (TypeError, ValueError):
+            return queryset
+        return queryset.filter(ae_grade_level__gte=ae_grade_level)
+
+
+class AeFollowupGradeLevelListFilter(AeGradeLevelListFilter):
+
+    title = 'Severity increased to'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('4', 'Grade 4 and above'),
+            ('5', 'Grade 5'),
+            ('none', 'Unchanged'),
+        )
+
+    def get_facet_lookups(self):
+        return {
+            value: (Q(ae_grade_level__isnull=True) if value == 'none'
+                    else Q(ae_grade_level__gte=int(value)))
+            for value, _ in self.lookup_choices}
+
+    def queryset(self, request, queryset):
+        if self.value() == 'none':
+            return queryset.filter(ae_grade_level__isnull=True)
+        return super().queryset(request, queryset)
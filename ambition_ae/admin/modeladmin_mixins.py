@@ -1,4 +1,12 @@
 from django.conf import settings
+from django.contrib.admin.utils import unquote
+from django.contrib.admin.views.main import ChangeList, ORDER_VAR
+from django.contrib.sites.models import Site
+from django.core.exceptions import PermissionDenied
+from django.core.paginator import Paginator
+from django.db.models import Case, IntegerField, Value, When
+from django.http import Http404
+from django.template.response import TemplateResponse
 from django.urls.base import reverse
 from django_revision.modeladmin_mixin import ModelAdminRevisionMixin
 from edc_base.sites.admin import ModelAdminSiteMixin
@@ -10,13 +18,120 @@ from edc_model_admin import (
 from edc_metadata import NextFormGetter
 from edc_subject_dashboard import ModelAdminSubjectDashboardMixin
 
+from ..history_diff import get_history_diffs
 from ..models import AeInitial
+from ..search_index import search_index
 
 
-class ModelAdminMixin(ModelAdminNextUrlRedirectMixin, ModelAdminFormInstructionsMixin,
-                      ModelAdminFormAutoNumberMixin, ModelAdminRevisionMixin,
-                      ModelAdminAuditFieldsMixin, ModelAdminReadOnlyMixin,
-                      ModelAdminInstitutionMixin, ModelAdminRedirectOnDeleteMixin,
+class PrefetchRelatedChangeList(ChangeList):
+
+    def get_queryset(self, request):
+        qs = super().get_queryset(request)
+        if self.model_admin.list_prefetch_related:
+            qs = qs.prefetch_related(*self.model_admin.list_prefetch_related)
+        if self.model_admin.list_defer:
+            qs = qs.defer(*self.model_admin.list_defer)
+        return qs
+
+
+class ModelAdminPrefetchRelatedMixin:
+
+    """A mixin to declare the many-to-many fields to prefetch for
+    the changelist, like `list_select_related` for foreign keys, and
+    the columns not to load, for example text fields not in
+    `list_display`.
+    """
+
+    list_prefetch_related = ()
+    list_defer = ()
+
+    def get_changelist(self, request, **kwargs):
+        return PrefetchRelatedChangeList
+
+
+class ModelAdminSearchIndexMixin:
+
+    """A mixin that adds the matches of the narrative text search
+    index to the results of `search_fields`.
+
+    Unless the user sorts by a column, the matches of the index are
+    listed first, best first, then the other results in the
+    changelist ordering.
+    """
+
+    search_index_limit = 1000
+
+    def get_search_results(self, request, queryset, search_term):
+        results, use_distinct = super().get_search_results(
+            request, queryset, search_term)
+        if search_term and search_index.is_indexed(self.model):
+            pks = [pk for pk, _ in search_index.search(
+                self.model, search_term, limit=self.search_index_limit)]
+            if pks:
+                results = results | queryset.filter(pk__in=pks)
+                if ORDER_VAR not in request.GET:
+                    results = results.annotate(search_rank=Case(
+                        *[When(pk=pk, then=Value(rank)) for rank, pk in enumerate(pks)],
+                        default=Value(len(pks)),
+                        output_field=IntegerField())).order_by(
+                            'search_rank', *queryset.query.order_by)
+        return results, use_distinct
+
+
+class ModelAdminPaginatedHistoryMixin:
+
+    """A mixin for `SimpleHistoryAdmin` that replaces the history
+    view with one that shows a page of historical records at a time
+    and the field-level changes from the previous version.
+
+    Only the records of the current page are fetched and the diffs
+    are computed as the template renders them, see `HistoryDiff`.
+    """
+
+    history_list_per_page = 25
+    object_history_template = 'admin/ambition_ae/object_history.html'
+
+    def history_view(self, request, object_id, extra_context=None):
+        pk = unquote(object_id)
+        obj = self.get_object(request, pk)
+        if not self.has_change_permission(request, obj):
+            raise PermissionDenied
+        queryset = self.model.history.filter(id=pk)
+        if obj is None:
+            # deleted or not on the current site, only show the history
+            # kept on the current site
+            queryset = queryset.filter(site=Site.objects.get_current())
+        paginator = Paginator(
+            queryset.order_by('-history_date'), self.history_list_per_page)
+        if not paginator.count:
+            raise Http404(
+                f'{self.model._meta.verbose_name} with ID \"{pk}\" has no history.')
+        page_obj = paginator.get_page(request.GET.get('p'))
+        history_diffs = get_history_diffs(
+            queryset, page_obj.start_index() - 1, page_obj.end_index())
+        opts = self.model._meta
+        context = dict(
+            self.admin_site.each_context(request),
+            title=f'Change history: {obj or pk}',
+            object=obj,
+            object_id=object_id,
+            opts=opts,
+            module_name=str(opts.verbose_name_plural),
+            page_obj=page_obj,
+            paginator=paginator,
+            history_diffs=history_diffs,
+            preserved_filters=self.get_preserved_filters(request))
+        context.update(extra_context or {})
+        request.current_app = self.admin_site.name
+        return TemplateResponse(request, self.object_history_template, context)
+
+
+class ModelAdminMixin(ModelAdminSearchIndexMixin, ModelAdminPrefetchRelatedMixin,
+                      ModelAdminNextUrlRedirectMixin, ModelAdminFormInstructionsMixin,
+                      ModelAdminFormAutoNumberMixin,
+                      ModelAdminRevisionMixin, ModelAdminAuditFieldsMixin,
+                      ModelAdminReadOnlyMixin, ModelAdminInstitutionMixin,
+                      ModelAdminRedirectOnDeleteMixin,
                       ModelAdminSubjectDashboardMixin, ModelAdminSiteMixin):
 
     list_per_page = 10
@@ -42,13 +157,25 @@ class ModelAdminMixin(ModelAdminNextUrlRedirectMixin, ModelAdminFormInstructions
 
 class NonAeInitialModelAdminMixin:
 
+    """A mixin for the reports that refer to an AE initial report.
+
+    `ae_initial` is limited to the id in the querystring, if any,
+    otherwise picked with the autocomplete view of `AeInitialAdmin`.
+    """
+
+    autocomplete_fields = ('ae_initial', )
+
+    # columns of AeInitial not read by the forms or actions of the
+    # reports that refer to it
+    ae_initial_defer = ('details_last_study_drug', 'ae_treatment')
+
     def formfield_for_foreignkey(self, db_field, request, **kwargs):
         if db_field.name == 'ae_initial':
+            queryset = AeInitial.on_site.defer(*self.ae_initial_defer)
             if request.GET.get('ae_initial'):
-                kwargs["queryset"] = AeInitial.objects.filter(
+                queryset = queryset.filter(
                     id__exact=request.GET.get('ae_initial', 0))
-            else:
-                kwargs["queryset"] = AeInitial.objects.none()
+            kwargs["queryset"] = queryset
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
     def get_readonly_fields(self, request, obj=None):
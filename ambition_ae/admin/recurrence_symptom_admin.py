@@ -85,6 +85,8 @@ class RecurrenceSymptomAdmin(ModelAdminMixin, admin.ModelAdmin):
                     'report_datetime', 'patient_readmitted',
                     'tracking_identifier', 'action_identifier')
 
+    list_defer = ('narrative_summary', )
+
     filter_horizontal = ('meningitis_symptom',
                          'neurological', 'antibiotic_treatment')
 
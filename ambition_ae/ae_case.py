@@ -0,0 +1,149 @@
+from edc_constants.constants import OPEN, YES
+
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+
+
+class FrozenNode:
+
+    """A base class for the compact, read-only nodes of an AE case
+    tree. Attributes are declared in `__slots__` and set once.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, **kwargs):
+        for name in self.__slots__:
+            object.__setattr__(self, name, kwargs.get(name))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{self.__class__.__name__} is read-only.')
+
+    def __delattr__(self, name):
+        raise AttributeError(f'{self.__class__.__name__} is read-only.')
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(tracking_identifier={self.tracking_identifier})'
+
+
+class AeFollowupNode(FrozenNode):
+
+    __slots__ = ('pk', 'tracking_identifier', 'action_identifier',
+                 'report_datetime', 'outcome', 'outcome_date', 'ae_grade',
+                 'followup')
+
+    fields = __slots__
+
+
+class AeTmgNode(FrozenNode):
+
+    __slots__ = ('pk', 'tracking_identifier', 'action_identifier',
+                 'report_datetime', 'report_status', 'ae_classification',
+                 'clinical_review_datetime')
+
+    fields = __slots__
+
+    @property
+    def is_open(self):
+        return self.report_status == OPEN
+
+
+class RecurrenceSymptomNode(FrozenNode):
+
+    __slots__ = ('pk', 'tracking_identifier', 'action_identifier',
+                 'report_datetime', 'patient_readmitted', 'dr_opinion')
+
+    fields = __slots__
+
+
+class AeCase(FrozenNode):
+
+    """An AE initial report with its follow-up, TMG and recurrence of
+    symptoms reports in report_datetime order.
+
+    The current grade, outcome and open/closed state are read from
+    the current state columns of AeInitial, see `current_state.py`.
+    """
+
+    __slots__ = ('pk', 'subject_identifier', 'tracking_identifier',
+                 'action_identifier', 'report_datetime', 'ae_classification',
+                 'ae_grade', 'sae', 'susar', 'ae_cm_recurrence',
+                 'followups', 'tmgs', 'recurrence_symptoms',
+                 'current_grade', 'outcome', 'is_open', 'tmg_open')
+
+    fields = ('pk', 'subject_identifier', 'tracking_identifier',
+              'action_identifier', 'report_datetime', 'ae_classification',
+              'ae_grade', 'sae', 'susar', 'ae_cm_recurrence',
+              'current_grade', 'current_outcome', 'is_closed')
+
+    def __init__(self, followups=None, tmgs=None, recurrence_symptoms=None,
+                 current_outcome=None, is_closed=None, **kwargs):
+        tmgs = tuple(tmgs or ())
+        kwargs.update(
+            followups=tuple(followups or ()),
+            tmgs=tmgs,
+            recurrence_symptoms=tuple(recurrence_symptoms or ()),
+            outcome=current_outcome,
+            is_open=not is_closed,
+            tmg_open=any(tmg.is_open for tmg in tmgs))
+        super().__init__(**kwargs)
+
+
+def _values(queryset=None, node_cls=None, extra_fields=None):
+    return queryset.values(*node_cls.fields, *(extra_fields or ()))
+
+
+def get_ae_cases(subject_identifiers=None):
+    """Returns a dictionary of {subject_identifier: (AeCase, ...)} for
+    a list of subjects in four queries.
+
+    RecurrenceSymptom has no foreign key to AeInitial. A recurrence
+    report is added to the latest case of the subject reported on or
+    before it with `ae_cm_recurrence` YES, if any.
+    """
+    subject_identifiers = list(subject_identifiers)
+    followups = {}
+    for row in _values(
+            AeFollowup.objects.filter(
+                subject_identifier__in=subject_identifiers).order_by(
+                    'report_datetime'),
+            AeFollowupNode, ['ae_initial_id']):
+        followups.setdefault(row.pop('ae_initial_id'), []).append(
+            AeFollowupNode(**row))
+    tmgs = {}
+    for row in _values(
+            AeTmg.objects.filter(
+                subject_identifier__in=subject_identifiers).order_by(
+                    'report_datetime'),
+            AeTmgNode, ['ae_initial_id']):
+        tmgs.setdefault(row.pop('ae_initial_id'), []).append(AeTmgNode(**row))
+    initials = list(_values(
+        AeInitial.objects.filter(
+            subject_identifier__in=subject_identifiers).order_by(
+                'subject_identifier', 'report_datetime'),
+        AeCase))
+    recurrence_initials = {}
+    for initial in initials:
+        if initial['ae_cm_recurrence'] == YES:
+            recurrence_initials.setdefault(
+                initial['subject_identifier'], []).append(initial)
+    recurrence_symptoms = {}
+    for row in _values(
+            RecurrenceSymptom.objects.filter(
+                subject_identifier__in=subject_identifiers).order_by(
+                    'report_datetime'),
+            RecurrenceSymptomNode, ['subject_identifier']):
+        subject_identifier = row.pop('subject_identifier')
+        candidates = [
+            initial for initial in recurrence_initials.get(subject_identifier, [])
+            if initial['report_datetime'] <= row['report_datetime']]
+        if candidates:
+            recurrence_symptoms.setdefault(candidates[-1]['pk'], []).append(
+                RecurrenceSymptomNode(**row))
+    ae_cases = {subject_identifier: [] for subject_identifier in subject_identifiers}
+    for initial in initials:
+        ae_cases[initial['subject_identifier']].append(AeCase(
+            followups=followups.get(initial['pk']),
+            tmgs=tmgs.get(initial['pk']),
+            recurrence_symptoms=recurrence_symptoms.get(initial['pk']),
+            **initial))
+    return {k: tuple(v) for k, v in ae_cases.items()}
@@ -7,6 +7,17 @@ class AppConfig(DjangoApponfig):
     name = 'ambition_ae'
     verbose_name = 'Ambition Adverse Events'
 
+    def ready(self):
+        from edc_sync.transaction import TransactionDeserializer
+        from .action_graph import action_graph
+        from .signals import subject_schedule_history_on_post_save
+        from .sync_models import prefetch_natural_keys
+        action_graph.build().validate()
+        # edc_sync and edc_sync_files apply incoming transactions with
+        # TransactionDeserializer
+        TransactionDeserializer.deserialize_transactions = prefetch_natural_keys(
+            TransactionDeserializer.deserialize_transactions)
+
 
 if settings.APP_NAME == 'ambition_ae':
 
@@ -0,0 +1,104 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.forms.models import model_to_dict
+from django.test import TestCase, override_settings
+from edc_constants.constants import CLOSED, DEAD, NO, NOT_APPLICABLE, YES
+from edc_list_data.site_list_data import site_list_data
+from model_mommy import mommy
+
+from ..admin import AeFollowupAdmin, AeInitialAdmin, AeTmgAdmin
+from ..admin import RecurrenceSymptomAdmin
+from ..admin_site import ambition_ae_admin
+from ..constants import GRADE3, GRADE4, GRADE5
+from ..forms import AeFollowupForm, AeInitialForm, AeTmgForm
+from ..forms import RecurrenceSymptomForm
+from ..models import AeFollowup, AeInitial, AeTmg, RecurrenceSymptom
+from ..tests.test_admin_queries import AdminQueriesTestMixin
+from .benchmark import BenchmarkTestMixin
+
+
+@override_settings(ROOT_URLCONF='ambition_ae.tests.urls')
+class BenchAeCascade(BenchmarkTestMixin, AdminQueriesTestMixin,
+                     AmbitionTestCaseMixin, TestCase):
+
+    """Benchmarks of the save-and-action cascade of the AE models,
+    the AE forms and the AE changelists.
+
+    The changelists are rendered as by the admin query tests, see
+    `AdminQueriesTestMixin.render_changelist`.
+
+        python manage.py test ambition_ae.benchmarks -p "bench_*.py"
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def make_ae_initial(self, **kwargs):
+        return mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier, **kwargs)
+
+    def test_ae_initial_save(self):
+        for ae_grade in [GRADE3, GRADE4, GRADE5]:
+            for sae in [YES, NO]:
+                sae_reason = NOT_APPLICABLE
+                if sae == YES:
+                    sae_reason = DEAD if ae_grade == GRADE5 else 'life_threatening'
+                self.benchmark(
+                    f'ae_initial.save.grade{ae_grade}.sae_{sae.lower()}',
+                    lambda: self.make_ae_initial(
+                        ae_grade=ae_grade, sae=sae, sae_reason=sae_reason))
+
+    def test_ae_followup_save(self):
+        for followup in [YES, NO]:
+            self.benchmark(
+                f'ae_followup.save.followup_{followup.lower()}',
+                lambda ae_initial: mommy.make_recipe(
+                    'ambition_ae.aefollowup', ae_initial=ae_initial,
+                    subject_identifier=self.subject_identifier,
+                    followup=followup),
+                setup=self.make_ae_initial)
+
+    def test_ae_tmg_close(self):
+        self.benchmark(
+            'ae_tmg.save.closed',
+            lambda ae_initial: mommy.make_recipe(
+                'ambition_ae.aetmg', ae_initial=ae_initial,
+                subject_identifier=self.subject_identifier,
+                ae_classification=ae_initial.ae_classification,
+                report_status=CLOSED),
+            setup=lambda: self.make_ae_initial(ae_grade=GRADE4))
+
+    def test_form_clean(self):
+        ae_initial = self.make_ae_initial()
+        forms = [
+            (AeInitialForm, ae_initial),
+            (AeFollowupForm, mommy.prepare_recipe(
+                'ambition_ae.aefollowup', ae_initial=ae_initial,
+                subject_identifier=self.subject_identifier)),
+            (AeTmgForm, mommy.prepare_recipe(
+                'ambition_ae.aetmg', ae_initial=ae_initial,
+                subject_identifier=self.subject_identifier)),
+            (RecurrenceSymptomForm, mommy.prepare_recipe(
+                'ambition_ae.recurrencesymptom',
+                subject_identifier=self.subject_identifier)),
+        ]
+        for form_cls, obj in forms:
+            data = model_to_dict(obj)
+            self.benchmark(
+                f'form.clean.{form_cls._meta.model._meta.model_name}',
+                lambda: form_cls(data=data).is_valid())
+
+    def test_changelist_render(self):
+        self.make_ae_followups(25)
+        self.make_ae_tmgs(25)
+        self.make_recurrence_symptoms(25)
+        for model, admin_cls, rows in [
+                (AeInitial, AeInitialAdmin, 50), (AeFollowup, AeFollowupAdmin, 25),
+                (AeTmg, AeTmgAdmin, 25),
+                (RecurrenceSymptom, RecurrenceSymptomAdmin, 25)]:
+            model_admin = admin_cls(model, ambition_ae_admin)
+            self.benchmark(
+                f'changelist.{model._meta.model_name}',
+                lambda: self.render_changelist(model_admin, rows=rows))
@@ -0,0 +1,152 @@
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from django import get_version
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from edc_base.utils import get_utcnow
+
+
+BUDGETS_PATH = os.path.join(os.path.dirname(__file__), 'budgets.json')
+OUTPUT_ENV = 'AE_BENCHMARK_OUTPUT'
+TIME_FACTOR_ENV = 'AE_BENCHMARK_TIME_FACTOR'
+UPDATE_BUDGETS_ENV = 'AE_BENCHMARK_UPDATE_BUDGETS'
+
+
+def load_budgets(path=None):
+    """Returns a dictionary of {name: {'queries': n, 'median_ms': ms}}.
+    """
+    try:
+        with open(path or BUDGETS_PATH) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def measure(func=None, setup=None, repeat=None):
+    """Returns a dictionary of the timings, in milliseconds, and the
+    maximum query count of `repeat` calls of `func`.
+
+    If given, `setup` is called before each call and its return
+    value passed to `func`. Neither its time nor its queries are
+    counted.
+    """
+    repeat = repeat or 5
+    timings = []
+    queries = 0
+    for _ in range(0, repeat):
+        args = [setup()] if setup else []
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            func(*args)
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(context.captured_queries))
+    timings.sort()
+    return dict(
+        runs=repeat,
+        queries=queries,
+        min_ms=round(timings[0], 3),
+        median_ms=round(statistics.median(timings), 3),
+        p95_ms=round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        max_ms=round(timings[-1], 3))
+
+
+def check_budget(result=None, budget=None, time_factor=None):
+    """Returns a list of messages, one per budget exceeded.
+    """
+    messages = []
+    if not budget:
+        return messages
+    if budget.get('queries') is not None and result['queries'] > budget['queries']:
+        messages.append(
+            f'{result["queries"]} queries exceeds the budget of {budget["queries"]}')
+    if budget.get('median_ms') is not None:
+        median_ms = budget['median_ms'] * (time_factor or 1.0)
+        if result['median_ms'] > median_ms:
+            messages.append(
+                f'median of {result["median_ms"]}ms exceeds the budget of '
+                f'{median_ms:.1f}ms')
+    return messages
+
+
+class BenchmarkRecorder:
+
+    """Collects the results of the benchmarks of a run and writes
+    them as JSON.
+    """
+
+    def __init__(self):
+        self.results = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    def add(self, name=None, result=None):
+        self.results[name] = result
+
+    def as_dict(self):
+        return dict(
+            created=get_utcnow().isoformat(),
+            python=sys.version.split()[0],
+            django=get_version(),
+            database=connection.vendor,
+            machine=platform.machine(),
+            results=self.results)
+
+    def write(self, path=None):
+        with open(path, 'w') as f:
+            json.dump(self.as_dict(), f, indent=2, sort_keys=True)
+
+    def write_budgets(self, path=None, headroom=None):
+        """Writes budgets from the current results, with `headroom`
+        added to the timings.
+        """
+        headroom = 1.5 if headroom is None else headroom
+        budgets = load_budgets(path)
+        budgets.update({
+            name: dict(queries=result['queries'],
+                       median_ms=round(result['median_ms'] * headroom, 1))
+            for name, result in self.results.items()})
+        with open(path or BUDGETS_PATH, 'w') as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+
+recorder = BenchmarkRecorder()
+
+
+class BenchmarkTestMixin:
+
+    """A TestCase mixin to measure a code path and fail if it
+    exceeds its budget in `budgets.json`.
+
+    Set AE_BENCHMARK_OUTPUT to a path to write the results as JSON,
+    AE_BENCHMARK_TIME_FACTOR to scale the time budgets for a slower
+    machine and AE_BENCHMARK_UPDATE_BUDGETS to rewrite `budgets.json`
+    from the results instead of checking them.
+    """
+
+    benchmark_repeat = 5
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        if os.environ.get(OUTPUT_ENV):
+            recorder.write(os.environ.get(OUTPUT_ENV))
+        if os.environ.get(UPDATE_BUDGETS_ENV):
+            recorder.write_budgets()
+
+    def benchmark(self, name=None, func=None, setup=None, repeat=None):
+        result = measure(func, setup=setup, repeat=repeat or self.benchmark_repeat)
+        recorder.add(name, result)
+        if not os.environ.get(UPDATE_BUDGETS_ENV):
+            messages = check_budget(
+                result, load_budgets().get(name),
+                time_factor=float(os.environ.get(TIME_FACTOR_ENV) or 1.0))
+            if messages:
+                self.fail(f'{name}: {"; ".join(messages)}.')
+        return result
@@ -0,0 +1,51 @@
+"""Compares two benchmark result files and exits non-zero on a
+regression.
+
+    python -m ambition_ae.benchmarks.compare before.json after.json
+"""
+import argparse
+import json
+import sys
+
+
+def compare(old=None, new=None, tolerance=None):
+    """Returns a list of (name, field, old, new) for the results in
+    `new` that are slower or run more queries than in `old`.
+
+    Timings within `tolerance`, a proportion, are ignored.
+    """
+    tolerance = 0.1 if tolerance is None else tolerance
+    regressions = []
+    for name, result in sorted(new['results'].items()):
+        previous = old['results'].get(name)
+        if not previous:
+            continue
+        if result['queries'] > previous['queries']:
+            regressions.append(
+                (name, 'queries', previous['queries'], result['queries']))
+        if result['median_ms'] > previous['median_ms'] * (1 + tolerance):
+            regressions.append(
+                (name, 'median_ms', previous['median_ms'], result['median_ms']))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old', help='Path to the results of the baseline run.')
+    parser.add_argument('new', help='Path to the results of the new run.')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.1,
+        help='Proportion by which a median may increase. Default 0.1.')
+    args = parser.parse_args(argv)
+    with open(args.old) as f:
+        old = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    regressions = compare(old, new, tolerance=args.tolerance)
+    for name, field, before, after in regressions:
+        sys.stdout.write(f'{name}: {field} {before} -> {after}\n')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
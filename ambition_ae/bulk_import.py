@@ -0,0 +1,193 @@
+import csv
+import json
+import os
+
+from django.contrib.sites.models import Site
+from django.db import transaction
+from edc_action_item.models import SubjectDoesNotExist
+
+from .action_reconcile import ActionReconciler
+from .models import AeChangeLog, AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from .side_effects import on_saved, prepare_for_save
+from .subject_exists_cache import subject_exists_cache
+
+
+class BulkImportError(Exception):
+    pass
+
+
+def read_records(path=None):
+    """Yields records as dictionaries from a CSV or JSONL file.
+    """
+    _, ext = os.path.splitext(path)
+    with open(path, 'r', newline='') as f:
+        if ext == '.csv':
+            for record in csv.DictReader(f):
+                yield {k: (v if v != '' else None) for k, v in record.items()}
+        elif ext in ['.jsonl', '.json']:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            raise BulkImportError(
+                f'Unsupported file type. Expected .csv or .jsonl. Got {path}.')
+
+
+def chunked(iterable=None, chunk_size=None):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class AeBulkImporter:
+
+    """Imports AeInitial, AeFollowup, AeTmg and RecurrenceSymptom
+    records in chunks using `bulk_create`.
+
+    Rows are inserted without calling `save()`, so the fields `save()`
+    would set (tracking_identifier, subject_identifier, site) are set
+    here, the historical records are created in bulk and the side
+    effects of the save signals are run once per chunk, see
+    `side_effects.py`.
+
+    Action items are not created on insert. Call `reconcile()` once
+    all records are imported to run the actions of the imported rows
+    in the order row-by-row saves would have, AeInitial first then
+    AeTmg, AeFollowup and RecurrenceSymptom by report_datetime, see
+    `ActionReconciler`.
+
+    AeFollowup and AeTmg records refer to their AeInitial by
+    tracking identifier in the column `ae_initial`. The many-to-many
+    fields of RecurrenceSymptom are not imported.
+
+        importer = AeBulkImporter()
+        importer.import_records(AeInitial, read_records('ae_initial.csv'))
+        importer.import_records(AeFollowup, read_records('ae_followup.jsonl'))
+        importer.reconcile()
+    """
+
+    models = [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]
+    ae_initial_models = [AeFollowup, AeTmg]
+    chunk_size = 500
+
+    def __init__(self, chunk_size=None, site=None):
+        self.chunk_size = chunk_size or self.chunk_size
+        self.site = site or Site.objects.get_current()
+        self.imported = {model._meta.label_lower: [] for model in self.models}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(chunk_size={self.chunk_size})'
+
+    @property
+    def count(self):
+        return sum(len(v) for v in self.imported.values())
+
+    def import_records(self, model=None, records=None):
+        """Inserts records for model in chunks and returns the
+        number of rows inserted.
+        """
+        if model not in self.models:
+            raise BulkImportError(
+                f'Invalid model. Expected one of {self.models}. Got {model}.')
+        count = 0
+        with subject_exists_cache.memoized():
+            for chunk in chunked(records, self.chunk_size):
+                with transaction.atomic():
+                    objs = self.bulk_create(model, chunk)
+                count += len(objs)
+        return count
+
+    def bulk_create(self, model=None, records=None):
+        if model in self.ae_initial_models:
+            ae_initials = self.get_ae_initials(records)
+            subject_identifiers = set(
+                obj.subject_identifier for obj in ae_initials.values())
+        else:
+            subject_identifiers = set(r.get('subject_identifier') for r in records)
+        self.subjects_exist_or_raise(subject_identifiers)
+        objs = []
+        for record in records:
+            record = dict(record)
+            if model in self.ae_initial_models:
+                ae_initial = ae_initials[record.pop('ae_initial')]
+                record.update(
+                    ae_initial_id=ae_initial.pk,
+                    subject_identifier=ae_initial.subject_identifier)
+            obj = model(**record)
+            obj.site = self.site
+            prepare_for_save(obj)
+            if not obj.tracking_identifier:
+                obj.tracking_identifier = obj.tracking_identifier_cls(
+                    identifier_prefix=obj.tracking_identifier_prefix,
+                    identifier_type=obj._meta.label_lower).identifier
+            objs.append(obj)
+        model.objects.bulk_create(objs)
+        model.history.bulk_history_create(objs)
+        on_saved(model, objs)
+        self.imported[model._meta.label_lower].extend(
+            obj.tracking_identifier for obj in objs)
+        return objs
+
+    def get_ae_initials(self, records=None):
+        """Returns a dictionary of AeInitial instances by
+        tracking identifier for the records of a chunk.
+        """
+        tracking_identifiers = set(r.get('ae_initial') for r in records)
+        ae_initials = {
+            obj.tracking_identifier: obj for obj in AeInitial.objects.filter(
+                tracking_identifier__in=tracking_identifiers).only(
+                    'id', 'tracking_identifier', 'subject_identifier')}
+        missing = tracking_identifiers - set(ae_initials)
+        if missing:
+            raise BulkImportError(
+                f'AE Initial report does not exist. Got {sorted(missing)}.')
+        return ae_initials
+
+    def subjects_exist_or_raise(self, subject_identifiers=None):
+        missing = subject_exists_cache.get_missing(subject_identifiers)
+        if missing:
+            raise SubjectDoesNotExist(
+                f'Invalid subject identifier. Subject does not exist. '
+                f'Got {sorted(missing)}.')
+
+    def get_reconcile_queryset(self, model=None, tracking_identifiers=None):
+        qs = model.objects.filter(tracking_identifier__in=tracking_identifiers)
+        if model in self.ae_initial_models:
+            qs = qs.select_related('ae_initial')
+        return qs
+
+    def iter_imported(self):
+        """Yields imported model instances in the order row-by-row
+        saves would have processed them.
+        """
+        for tracking_identifiers in chunked(
+                self.imported[AeInitial._meta.label_lower], self.chunk_size):
+            yield from self.get_reconcile_queryset(
+                AeInitial, tracking_identifiers).order_by('report_datetime')
+        objs = []
+        for model in [AeTmg, AeFollowup, RecurrenceSymptom]:
+            for tracking_identifiers in chunked(
+                    self.imported[model._meta.label_lower], self.chunk_size):
+                objs.extend(self.get_reconcile_queryset(
+                    model, tracking_identifiers))
+        yield from sorted(objs, key=lambda obj: obj.report_datetime)
+
+    def reconcile(self):
+        """Runs the actions for all imported rows and returns the
+        number of rows reconciled.
+        """
+        count = 0
+        for objs in chunked(self.iter_imported(), self.chunk_size):
+            with transaction.atomic():
+                updated = ActionReconciler(objs, site=self.site).reconcile()
+                for model, pks in updated.items():
+                    AeChangeLog.objects.log_many(model._meta.label_lower, pks)
+            count += len(objs)
+        for tracking_identifiers in self.imported.values():
+            tracking_identifiers.clear()
+        return count
@@ -0,0 +1,132 @@
+import gzip
+import json
+import os
+
+from datetime import timedelta
+from django.apps import apps as django_apps
+from django.core import serializers
+from django.core.serializers.json import DjangoJSONEncoder
+from edc_base.utils import get_utcnow
+
+from .constants import DELETED
+from .models import AeChangeLog
+
+
+class AeChangeExporter:
+
+    """Exports the AE rows saved or deleted since a cursor, the id
+    of the last `AeChangeLog` row exported, in batches.
+
+    Only the latest change of each row in a batch is exported. Saved
+    rows are fetched with one query per model and serialized with
+    natural keys. Deleted rows, or rows deleted since the change was
+    logged, are listed by model and pk.
+
+    Changes logged in the last `lag` seconds are not exported yet so
+    that a transaction still open when the batch is read does not
+    commit a lower id behind the cursor and get skipped. The lag must
+    be longer than the longest transaction that saves an AE model,
+    for example a bulk import chunk. `lag=0` exports everything
+    logged so far, for tests.
+
+    The change log is not pruned on export since there may be more
+    than one consumer. Prune it with `AeChangeLog.objects.prune`, or
+    the `prune_ae_change_log` command, to the lowest cursor of all
+    consumers.
+
+        exporter = AeChangeExporter()
+        for payload in exporter.iter_batches(cursor=0):
+            exporter.write(payload, output_dir)
+    """
+
+    batch_size = 1000
+    lag = 300
+
+    def __init__(self, batch_size=None, lag=None, compress=None):
+        self.batch_size = batch_size or self.batch_size
+        self.lag = self.lag if lag is None else lag
+        self.compress = compress
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(batch_size={self.batch_size}, '
+                f'lag={self.lag})')
+
+    def get_changes(self, cursor=None):
+        """Returns a list of up to `batch_size` changes after the cursor.
+        """
+        qs = AeChangeLog.objects.filter(id__gt=cursor or 0)
+        if self.lag:
+            qs = qs.filter(created__lte=get_utcnow() - timedelta(seconds=self.lag))
+        return list(qs.order_by('id')[:self.batch_size])
+
+    def export_batch(self, cursor=None):
+        """Returns a payload for the batch of changes after the cursor
+        or None if there are none.
+        """
+        changes = self.get_changes(cursor)
+        if not changes:
+            return None
+        latest = {}
+        for change in changes:
+            latest[(change.model, change.object_pk)] = change.operation
+        saved = {}
+        deleted = []
+        for (model, object_pk), operation in latest.items():
+            if operation == DELETED:
+                deleted.append(dict(model=model, pk=object_pk))
+            else:
+                saved.setdefault(model, set()).add(object_pk)
+        objects = []
+        for model, object_pks in saved.items():
+            model_cls = django_apps.get_model(model)
+            objs = list(model_cls.objects.filter(pk__in=object_pks))
+            objects.extend(json.loads(serializers.serialize(
+                'json', objs,
+                use_natural_foreign_keys=True,
+                use_natural_primary_keys=True)))
+            found = set(str(obj.pk) for obj in objs)
+            deleted.extend(
+                dict(model=model, pk=object_pk)
+                for object_pk in object_pks - found)
+        return dict(
+            cursor_from=cursor or 0,
+            cursor=changes[-1].id,
+            objects=objects,
+            deleted=deleted)
+
+    def iter_batches(self, cursor=None):
+        """Yields payloads until there are no more changes.
+        """
+        while True:
+            payload = self.export_batch(cursor)
+            if not payload:
+                break
+            cursor = payload.get('cursor')
+            yield payload
+
+    def dumps(self, payload=None):
+        data = json.dumps(payload, cls=DjangoJSONEncoder).encode('utf-8')
+        if self.compress:
+            data = gzip.compress(data)
+        return data
+
+    def write(self, payload=None, output_dir=None):
+        """Writes a payload to a file named for its cursors and
+        returns the path.
+        """
+        ext = '.json.gz' if self.compress else '.json'
+        path = os.path.join(
+            output_dir,
+            f'ambition_ae_changes_{payload.get("cursor_from"):012d}_'
+            f'{payload.get("cursor"):012d}{ext}')
+        with open(path, 'wb') as f:
+            f.write(self.dumps(payload))
+        return path
+
+
+def loads(data=None):
+    """Returns a payload from bytes written by `AeChangeExporter`.
+    """
+    if data[:2] == b'\x1f\x8b':
+        data = gzip.decompress(data)
+    return json.loads(data.decode('utf-8'))
@@ -1,7 +1,7 @@
 from edc_constants.constants import NOT_APPLICABLE, OTHER, YES, NO, DEAD, LOST_TO_FOLLOWUP
 
 from .constants import GRADE3, GRADE4, GRADE5, MILD, MODERATE, SEVERE
-from .constants import SEVERITY_INCREASED_FROM_G3
+from .constants import SEVERITY_INCREASED_FROM_G3, SAVED, DELETED
 
 AE_CLASSIFICATION = (
     ('anaemia', 'Anaemia'),
@@ -98,3 +98,9 @@ YES_NO_ALREADY_ARV = (
     (NO, 'No'),
     ('on_arvs_before_enrollment', 'Already on ARVs before enrollment')
 )
+
+
+CHANGE_OPERATIONS = (
+    (SAVED, 'Saved'),
+    (DELETED, 'Deleted'),
+)
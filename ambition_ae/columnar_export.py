@@ -0,0 +1,213 @@
+import gzip
+import json
+import os
+
+from django.core.serializers.json import DjangoJSONEncoder
+from functools import partial
+
+from .history_compaction import restore_compacted_rows
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+
+
+class ColumnarExportError(Exception):
+    pass
+
+
+class ColumnarTable:
+
+    """A table to export, a queryset and the columns to read from
+    it with `values_list`.
+
+    `dictionaries` is a dictionary of {column: [(code, label), ...]}
+    for the columns to dictionary-encode. `restore` optionally takes
+    and yields the rows, for example to restore compacted history.
+    """
+
+    def __init__(self, name=None, queryset=None, columns=None, dictionaries=None,
+                 restore=None):
+        self.name = name
+        self.queryset = queryset
+        self.columns = columns
+        self.dictionaries = dictionaries or {}
+        self.restore = restore
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(name={self.name})'
+
+    @classmethod
+    def from_model(cls, model=None, name=None):
+        """Returns a table of the concrete fields of a model with
+        fields that have choices dictionary-encoded.
+
+        Reads all sites with the base manager, the default manager of
+        the AE models is `on_site`.
+        """
+        columns = []
+        dictionaries = {}
+        for field in model._meta.concrete_fields:
+            columns.append(field.attname)
+            if field.choices:
+                dictionaries[field.attname] = [
+                    (code, str(label)) for code, label in field.flatchoices]
+        return cls(
+            name=name or model._meta.label_lower,
+            queryset=model._meta.base_manager.order_by('pk'),
+            columns=columns,
+            dictionaries=dictionaries)
+
+    @classmethod
+    def from_m2m(cls, model=None, field_name=None):
+        """Returns a table of the selections of an M2M field of a
+        model, one row per selection, with the list item
+        dictionary-encoded by short_name.
+        """
+        field = model._meta.get_field(field_name)
+        through = field.remote_field.through
+        list_model = field.related_model
+        source = field.m2m_field_name()
+        target = field.m2m_reverse_field_name()
+        return cls(
+            name=f'{model._meta.label_lower}.{field_name}',
+            queryset=through.objects.order_by('pk'),
+            columns=[f'{source}_id', f'{target}__short_name'],
+            dictionaries={
+                f'{target}__short_name': list(
+                    list_model.objects.order_by('display_index', 'name').values_list(
+                        'short_name', 'name'))})
+
+
+class AeColumnarExporter:
+
+    """Exports the AE models, their history and M2M selections as
+    chunked columnar files.
+
+    Each table is read with `values_list(...).iterator()` and written
+    every `chunk_size` rows, so memory is bounded by the chunk size.
+    Each chunk is a gzipped JSON object of {column: [value, ...]}.
+
+    Text fields cleared by the history compactor are restored in the
+    history tables.
+
+    Columns with choices are dictionary-encoded, the values are
+    indexes into the column's dictionary in `manifest.json`. Values
+    not in the choices are appended to the dictionary with the value
+    as label.
+
+        exporter = AeColumnarExporter(output_dir='/tmp/ae_export')
+        manifest = exporter.export()
+    """
+
+    models = [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]
+    m2m_fields = {
+        RecurrenceSymptom: [
+            'meningitis_symptom', 'neurological', 'antibiotic_treatment']}
+    chunk_size = 5000
+    manifest_filename = 'manifest.json'
+
+    def __init__(self, output_dir=None, chunk_size=None, history=None):
+        if not output_dir or not os.path.isdir(output_dir):
+            raise ColumnarExportError(f'Invalid output folder. Got {output_dir}.')
+        self.output_dir = output_dir
+        self.chunk_size = chunk_size or self.chunk_size
+        self.history = True if history is None else history
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(output_dir={self.output_dir}, '
+                f'chunk_size={self.chunk_size})')
+
+    def get_tables(self):
+        tables = []
+        for model in self.models:
+            tables.append(ColumnarTable.from_model(model))
+            if self.history:
+                table = ColumnarTable.from_model(model.history.model)
+                table.restore = partial(
+                    restore_compacted_rows, model.history.model, table.columns)
+                tables.append(table)
+            for field_name in self.m2m_fields.get(model, []):
+                tables.append(ColumnarTable.from_m2m(model, field_name))
+        return tables
+
+    def export(self):
+        """Exports all tables and returns the manifest.
+        """
+        manifest = dict(chunk_size=self.chunk_size, tables={})
+        for table in self.get_tables():
+            manifest['tables'][table.name] = self.export_table(table)
+        path = os.path.join(self.output_dir, self.manifest_filename)
+        with open(path, 'w') as f:
+            json.dump(manifest, f, cls=DjangoJSONEncoder, indent=2)
+        return manifest
+
+    def export_table(self, table=None):
+        """Writes the chunks of a table and returns its manifest entry.
+        """
+        encoders = {
+            column: {code: index for index, (code, _) in enumerate(dictionary)}
+            for column, dictionary in table.dictionaries.items()}
+        dictionaries = {
+            column: [list(item) for item in dictionary]
+            for column, dictionary in table.dictionaries.items()}
+        positions = [
+            (index, encoders.get(column), dictionaries.get(column))
+            for index, column in enumerate(table.columns)]
+        chunks = []
+        rows = 0
+        data = self.empty_chunk(table)
+        rows_iter = table.queryset.values_list(*table.columns).iterator(
+            chunk_size=self.chunk_size)
+        if table.restore:
+            rows_iter = table.restore(rows_iter)
+        for row in rows_iter:
+            for index, encoder, dictionary in positions:
+                value = row[index]
+                if encoder is not None and value is not None:
+                    try:
+                        value = encoder[value]
+                    except KeyError:
+                        encoder[value] = len(dictionary)
+                        dictionary.append([value, str(value)])
+                        value = encoder[value]
+                data[index].append(value)
+            rows += 1
+            if rows % self.chunk_size == 0:
+                chunks.append(self.write_chunk(table, len(chunks), data))
+                data = self.empty_chunk(table)
+        if data[0] or not chunks:
+            chunks.append(self.write_chunk(table, len(chunks), data))
+        return dict(
+            columns=table.columns,
+            dictionaries=dictionaries,
+            rows=rows,
+            chunks=chunks)
+
+    def empty_chunk(self, table=None):
+        return [[] for _ in table.columns]
+
+    def write_chunk(self, table=None, number=None, data=None):
+        """Writes a chunk and returns its filename.
+        """
+        filename = f'{table.name}.{number:05d}.json.gz'
+        with gzip.open(os.path.join(self.output_dir, filename), 'wt') as f:
+            json.dump(dict(zip(table.columns, data)), f, cls=DjangoJSONEncoder)
+        return filename
+
+
+def read_table(output_dir=None, name=None, decode=None):
+    """Yields the rows of an exported table as dictionaries, with
+    dictionary-encoded columns decoded to codes if `decode`.
+    """
+    with open(os.path.join(output_dir, AeColumnarExporter.manifest_filename)) as f:
+        manifest = json.load(f)
+    table = manifest['tables'][name]
+    dictionaries = table.get('dictionaries') if decode else {}
+    for filename in table.get('chunks'):
+        with gzip.open(os.path.join(output_dir, filename), 'rt') as f:
+            data = json.load(f)
+        columns = table.get('columns')
+        for values in zip(*[data[column] for column in columns]):
+            row = dict(zip(columns, values))
+            for column, dictionary in dictionaries.items():
+                if row[column] is not None:
+                    row[column] = dictionary[row[column]][0]
+            yield row
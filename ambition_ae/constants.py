@@ -5,3 +5,5 @@ MILD = 'mild'
 MODERATE = 'moderate'
 SEVERE = 'severe'
 SEVERITY_INCREASED_FROM_G3 = 'increase_from_g3'
+SAVED = 'saved'
+DELETED = 'deleted'
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from edc_constants.constants import NO, NOT_APPLICABLE
+
+from .models import AeInitial, AeFollowup
+
+
+FOLLOWUP_ORDERING = ('-report_datetime', '-created')
+
+
+def get_current_state(ae_grade=None, followups=None):
+    """Returns a dictionary of the current state columns of an
+    AeInitial given its grade and a list of its follow-up reports, as
+    dictionaries, in report order.
+
+    The current grade is the grade of the latest follow-up that
+    changed it, otherwise the initial grade. The AE is closed if the
+    latest follow-up does not require a further follow-up.
+    """
+    state = dict(
+        latest_followup_id=None,
+        current_grade=ae_grade,
+        current_outcome=None,
+        is_closed=False,
+        closed_datetime=None)
+    for followup in followups:
+        if followup['ae_grade'] != NOT_APPLICABLE:
+            state.update(current_grade=followup['ae_grade'])
+    if followups:
+        latest = followups[-1]
+        state.update(
+            latest_followup_id=latest['id'],
+            current_outcome=latest['outcome'])
+        if latest['followup'] == NO:
+            state.update(
+                is_closed=True,
+                closed_datetime=latest['report_datetime'])
+    return state
+
+
+def get_followups(ae_initial_id=None):
+    """Returns the follow-up reports of an AeInitial, as dictionaries,
+    in report order.
+    """
+    return list(reversed(AeFollowup.objects.filter(
+        ae_initial_id=ae_initial_id).order_by(*FOLLOWUP_ORDERING).values(
+            'id', 'ae_grade', 'outcome', 'followup', 'report_datetime')))
+
+
+def set_current_state(ae_initial=None):
+    """Sets the current state columns of an AeInitial instance about
+    to be saved from its follow-up reports in the database.
+
+    Called on pre_save so that a save never writes back the values
+    held in memory, which are stale once a follow-up is saved.
+    """
+    followups = [] if ae_initial._state.adding else get_followups(ae_initial.pk)
+    for attr, value in get_current_state(ae_initial.ae_grade, followups).items():
+        setattr(ae_initial, attr, value)
+
+
+def update_current_state(ae_initial_id=None):
+    """Recomputes and saves the current state columns of an AeInitial.
+
+    The AeInitial row is locked so that follow-ups saved concurrently
+    are applied in turn. Saved with `update()`, no historical record
+    or action is created.
+    """
+    with transaction.atomic():
+        ae_grade = AeInitial.objects.select_for_update().filter(
+            pk=ae_initial_id).values_list('ae_grade', flat=True).first()
+        if ae_grade is None:
+            return None
+        state = get_current_state(ae_grade, get_followups(ae_initial_id))
+        AeInitial.objects.filter(pk=ae_initial_id).update(**state)
+    return state
+
+
+def repair_current_state(queryset=None, ae_followup_model=None):
+    """Recomputes the current state columns of the AeInitial
+    instances of a queryset in two UPDATE statements and returns the
+    number of rows updated.
+
+    Pass `ae_followup_model` to use another follow-up model.
+    """
+    queryset = AeInitial.objects.all() if queryset is None else queryset
+    ae_followup_model = ae_followup_model or AeFollowup
+    followups = ae_followup_model.objects.filter(
+        ae_initial=OuterRef('pk')).order_by(*FOLLOWUP_ORDERING)
+    with transaction.atomic():
+        updated = queryset.update(
+            latest_followup_id=Subquery(followups.values('pk')[:1]),
+            current_outcome=Subquery(followups.values('outcome')[:1]),
+            current_grade=Coalesce(
+                Subquery(followups.exclude(
+                    ae_grade=NOT_APPLICABLE).values('ae_grade')[:1]),
+                F('ae_grade')),
+            is_closed=False,
+            closed_datetime=None)
+        queryset.filter(
+            latest_followup_id__in=ae_followup_model.objects.filter(
+                followup=NO).values('pk')).update(
+            is_closed=True,
+            closed_datetime=Subquery(ae_followup_model.objects.filter(
+                pk=OuterRef('latest_followup_id')).values('report_datetime')[:1]))
+    return updated
@@ -0,0 +1,60 @@
+import hashlib
+
+from .versioned_cache import VersionedCache
+
+
+class DateRollup(VersionedCache):
+
+    """A cache of the date aggregates the admin date hierarchy runs
+    on a changelist queryset, `dates()` and `aggregate()`.
+
+    Entries are keyed on the model, a version and the SQL of the
+    queryset, so a rollup is never older than the last change, see
+    `VersionedCache`.
+    """
+
+    key_prefix = 'ambition_ae.date_rollup'
+
+    def get_key(self, queryset=None, *args):
+        sql = str(queryset.query).encode('utf-8')
+        digest = hashlib.md5(sql + repr(args).encode('utf-8')).hexdigest()
+        model = queryset.model
+        return (f'{self.key_prefix}.{model._meta.label_lower}.'
+                f'{self.get_version(model)}.{digest}')
+
+    def get_or_set(self, key=None, func=None):
+        value = self.cache.get(key)
+        if value is None:
+            value = func()
+            self.cache.set(key, value, self.timeout)
+        return value
+
+    def dates(self, queryset=None, field_name=None, kind=None, order='ASC'):
+        return self.get_or_set(
+            self.get_key(queryset, 'dates', field_name, kind, order),
+            lambda: list(queryset.dates(field_name, kind, order=order)))
+
+    def aggregate(self, queryset=None, **kwargs):
+        return self.get_or_set(
+            self.get_key(queryset, 'aggregate', sorted(kwargs.items())),
+            lambda: queryset.aggregate(**kwargs))
+
+
+class RollupQuerySet:
+
+    """Wraps a queryset so that `dates()` and `aggregate()` are read
+    from the rollup.
+    """
+
+    def __init__(self, queryset=None, rollup=None):
+        self.queryset = queryset
+        self.rollup = rollup or date_rollup
+
+    def dates(self, field_name, kind, order='ASC'):
+        return self.rollup.dates(self.queryset, field_name, kind, order=order)
+
+    def aggregate(self, **kwargs):
+        return self.rollup.aggregate(self.queryset, **kwargs)
+
+
+date_rollup = DateRollup()
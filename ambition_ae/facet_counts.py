@@ -0,0 +1,42 @@
+import hashlib
+
+from django.db.models import Count
+
+from .versioned_cache import VersionedCache
+
+
+class FacetCounts(VersionedCache):
+
+    """A cache of the counts of the options of the admin list
+    filters, computed for all options in one aggregate query.
+
+    Entries are keyed on the model, the site, a version and the
+    lookups, see `VersionedCache`.
+    """
+
+    key_prefix = 'ambition_ae.facet_counts'
+
+    def get_key(self, model=None, site_id=None, lookups=None):
+        digest = hashlib.md5(
+            repr(sorted((k, str(q)) for k, q in lookups.items())).encode('utf-8')).hexdigest()
+        return (f'{self.key_prefix}.{model._meta.label_lower}.{site_id}.'
+                f'{self.get_version(model)}.{digest}')
+
+    def get_counts(self, queryset=None, lookups=None, site_id=None):
+        """Returns a dictionary of {key: count} for a dictionary of
+        {key: Q}.
+        """
+        if not lookups:
+            return {}
+        key = self.get_key(queryset.model, site_id, lookups)
+        counts = self.cache.get(key)
+        if counts is None:
+            aliases = {f'facet_{index}': k for index, k in enumerate(lookups)}
+            row = queryset.order_by().aggregate(**{
+                alias: Count('pk', filter=lookups[k]) for alias, k in aliases.items()})
+            counts = {k: row[alias] for alias, k in aliases.items()}
+            self.cache.set(key, counts, self.timeout)
+        return counts
+
+
+facet_counts = FacetCounts()
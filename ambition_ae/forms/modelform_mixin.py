@@ -1,7 +1,7 @@
 from django import forms
 from edc_base.sites.forms import SiteModelFormMixin
-from django.core.exceptions import ObjectDoesNotExist
-from edc_registration.models import RegisteredSubject
+
+from ..subject_exists_cache import subject_exists_cache
 
 
 class ModelFormMixin(SiteModelFormMixin):
@@ -9,10 +9,7 @@ class ModelFormMixin(SiteModelFormMixin):
     def clean(self):
         cleaned_data = super().clean()
         subject_identifier = cleaned_data.get('subject_identifier')
-        try:
-            RegisteredSubject.objects.get(
-                subject_identifier=subject_identifier)
-        except ObjectDoesNotExist:
+        if not subject_exists_cache.exists(subject_identifier):
             raise forms.ValidationError(
                 {'subject_identifier': 'Invalid.'})
         return cleaned_data
@@ -0,0 +1,277 @@
+from itertools import groupby
+from django.db import transaction
+
+from .bulk_import import chunked
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from .models import CompactedHistoryField
+
+
+class HistoryCompactor:
+
+    """Compacts the historical records of an AE model.
+
+    Text fields unchanged from the previous record of the same
+    object are cleared and a `CompactedHistoryField` points to the
+    record holding the value. Empty values are left as is.
+
+    Compacted fields are restored by every reader of the historical
+    records in this app: the `instance` of a historical record (used
+    by `history.as_of`, the admin history form and revert view), the
+    history diffs and the columnar export, see `restore_compacted`
+    and `restore_compacted_rows`. Code that reads the history tables
+    directly, for example with `values()` or SQL, must restore them
+    too.
+
+    If `squash_before` is set, runs of consecutive machine-generated
+    records, changes (`~`) saved without a user, dated before
+    `squash_before` are squashed to the last record of the run. The
+    intermediate records of a squashed run are deleted, all other
+    records are kept and reconstructed exactly. `as_of` a date within
+    a squashed run, before its last record, returns the version
+    before the run, not the intermediate version saved at that date.
+
+    Objects are processed `batch_size` at a time, each batch in a
+    transaction, so the compactor can be stopped and rerun.
+
+    Run on the central server only. Historical records are queued for
+    edc_sync when saved, before they can be compacted, and the
+    compactor updates them with `update()`, which queues nothing.
+    """
+
+    batch_size = 500
+
+    def __init__(self, model=None, batch_size=None, squash_before=None):
+        self.model = model
+        self.history_model = model.history.model
+        self.label_lower = self.history_model._meta.label_lower
+        self.batch_size = batch_size or self.batch_size
+        self.squash_before = squash_before
+        self.text_fields = [
+            field.attname for field in self.history_model._meta.concrete_fields
+            if field.get_internal_type() == 'TextField']
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(model={self.model._meta.label_lower})'
+
+    def compact(self):
+        """Compacts all records and returns a dictionary of the number
+        of records squashed and fields compacted.
+        """
+        counts = dict(squashed=0, compacted=0)
+        ids = (self.history_model.objects.order_by('id').values_list(
+            'id', flat=True).distinct().iterator())
+        for object_ids in chunked(ids, self.batch_size):
+            with transaction.atomic():
+                if self.squash_before:
+                    counts['squashed'] += self.squash(object_ids)
+                counts['compacted'] += self.compact_text(object_ids)
+        return counts
+
+    def get_rows(self, object_ids=None):
+        """Returns a list of lists of records as dictionaries, one per
+        object, in history order.
+        """
+        rows = list(self.history_model.objects.filter(id__in=object_ids).order_by(
+            'id', 'history_date', 'history_id').values(
+                'history_id', 'id', 'history_date', 'history_type',
+                'history_user_id', *self.text_fields))
+        for row in rows:
+            row['history_id'] = str(row['history_id'])
+        return [list(g) for _, g in groupby(rows, key=lambda row: row['id'])]
+
+    def get_markers(self, history_ids=None):
+        """Returns a dictionary of {(history_id, field_name): marker}.
+        """
+        return {
+            (obj.history_id, obj.field_name): obj
+            for obj in CompactedHistoryField.objects.filter(
+                history_model=self.label_lower, history_id__in=history_ids)}
+
+    def is_machine_generated(self, row=None):
+        return row['history_type'] == '~' and row['history_user_id'] is None
+
+    def compact_text(self, object_ids=None):
+        """Clears unchanged text fields and returns the number of
+        fields cleared.
+        """
+        objects = self.get_rows(object_ids)
+        markers = self.get_markers(
+            [row['history_id'] for rows in objects for row in rows])
+        new_markers = []
+        cleared = {field: [] for field in self.text_fields}
+        for rows in objects:
+            last = {}
+            for row in rows:
+                history_id = row['history_id']
+                for field in self.text_fields:
+                    value = row[field]
+                    if (history_id, field) in markers:
+                        continue
+                    if value and field in last and last[field][0] == value:
+                        new_markers.append(CompactedHistoryField(
+                            history_model=self.label_lower,
+                            history_id=history_id,
+                            field_name=field,
+                            source_history_id=last[field][1]))
+                        cleared[field].append(history_id)
+                    else:
+                        last[field] = (value, history_id)
+        CompactedHistoryField.objects.bulk_create(new_markers)
+        for field, history_ids in cleared.items():
+            if history_ids:
+                self.history_model.objects.filter(
+                    history_id__in=history_ids).update(**{field: ''})
+        return len(new_markers)
+
+    def squash(self, object_ids=None):
+        """Deletes all but the last record of runs of machine-generated
+        records before `squash_before` and returns the number deleted.
+        """
+        objects = self.get_rows(object_ids)
+        deleted = []
+        for rows in objects:
+            run = []
+            for row in rows + [None]:
+                if (row and self.is_machine_generated(row)
+                        and row['history_date'] < self.squash_before):
+                    run.append(row)
+                else:
+                    deleted.extend(run[:-1])
+                    run = []
+        if not deleted:
+            return 0
+        self.repoint_markers(objects, deleted)
+        self.history_model.objects.filter(
+            history_id__in=[row['history_id'] for row in deleted]).delete()
+        return len(deleted)
+
+    def repoint_markers(self, objects=None, deleted=None):
+        """Moves the values of records about to be deleted that are
+        sources of compacted fields to the first remaining record
+        that refers to them.
+        """
+        deleted_ids = set(row['history_id'] for row in deleted)
+        CompactedHistoryField.objects.filter(
+            history_model=self.label_lower, history_id__in=deleted_ids).delete()
+        sources = CompactedHistoryField.objects.filter(
+            history_model=self.label_lower, source_history_id__in=deleted_ids)
+        if not sources.exists():
+            return
+        order = {
+            row['history_id']: index
+            for rows in objects for index, row in enumerate(rows)}
+        values = {row['history_id']: row for row in deleted}
+        markers = {}
+        for marker in sources:
+            markers.setdefault(
+                (marker.source_history_id, marker.field_name), []).append(marker)
+        for (source_history_id, field), group in markers.items():
+            group.sort(key=lambda marker: order[marker.history_id])
+            new_source = group[0]
+            self.history_model.objects.filter(
+                history_id=new_source.history_id).update(
+                    **{field: values[source_history_id][field]})
+            new_source.delete()
+            CompactedHistoryField.objects.filter(
+                pk__in=[marker.pk for marker in group[1:]]).update(
+                    source_history_id=new_source.history_id)
+
+
+def restore_compacted(history_objs=None):
+    """Sets the compacted text fields of a list of historical records
+    of one model to their values and returns the list.
+    """
+    history_objs = list(history_objs)
+    pending = [obj for obj in history_objs
+               if not getattr(obj, '_compacted_restored', False)]
+    if not pending:
+        return history_objs
+    for obj in pending:
+        obj._compacted_restored = True
+    history_model = pending[0].__class__
+    label_lower = history_model._meta.label_lower
+    markers = CompactedHistoryField.objects.filter(
+        history_model=label_lower,
+        history_id__in=[str(obj.history_id) for obj in pending])
+    by_source = {}
+    for marker in markers:
+        by_source.setdefault(marker.source_history_id, []).append(marker)
+    if not by_source:
+        return history_objs
+    fields = set(marker.field_name for marker in markers)
+    sources = {
+        str(row['history_id']): row
+        for row in history_model.objects.filter(
+            history_id__in=list(by_source)).values('history_id', *fields)}
+    objs = {str(obj.history_id): obj for obj in pending}
+    for source_history_id, group in by_source.items():
+        for marker in group:
+            setattr(objs[marker.history_id], marker.field_name,
+                    sources[source_history_id][marker.field_name])
+    return history_objs
+
+
+def restore_compacted_rows(history_model=None, columns=None, rows=None,
+                           chunk_size=None):
+    """Yields the `values_list` rows of a historical model with the
+    compacted text fields restored, `chunk_size` rows at a time.
+
+    `columns` are the columns of the rows and must include
+    `history_id`.
+    """
+    label_lower = history_model._meta.label_lower
+    index = {column: position for position, column in enumerate(columns)}
+    history_id_index = index['history_id']
+    for chunk in chunked(rows, chunk_size or HistoryCompactor.batch_size):
+        markers = {}
+        for marker in CompactedHistoryField.objects.filter(
+                history_model=label_lower,
+                history_id__in=[str(row[history_id_index]) for row in chunk],
+                field_name__in=list(index)):
+            markers.setdefault(marker.history_id, []).append(marker)
+        if not markers:
+            yield from chunk
+            continue
+        fields = set(marker.field_name for group in markers.values()
+                     for marker in group)
+        source_history_ids = set(marker.source_history_id for group in markers.values()
+                                 for marker in group)
+        sources = {
+            str(row['history_id']): row
+            for row in history_model.objects.filter(
+                history_id__in=source_history_ids).values('history_id', *fields)}
+        for row in chunk:
+            group = markers.get(str(row[history_id_index]))
+            if group:
+                row = list(row)
+                for marker in group:
+                    row[index[marker.field_name]] = (
+                        sources[marker.source_history_id][marker.field_name])
+                row = tuple(row)
+            yield row
+
+
+def as_of(model=None, pk=None, date=None):
+    """Returns the instance of a model as it was at `date` or None,
+    like `history.as_of`, with compacted fields restored.
+
+    Not exact for a date within a squashed run, see `HistoryCompactor`.
+    """
+    history_obj = model.history.filter(
+        id=pk, history_date__lte=date).order_by(
+            '-history_date', '-history_id').first()
+    if not history_obj or history_obj.history_type == '-':
+        return None
+    return history_obj.instance
+
+
+def compact_history(models=None, batch_size=None, squash_before=None):
+    """Compacts the history of the AE models and returns a dictionary
+    of counts by model.
+    """
+    models = models or [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]
+    return {
+        model._meta.label_lower: HistoryCompactor(
+            model=model, batch_size=batch_size,
+            squash_before=squash_before).compact()
+        for model in models}
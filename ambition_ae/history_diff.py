@@ -0,0 +1,89 @@
+from django.core.cache import cache as default_cache
+from django.utils.functional import cached_property
+
+from .history_compaction import restore_compacted
+
+
+class HistoryDiff:
+
+    """The field-level changes between a historical record and the
+    previous version of the same object.
+
+    `changes` is computed when first accessed, for example when a
+    template renders it, and kept in the cache. Historical records
+    are not edited so a diff is keyed on the pair of history ids.
+    """
+
+    key_prefix = 'ambition_ae.history_diff'
+    timeout = 86400
+    exclude_fields = [
+        'modified', 'user_modified', 'hostname_modified', 'revision']
+
+    def __init__(self, record=None, previous=None, cache=None):
+        self.record = record
+        self.previous = previous
+        self.cache = cache or default_cache
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(record={self.record.history_id})'
+
+    @property
+    def key(self):
+        previous_id = self.previous.history_id if self.previous else None
+        return (f'{self.key_prefix}.{self.record._meta.label_lower}.'
+                f'{self.record.history_id}.{previous_id}')
+
+    @property
+    def fields(self):
+        return [
+            field for field in self.record.instance_type._meta.concrete_fields
+            if field.attname not in self.exclude_fields]
+
+    @cached_property
+    def changes(self):
+        """Returns a list of (verbose_name, old value, new value) or
+        an empty list for the first version.
+        """
+        if not self.previous:
+            return []
+        changes = self.cache.get(self.key)
+        if changes is None:
+            changes = self.get_changes()
+            self.cache.set(self.key, changes, self.timeout)
+        return changes
+
+    def get_changes(self):
+        changes = []
+        for field in self.fields:
+            old = getattr(self.previous, field.attname, None)
+            new = getattr(self.record, field.attname, None)
+            if old != new:
+                changes.append((
+                    str(field.verbose_name),
+                    self.display_value(field, old),
+                    self.display_value(field, new)))
+        return changes
+
+    def display_value(self, field=None, value=None):
+        if value is None:
+            return None
+        if field.choices:
+            return str(dict(field.flatchoices).get(value, value))
+        return str(value)
+
+
+def get_history_diffs(queryset=None, start=None, stop=None, cache=None):
+    """Returns a list of `HistoryDiff` for the historical records
+    `queryset[start:stop]`, newest first.
+
+    Fetches one extra record for the previous version of the oldest
+    record in the slice.
+    """
+    records = restore_compacted(
+        queryset.order_by('-history_date', '-history_id')[start:stop + 1])
+    return [
+        HistoryDiff(
+            record=record,
+            previous=records[index + 1] if index + 1 < len(records) else None,
+            cache=cache)
+        for index, record in enumerate(records[:stop - start])]
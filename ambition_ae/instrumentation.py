@@ -0,0 +1,294 @@
+import logging
+import threading
+import time
+
+from bisect import bisect_left
+from collections import OrderedDict
+from contextlib import ExitStack, contextmanager
+from django.conf import settings
+from django.db import connections
+from functools import wraps
+
+
+logger = logging.getLogger(__name__)
+
+VIEW = 'view'
+ACTION = 'action'
+SAVE = 'save'
+
+# upper bounds, in seconds, of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class Frame:
+
+    """The queries, database time and elapsed time of one
+    instrumented block.
+    """
+
+    def __init__(self, kind=None, name=None, budget=None):
+        self.kind = kind
+        self.name = name
+        self.budget = budget
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.elapsed_seconds = 0.0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(kind={self.kind}, name={self.name})'
+
+    @property
+    def python_seconds(self):
+        return max(self.elapsed_seconds - self.db_seconds, 0.0)
+
+
+class Histogram:
+
+    """A latency histogram with fixed buckets.
+    """
+
+    def __init__(self, buckets=None):
+        self.buckets = tuple(buckets or LATENCY_BUCKETS)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(count={self.count})'
+
+    def observe(self, seconds=None):
+        self.counts[bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative_counts(self):
+        """Returns a list of (upper bound, count) with the count of
+        observations less than or equal to the bound.
+        """
+        total = 0
+        counts = []
+        for bound, count in zip(self.buckets + (float('inf'), ), self.counts):
+            total += count
+            counts.append((bound, total))
+        return counts
+
+    def as_dict(self):
+        return dict(
+            count=self.count,
+            sum=self.sum,
+            buckets=[('+Inf' if bound == float('inf') else bound, count)
+                     for bound, count in self.cumulative_counts()])
+
+
+class Instrumentation:
+
+    """Counts the SQL queries, database time and Python time of
+    views, actions and model saves.
+
+    Blocks are measured with the `instrument` context manager, used
+    by `QueryInstrumentationMiddleware`, `InstrumentedModelMixin` and
+    `instrument_next_actions`. Queries are counted by a database
+    execute wrapper, so DEBUG is not required. Nested blocks each
+    count the queries they contain.
+
+    Totals are kept per process by (kind, name) and rendered in the
+    Prometheus text format by `MetricsView`.
+
+    The hooks of the action cascade, for example `delete_if_new`,
+    are timed into latency histograms by (hook, action name, branch),
+    see `time_action_hook`. `dump_histograms` returns them as a list
+    of dictionaries.
+
+    A block that runs more queries than its budget, declared by name
+    in settings.AE_QUERY_BUDGETS, is logged or, if
+    settings.AE_QUERY_BUDGETS_STRICT, raises QueryBudgetExceeded.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.totals = OrderedDict()
+        self.histograms = OrderedDict()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    @property
+    def stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def execute(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            for frame in self.stack:
+                frame.queries += 1
+                frame.db_seconds += elapsed
+
+    @contextmanager
+    def instrument(self, kind=None, name=None, budget=None):
+        """A context manager that measures a block and yields its
+        `Frame`. The name may be set on the frame within the block.
+        A frame without a name is not recorded.
+        """
+        frame = Frame(kind=kind, name=name, budget=budget)
+        with ExitStack() as stack:
+            if not self.stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(self.execute))
+            self.stack.append(frame)
+            start = time.perf_counter()
+            try:
+                yield frame
+            finally:
+                frame.elapsed_seconds = time.perf_counter() - start
+                self.stack.remove(frame)
+        if frame.name:
+            self.record(frame)
+            self.check_budget(frame)
+
+    def record(self, frame=None):
+        with self._lock:
+            totals = self.totals.setdefault(
+                (frame.kind, frame.name),
+                dict(calls=0, queries=0, db_seconds=0.0, python_seconds=0.0,
+                     budget_exceeded=0))
+            totals['calls'] += 1
+            totals['queries'] += frame.queries
+            totals['db_seconds'] += frame.db_seconds
+            totals['python_seconds'] += frame.python_seconds
+
+    def get_budget(self, frame=None):
+        if frame.budget is not None:
+            return frame.budget
+        return getattr(settings, 'AE_QUERY_BUDGETS', {}).get(frame.name)
+
+    def check_budget(self, frame=None):
+        budget = self.get_budget(frame)
+        if budget is None or frame.queries <= budget:
+            return
+        with self._lock:
+            self.totals[(frame.kind, frame.name)]['budget_exceeded'] += 1
+        message = (f'Query budget exceeded for {frame.kind} {frame.name}. '
+                   f'Got {frame.queries} queries, budget is {budget}.')
+        if getattr(settings, 'AE_QUERY_BUDGETS_STRICT', False):
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+    def observe(self, hook=None, action_name=None, branch=None, seconds=None):
+        key = (hook, action_name, branch or 'none')
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def dump_histograms(self):
+        """Returns a list of dictionaries, one per histogram, slowest
+        total first.
+        """
+        with self._lock:
+            histograms = [
+                dict(hook=hook, action_name=action_name, branch=branch,
+                     **histogram.as_dict())
+                for (hook, action_name, branch), histogram in self.histograms.items()]
+        return sorted(histograms, key=lambda h: h['sum'], reverse=True)
+
+    def reset(self):
+        with self._lock:
+            self.totals.clear()
+            self.histograms.clear()
+
+    def render(self):
+        """Returns the totals and the histograms in the Prometheus
+        text format.
+        """
+        metrics = [
+            ('calls', 'ambition_ae_calls_total',
+             'Number of instrumented calls.'),
+            ('queries', 'ambition_ae_queries_total',
+             'Number of SQL queries.'),
+            ('db_seconds', 'ambition_ae_db_seconds_total',
+             'Time spent in SQL queries.'),
+            ('python_seconds', 'ambition_ae_python_seconds_total',
+             'Time spent outside of SQL queries.'),
+            ('budget_exceeded', 'ambition_ae_query_budget_exceeded_total',
+             'Number of calls that exceeded their query budget.')]
+        with self._lock:
+            totals = [(key, dict(value)) for key, value in self.totals.items()]
+        lines = []
+        for field, metric, help_text in metrics:
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} counter')
+            for (kind, name), value in totals:
+                lines.append(
+                    f'{metric}{{kind="{kind}",name="{escape(name)}"}} {value[field]}')
+        metric = 'ambition_ae_action_hook_seconds'
+        lines.append(f'# HELP {metric} Latency of the action cascade hooks.')
+        lines.append(f'# TYPE {metric} histogram')
+        for histogram in self.dump_histograms():
+            labels = (f'hook="{histogram["hook"]}",'
+                      f'action="{escape(histogram["action_name"])}",'
+                      f'branch="{escape(histogram["branch"])}"')
+            for bound, count in histogram['buckets']:
+                lines.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{metric}_sum{{{labels}}} {histogram["sum"]}')
+            lines.append(f'{metric}_count{{{labels}}} {histogram["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value=None):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"')
+
+
+instrumentation = Instrumentation()
+
+
+def time_action_hook(hook=None):
+    """A decorator for a method of an Action that times each call
+    into the histogram of (hook, action name, action branch).
+
+    A call made while the same hook of the same action is already
+    being timed, for example an override calling `super()`, is not
+    timed again.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(action, *args, **kwargs):
+            running = action.__dict__.setdefault('_timed_hooks', set())
+            if hook in running:
+                return method(action, *args, **kwargs)
+            running.add(hook)
+            start = time.perf_counter()
+            try:
+                return method(action, *args, **kwargs)
+            finally:
+                running.discard(hook)
+                instrumentation.observe(
+                    hook, action.name, getattr(action, 'branch', None),
+                    time.perf_counter() - start)
+        wrapper.timed_hook = hook
+        return wrapper
+    return decorator
+
+
+def instrument_next_actions(get_next_actions):
+    """A decorator for `Action.get_next_actions` that counts its
+    queries and times it into the latency histograms.
+    """
+    timed = time_action_hook('get_next_actions')(get_next_actions)
+
+    @wraps(get_next_actions)
+    def wrapper(action, *args, **kwargs):
+        with instrumentation.instrument(ACTION, action.name):
+            return timed(action, *args, **kwargs)
+    return wrapper
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from ...query_plans import QueryPlanBenchmark
+
+
+class Command(BaseCommand):
+
+    help = ('Report the query plan and timing of the AE admin and action '
+            'queries. Only use on a development database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', dest='seed', type=int, default=0,
+            help='Number of synthetic subjects to generate AE reports for first.')
+        parser.add_argument(
+            '--repeat', dest='repeat', type=int, default=None,
+            help='Number of times to run each query.')
+        parser.add_argument(
+            '--compare', dest='compare', action='store_true', default=False,
+            help='Report before and after, dropping and recreating the indexes.')
+
+    def handle(self, *args, **options):
+        benchmark = QueryPlanBenchmark(repeat=options.get('repeat'))
+        if options.get('seed'):
+            counts = benchmark.seed(subjects=options.get('seed'))
+            for label_lower, count in counts.items():
+                self.stdout.write(f'Inserted {count} synthetic {label_lower} rows.')
+        if options.get('compare'):
+            before, after = benchmark.compare()
+            self.write_results('Without indexes', before)
+            self.write_results('With indexes', after)
+        else:
+            self.write_results('Query plans', benchmark.run_queries())
+
+    def write_results(self, title=None, results=None):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, plan, elapsed in results:
+            self.stdout.write(f'  {name}: {elapsed:.2f}ms')
+            for row in plan:
+                self.stdout.write(f'    {row}')
@@ -0,0 +1,35 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from edc_base.utils import get_utcnow
+
+from ...history_compaction import compact_history
+
+
+class Command(BaseCommand):
+
+    help = ('Compact the historical records of the AE models. Unchanged '
+            'text fields are stored once and, with --squash-days, runs of '
+            'machine-generated records are squashed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', dest='batch_size', type=int, default=None,
+            help='Number of objects per transaction.')
+        parser.add_argument(
+            '--squash-days', dest='squash_days', type=int, default=None,
+            help=('Squash runs of machine-generated records older than '
+                  'SQUASH_DAYS days to the last record of the run. The '
+                  'versions within a squashed run are no longer available '
+                  'to as_of.'))
+
+    def handle(self, *args, **options):
+        squash_before = None
+        if options.get('squash_days') is not None:
+            squash_before = get_utcnow() - timedelta(days=options.get('squash_days'))
+        counts = compact_history(
+            batch_size=options.get('batch_size'), squash_before=squash_before)
+        for label_lower, count in counts.items():
+            self.stdout.write(
+                f'  {label_lower}: {count.get("squashed")} records squashed, '
+                f'{count.get("compacted")} fields compacted')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,69 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...change_export import AeChangeExporter
+
+
+class Command(BaseCommand):
+
+    help = ('Export AE rows saved or deleted since the last export. '
+            'The cursor is kept in OUTPUT_DIR/.cursor so the export '
+            'resumes from where it stopped.')
+
+    cursor_filename = '.cursor'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', dest='output_dir', required=True,
+            help='Folder to write the export files and cursor to.')
+        parser.add_argument(
+            '--cursor', dest='cursor', type=int, default=None,
+            help='Export changes after this cursor instead of the saved cursor.')
+        parser.add_argument(
+            '--batch-size', dest='batch_size', type=int, default=None,
+            help='Number of changes per file.')
+        parser.add_argument(
+            '--lag', dest='lag', type=int, default=None,
+            help=('Skip changes logged in the last LAG seconds. Defaults '
+                  f'to {AeChangeExporter.lag}.'))
+        parser.add_argument(
+            '--compress', dest='compress', action='store_true', default=False,
+            help='Gzip the export files.')
+
+    def handle(self, *args, **options):
+        output_dir = options.get('output_dir')
+        if not os.path.isdir(output_dir):
+            raise CommandError(f'Invalid output folder. Got {output_dir}.')
+        cursor_path = os.path.join(output_dir, self.cursor_filename)
+        cursor = options.get('cursor')
+        if cursor is None:
+            cursor = self.read_cursor(cursor_path)
+        exporter = AeChangeExporter(
+            batch_size=options.get('batch_size'),
+            lag=options.get('lag'),
+            compress=options.get('compress'))
+        files = 0
+        for payload in exporter.iter_batches(cursor=cursor):
+            path = exporter.write(payload, output_dir)
+            cursor = payload.get('cursor')
+            self.write_cursor(cursor_path, cursor)
+            files += 1
+            self.stdout.write(
+                f'  {os.path.basename(path)}: {len(payload.get("objects"))} saved, '
+                f'{len(payload.get("deleted"))} deleted')
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {files} files. Cursor is {cursor}.'))
+
+    def read_cursor(self, path=None):
+        try:
+            with open(path, 'r') as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+
+    def write_cursor(self, path=None, cursor=None):
+        tmp_path = f'{path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(str(cursor))
+        os.replace(tmp_path, path)
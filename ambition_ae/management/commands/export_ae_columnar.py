@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from ...columnar_export import AeColumnarExporter, ColumnarExportError
+
+
+class Command(BaseCommand):
+
+    help = ('Export the AE models, their history and M2M selections as '
+            'chunked columnar files with choices dictionary-encoded.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir', dest='output_dir', required=True,
+            help='Folder to write the chunks and manifest.json to.')
+        parser.add_argument(
+            '--chunk-size', dest='chunk_size', type=int, default=None,
+            help='Number of rows per chunk.')
+        parser.add_argument(
+            '--skip-history', dest='history', action='store_false', default=True,
+            help='Do not export the historical models.')
+
+    def handle(self, *args, **options):
+        try:
+            exporter = AeColumnarExporter(
+                output_dir=options.get('output_dir'),
+                chunk_size=options.get('chunk_size'),
+                history=options.get('history'))
+        except ColumnarExportError as e:
+            raise CommandError(e)
+        manifest = exporter.export()
+        for name, table in manifest.get('tables').items():
+            self.stdout.write(
+                f'  {name}: {table.get("rows")} rows, {len(table.get("chunks"))} chunks')
+        self.stdout.write(self.style.SUCCESS('Done.'))
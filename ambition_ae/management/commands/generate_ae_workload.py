@@ -0,0 +1,85 @@
+import time
+
+from datetime import datetime
+from django.core.management.base import BaseCommand, CommandError
+
+from ...workload import AeWorkloadGenerator, WorkloadError, parse_weights
+
+
+class Command(BaseCommand):
+
+    help = ('Generate a synthetic, reproducible AE dataset that follows '
+            'the AE action rules using bulk inserts. For performance '
+            'testing, not for use on a production database.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subjects', dest='subjects', type=int, default=10,
+            help='Number of subjects.')
+        parser.add_argument(
+            '--seed', dest='seed', type=int, default=0,
+            help='Random seed.')
+        parser.add_argument(
+            '--subject-prefix', dest='subject_prefix', default=None,
+            help='Prefix of the generated subject identifiers.')
+        parser.add_argument(
+            '--max-aes', dest='max_aes', type=int, default=None,
+            help='Maximum number of AEs per subject.')
+        parser.add_argument(
+            '--max-followups', dest='max_followups', type=int, default=None,
+            help='Maximum number of follow-up reports per AE.')
+        parser.add_argument(
+            '--grade-weights', dest='grade_weights', default=None,
+            help='Relative frequency of the initial AE grades, e.g. "3:60,4:30,5:10".')
+        parser.add_argument(
+            '--sae-rate', dest='sae_rate', type=float, default=None,
+            help='Proportion of AEs that are SAEs.')
+        parser.add_argument(
+            '--death-rate', dest='death_rate', type=float, default=None,
+            help='Proportion of SAEs and of follow-up reports with death as outcome.')
+        parser.add_argument(
+            '--recurrence-rate', dest='recurrence_rate', type=float, default=None,
+            help='Proportion of AEs with a recurrence of symptoms.')
+        parser.add_argument(
+            '--start-date', dest='start_date', default=None,
+            help='Earliest report date, YYYY-MM-DD.')
+        parser.add_argument(
+            '--days', dest='days', type=int, default=None,
+            help='Number of days over which AEs are reported.')
+        parser.add_argument(
+            '--chunk-size', dest='chunk_size', type=int, default=None,
+            help='Number of subjects and of rows per bulk insert.')
+        parser.add_argument(
+            '--skip-actions', dest='skip_actions', action='store_true',
+            default=False,
+            help='Do not create action items for the generated rows.')
+
+    def handle(self, *args, **options):
+        try:
+            grade_weights = (parse_weights(options.get('grade_weights'))
+                             if options.get('grade_weights') else None)
+            start_date = (
+                datetime.strptime(options.get('start_date'), '%Y-%m-%d').date()
+                if options.get('start_date') else None)
+        except (ValueError, WorkloadError) as e:
+            raise CommandError(e)
+        generator = AeWorkloadGenerator(
+            subjects=options.get('subjects'),
+            seed=options.get('seed'),
+            subject_prefix=options.get('subject_prefix'),
+            max_aes=options.get('max_aes'),
+            max_followups=options.get('max_followups'),
+            grade_weights=grade_weights,
+            sae_rate=options.get('sae_rate'),
+            death_rate=options.get('death_rate'),
+            recurrence_rate=options.get('recurrence_rate'),
+            start_date=start_date,
+            days=options.get('days'),
+            chunk_size=options.get('chunk_size'),
+            actions=not options.get('skip_actions'))
+        start = time.time()
+        counts = generator.generate()
+        for label_lower, count in counts.items():
+            self.stdout.write(f'  {label_lower}: {count} rows')
+        elapsed = time.time() - start
+        self.stdout.write(self.style.SUCCESS(f'Done in {elapsed:.1f}s.'))
@@ -0,0 +1,50 @@
+import time
+
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+
+from ...bulk_import import AeBulkImporter, BulkImportError, read_records
+
+
+class Command(BaseCommand):
+
+    help = ('Bulk import AE Initial, AE Follow-up and AE TMG reports '
+            'from CSV or JSONL files then create their action items.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--aeinitial', dest='aeinitial', default=None,
+            help='Path to AE Initial records.')
+        parser.add_argument(
+            '--aetmg', dest='aetmg', default=None,
+            help='Path to AE TMG records.')
+        parser.add_argument(
+            '--aefollowup', dest='aefollowup', default=None,
+            help='Path to AE Follow-up records.')
+        parser.add_argument(
+            '--chunk-size', dest='chunk_size', type=int, default=None,
+            help='Number of rows per bulk insert.')
+        parser.add_argument(
+            '--skip-actions', dest='skip_actions', action='store_true',
+            default=False,
+            help='Do not create action items for the imported rows.')
+
+    def handle(self, *args, **options):
+        importer = AeBulkImporter(chunk_size=options.get('chunk_size'))
+        start = time.time()
+        for name in ['aeinitial', 'aetmg', 'aefollowup']:
+            path = options.get(name)
+            if path:
+                model = django_apps.get_model(f'ambition_ae.{name}')
+                try:
+                    count = importer.import_records(
+                        model=model, records=read_records(path))
+                except BulkImportError as e:
+                    raise CommandError(e)
+                self.stdout.write(
+                    f'Imported {count} {model._meta.verbose_name} rows.')
+        if not options.get('skip_actions'):
+            count = importer.reconcile()
+            self.stdout.write(f'Created action items for {count} rows.')
+        elapsed = time.time() - start
+        self.stdout.write(self.style.SUCCESS(f'Done in {elapsed:.1f}s.'))
@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from edc_base.utils import get_utcnow
+
+from ...models import AeChangeLog
+
+
+class Command(BaseCommand):
+
+    help = ('Delete the AE change log up to a cursor. Pass the lowest '
+            'cursor of all consumers of the change log.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cursor', dest='cursor', type=int, required=True,
+            help='Delete the changes up to and including this cursor.')
+        parser.add_argument(
+            '--keep-days', dest='keep_days', type=int, default=None,
+            help='Keep the changes logged in the last KEEP_DAYS days.')
+
+    def handle(self, *args, **options):
+        before = None
+        if options.get('keep_days') is not None:
+            before = get_utcnow() - timedelta(days=options.get('keep_days'))
+        deleted = AeChangeLog.objects.prune(
+            cursor=options.get('cursor'), before=before)
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} changes from the AE change log.'))
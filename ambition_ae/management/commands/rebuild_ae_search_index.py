@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from ...search_index import search_index
+
+
+class Command(BaseCommand):
+
+    help = 'Rebuild the search index of the AE narrative text fields.'
+
+    def handle(self, *args, **options):
+        for label_lower, count in search_index.rebuild().items():
+            self.stdout.write(f'  {label_lower}: {count} indexed')
+        self.stdout.write(self.style.SUCCESS('Done.'))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from ...current_state import repair_current_state
+from ...models import AeInitial
+
+
+class Command(BaseCommand):
+
+    help = ('Recompute the current state columns of AeInitial from the '
+            'AE follow-up reports.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subject-identifier', dest='subject_identifier', default=None,
+            help='Only repair the AE initial reports of this subject.')
+
+    def handle(self, *args, **options):
+        queryset = AeInitial.objects.all()
+        if options.get('subject_identifier'):
+            queryset = queryset.filter(
+                subject_identifier=options.get('subject_identifier'))
+        updated = repair_current_state(queryset)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed the current state of {updated} AE initial reports.'))
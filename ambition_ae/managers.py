@@ -1,9 +1,91 @@
 from django.db import models
+from edc_base.model_managers import HistoricalRecords
+from edc_identifier.managers import TrackingIdentifierManager
+
+from .natural_keys import natural_key_prefetch
+
+
+def chunked(items=None, chunk_size=None):
+    items = list(items)
+    for index in range(0, len(items), chunk_size):
+        yield items[index:index + chunk_size]
+
+
+class AeInitialManager(TrackingIdentifierManager):
+
+    chunk_size = 500
+
+    def get_by_natural_key(self, tracking_identifier):
+        obj = natural_key_prefetch.get(
+            self.model._meta.label_lower, (tracking_identifier, ))
+        if obj:
+            return obj
+        return super().get_by_natural_key(tracking_identifier)
+
+    def get_by_natural_keys(self, natural_keys=None):
+        """Returns a dictionary of instances by natural key for
+        a list of (tracking_identifier, ).
+        """
+        tracking_identifiers = set(natural_key[0] for natural_key in natural_keys)
+        objs = {}
+        for chunk in chunked(tracking_identifiers, self.chunk_size):
+            objs.update({obj.natural_key(): obj for obj in self.filter(
+                tracking_identifier__in=chunk)})
+        return objs
 
 
 class AeManager(models.Manager):
 
+    chunk_size = 500
+
     def get_by_natural_key(self, report_datetime, tracking_identifier):
+        obj = natural_key_prefetch.get(
+            self.model._meta.label_lower, (report_datetime, tracking_identifier))
+        if obj:
+            return obj
         return self.get(
             report_datetime=report_datetime,
             ae_initial__tracking_identifier=tracking_identifier)
+
+    def get_by_natural_keys(self, natural_keys=None):
+        """Returns a dictionary of instances by natural key for
+        a list of (report_datetime, tracking_identifier).
+
+        Runs one query per `chunk_size` tracking identifiers
+        instead of one per natural key.
+        """
+        natural_keys = set(natural_keys)
+        tracking_identifiers = set(
+            tracking_identifier for _, tracking_identifier in natural_keys)
+        objs = {}
+        for chunk in chunked(tracking_identifiers, self.chunk_size):
+            for obj in self.filter(
+                    ae_initial__tracking_identifier__in=chunk).select_related(
+                        'ae_initial'):
+                natural_key = obj.natural_key()
+                if natural_key in natural_keys:
+                    objs.update({natural_key: obj})
+        return objs
+
+
+class CompactedHistoricalRecords(HistoricalRecords):
+
+    """Historical records whose `instance` has the text fields
+    cleared by the history compactor restored.
+
+    `instance` is what `history.as_of`, the admin history form and
+    revert view and `history_compaction.as_of` read, so none of them
+    see, or write back, a compacted field. See `history_compaction.py`.
+    """
+
+    def get_extra_fields(self, model, fields):
+        extra_fields = super().get_extra_fields(model, fields)
+        get_instance = extra_fields['instance'].fget
+
+        def get_restored_instance(history_obj):
+            from .history_compaction import restore_compacted
+            restore_compacted([history_obj])
+            return get_instance(history_obj)
+
+        extra_fields['instance'] = property(get_restored_instance)
+        return extra_fields
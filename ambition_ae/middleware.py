@@ -0,0 +1,45 @@
+from django.urls import Resolver404, resolve
+
+from .admin_site import ambition_ae_admin
+from .instrumentation import VIEW, instrumentation
+from .subject_exists_cache import subject_exists_cache
+
+
+class SubjectExistsCacheMiddleware:
+
+    """Memoizes subject identifier lookups for the duration of
+    a request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with subject_exists_cache.memoized():
+            return self.get_response(request)
+
+
+class QueryInstrumentationMiddleware:
+
+    """Measures the queries and time of the views of the AE admin
+    site, by URL name, see `Instrumentation`.
+
+    The URL is resolved before the view is called so that only the
+    requests to the views in `namespaces` have their queries wrapped.
+    """
+
+    namespaces = [ambition_ae_admin.name]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            resolver_match = resolve(
+                request.path_info, getattr(request, 'urlconf', None))
+        except Resolver404:
+            return self.get_response(request)
+        if not set(resolver_match.namespaces) & set(self.namespaces):
+            return self.get_response(request)
+        with instrumentation.instrument(VIEW, resolver_match.view_name):
+            return self.get_response(request)
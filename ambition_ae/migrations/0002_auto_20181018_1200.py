@@ -0,0 +1,55 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(fields=['subject_identifier', 'report_datetime'], name='aeinitial_subject_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(fields=['site', 'ae_grade', 'sae'], name='aeinitial_site_grade_sae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(fields=['site', 'susar'], name='aeinitial_site_susar_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(fields=['site', 'report_datetime'], name='aeinitial_site_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aefollowup',
+            index=models.Index(fields=['ae_initial', 'report_datetime'], name='aefollowup_initial_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aefollowup',
+            index=models.Index(fields=['subject_identifier', 'report_datetime'], name='aefollowup_subject_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aefollowup',
+            index=models.Index(fields=['site', 'ae_grade'], name='aefollowup_site_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aetmg',
+            index=models.Index(fields=['ae_initial', 'report_datetime'], name='aetmg_initial_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aetmg',
+            index=models.Index(fields=['subject_identifier', 'report_datetime'], name='aetmg_subject_rdt_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aetmg',
+            index=models.Index(fields=['site', 'report_status'], name='aetmg_site_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurrencesymptom',
+            index=models.Index(fields=['subject_identifier', 'report_datetime'], name='recurrencesym_subject_rdt_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import edc_base.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0002_auto_20181018_1200'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AeChangeLog',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_pk', models.CharField(max_length=50)),
+                ('operation', models.CharField(choices=[('saved', 'Saved'), ('deleted', 'Deleted')], default='saved', max_length=10)),
+                ('created', models.DateTimeField(default=edc_base.utils.get_utcnow)),
+            ],
+            options={
+                'verbose_name': 'AE Change Log',
+                'ordering': ('id',),
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0003_aechangelog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompactedHistoryField',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('history_model', models.CharField(max_length=50)),
+                ('history_id', models.CharField(max_length=50)),
+                ('field_name', models.CharField(max_length=50)),
+                ('source_history_id', models.CharField(max_length=50)),
+            ],
+            options={
+                'verbose_name': 'Compacted History Field',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='compactedhistoryfield',
+            unique_together={('history_model', 'history_id', 'field_name')},
+        ),
+        migrations.AddIndex(
+            model_name='compactedhistoryfield',
+            index=models.Index(fields=['history_model', 'source_history_id'], name='compactedhist_source_idx'),
+        ),
+    ]
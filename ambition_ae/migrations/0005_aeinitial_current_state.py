@@ -0,0 +1,91 @@
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+AE_GRADE = [
+    ('3', 'Grade III - Severe'),
+    ('4', 'Grade 4 - Life-threatening'),
+    ('5', 'Grade 5 - Death')]
+
+AE_OUTCOME = [
+    ('continuing/update', 'Continuing/Update'),
+    ('increase_from_g3', 'Severity increased from Grade III'),
+    ('recovered', 'Recovered/Resolved'),
+    ('recovering', 'Recovering/Resolving at end of study'),
+    ('not_recovered', 'Not Recovered/Resolved at end of study'),
+    ('LTFU', 'Unknown/Lost to follow-up'),
+    ('recovered_with_sequelae', 'Recovered with sequelae'),
+    ('dead', 'Death')]
+
+
+def add_current_state_fields(model_name=None):
+    return [
+        migrations.AddField(
+            model_name=model_name,
+            name='latest_followup_id',
+            field=models.UUIDField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='current_grade',
+            field=models.CharField(
+                choices=AE_GRADE, editable=False, max_length=25, null=True),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='current_outcome',
+            field=models.CharField(
+                choices=AE_OUTCOME, editable=False, max_length=25, null=True),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='is_closed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name=model_name,
+            name='closed_datetime',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+    ]
+
+
+def backfill_current_state(apps, schema_editor):
+    """Sets the current state columns from the follow-up reports,
+    as `current_state.repair_current_state` does.
+    """
+    ae_initial_model = apps.get_model('ambition_ae', 'aeinitial')
+    ae_followup_model = apps.get_model('ambition_ae', 'aefollowup')
+    followups = ae_followup_model.objects.filter(
+        ae_initial=OuterRef('pk')).order_by('-report_datetime', '-created')
+    ae_initial_model.objects.update(
+        latest_followup_id=Subquery(followups.values('pk')[:1]),
+        current_outcome=Subquery(followups.values('outcome')[:1]),
+        current_grade=Coalesce(
+            Subquery(followups.exclude(
+                ae_grade='N/A').values('ae_grade')[:1]),
+            F('ae_grade')))
+    ae_initial_model.objects.filter(
+        latest_followup_id__in=ae_followup_model.objects.filter(
+            followup='No').values('pk')).update(
+        is_closed=True,
+        closed_datetime=Subquery(ae_followup_model.objects.filter(
+            pk=OuterRef('latest_followup_id')).values('report_datetime')[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0004_compactedhistoryfield'),
+    ]
+
+    operations = (
+        add_current_state_fields('aeinitial')
+        + add_current_state_fields('historicalaeinitial')
+        + [migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(
+                fields=['site', 'is_closed', 'current_grade'],
+                name='aeinitial_site_state_idx')),
+           migrations.RunPython(backfill_current_state, migrations.RunPython.noop)])
@@ -0,0 +1,53 @@
+from django.db import migrations, models
+
+
+AE_GRADE_LEVELS = {'3': 3, '4': 4, '5': 5}
+
+
+def backfill_ae_grade_level(apps, schema_editor):
+    for model_name in ['aeinitial', 'aefollowup']:
+        model = apps.get_model('ambition_ae', model_name)
+        for ae_grade, ae_grade_level in AE_GRADE_LEVELS.items():
+            model.objects.filter(ae_grade=ae_grade).update(
+                ae_grade_level=ae_grade_level)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0005_aeinitial_current_state'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aeinitial',
+            name='ae_grade_level',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalaeinitial',
+            name='ae_grade_level',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='aefollowup',
+            name='ae_grade_level',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalaefollowup',
+            name='ae_grade_level',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='aeinitial',
+            index=models.Index(
+                fields=['site', 'ae_grade_level'], name='aeinitial_site_level_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aefollowup',
+            index=models.Index(
+                fields=['site', 'ae_grade_level'], name='aefollowup_site_level_idx'),
+        ),
+        migrations.RunPython(backfill_ae_grade_level, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ambition_ae', '0006_ae_grade_level'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AeSearchToken',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_pk', models.CharField(max_length=50)),
+                ('token', models.CharField(max_length=50)),
+                ('count', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'verbose_name': 'AE Search Token',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='aesearchtoken',
+            unique_together={('model', 'object_pk', 'token')},
+        ),
+        migrations.AddIndex(
+            model_name='aesearchtoken',
+            index=models.Index(fields=['model', 'token'], name='aesearchtoken_model_token_idx'),
+        ),
+    ]
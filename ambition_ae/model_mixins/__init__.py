@@ -1 +1,4 @@
+from .ae_grade_level_model_mixin import AeGradeLevelModelMixin, get_ae_grade_level
 from .ae_model_mixin import AeModelMixin
+from .instrumented_model_mixin import InstrumentedModelMixin
+from .loaded_values_model_mixin import LoadedValuesModelMixin
@@ -0,0 +1,29 @@
+from django.db import models
+
+from ..constants import GRADE3, GRADE4, GRADE5
+
+
+AE_GRADE_LEVELS = {GRADE3: 3, GRADE4: 4, GRADE5: 5}
+
+
+def get_ae_grade_level(ae_grade=None):
+    """Returns the grade as an integer or None if not applicable.
+    """
+    return AE_GRADE_LEVELS.get(ae_grade)
+
+
+class AeGradeLevelModelMixin(models.Model):
+
+    """Adds `ae_grade_level`, the integer value of `ae_grade`, set
+    on pre_save, see `side_effects.prepare_for_save`, to query and
+    order by severity.
+
+        AeInitial.objects.filter(ae_grade_level__gte=4)
+    """
+
+    ae_grade_level = models.PositiveSmallIntegerField(
+        null=True,
+        editable=False)
+
+    class Meta:
+        abstract = True
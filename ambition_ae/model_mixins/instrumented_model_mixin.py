@@ -0,0 +1,18 @@
+from django.db import models
+
+from ..instrumentation import SAVE, instrumentation
+
+
+class InstrumentedModelMixin(models.Model):
+
+    """Measures the queries and time of `save()`, including the
+    post-save signals, for example the action items, see
+    `Instrumentation`.
+    """
+
+    def save(self, *args, **kwargs):
+        with instrumentation.instrument(SAVE, self._meta.label_lower):
+            super().save(*args, **kwargs)
+
+    class Meta:
+        abstract = True
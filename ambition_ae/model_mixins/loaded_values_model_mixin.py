@@ -0,0 +1,37 @@
+from django.db import models
+from django.db.models import DEFERRED
+
+
+class LoadedValuesModelMixin(models.Model):
+
+    """Keeps the values of the columns as last loaded from or saved
+    to the database to tell whether a field has changed since, for
+    example in `SearchIndex.index`.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: self.__dict__.get(field.attname, DEFERRED)
+            for field in self._meta.concrete_fields}
+
+    def has_changed(self, field_names=None):
+        """Returns True if any of the fields changed since the
+        instance was loaded or saved, or if it was neither.
+        """
+        loaded_values = getattr(self, '_loaded_values', None)
+        if loaded_values is None:
+            return True
+        deferred_fields = self.get_deferred_fields()
+        return any(
+            loaded_values.get(name, DEFERRED) != getattr(self, name)
+            for name in field_names if name not in deferred_fields)
+
+    class Meta:
+        abstract = True
@@ -1,5 +1,8 @@
+from .ae_change_log import AeChangeLog
 from .ae_followup import AeFollowup
 from .ae_initial import AeInitial
+from .ae_search_token import AeSearchToken
 from .ae_tmg import AeTmg
+from .compacted_history_field import CompactedHistoryField
 from .list_models import AntibioticTreatment, MeningitisSymptom, Neurological
 from .recurrence_symptom import RecurrenceSymptom
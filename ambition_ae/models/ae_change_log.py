@@ -0,0 +1,68 @@
+from django.db import models
+from edc_base.utils import get_utcnow
+
+from ..choices import CHANGE_OPERATIONS
+from ..constants import SAVED
+
+
+class AeChangeLogManager(models.Manager):
+
+    def get_by_natural_key(self, id):
+        return self.get(id=id)
+
+    def log(self, instance=None, operation=None):
+        return self.create(
+            model=instance._meta.label_lower,
+            object_pk=str(instance.pk),
+            operation=operation or SAVED)
+
+    def log_many(self, model=None, pks=None, operation=None):
+        """Logs a change for many instances of a model in bulk.
+        """
+        return self.bulk_create([
+            self.model(model=model, object_pk=str(pk), operation=operation or SAVED)
+            for pk in pks])
+
+    def prune(self, cursor=None, before=None):
+        """Deletes the changes up to and including the cursor, logged
+        before `before` if set, and returns the number deleted.
+
+        Pass the lowest cursor of all consumers of the change log.
+        """
+        qs = self.filter(id__lte=cursor)
+        if before:
+            qs = qs.filter(created__lt=before)
+        deleted, _ = qs.delete()
+        return deleted
+
+
+class AeChangeLog(models.Model):
+
+    """A log of saved and deleted AE rows read by the incremental
+    exporter, see `change_export.py`.
+
+    The auto-incrementing id is the exporter's cursor.
+    """
+
+    model = models.CharField(max_length=50)
+
+    object_pk = models.CharField(max_length=50)
+
+    operation = models.CharField(
+        max_length=10,
+        choices=CHANGE_OPERATIONS,
+        default=SAVED)
+
+    created = models.DateTimeField(default=get_utcnow)
+
+    objects = AeChangeLogManager()
+
+    def __str__(self):
+        return f'{self.id} {self.model} {self.object_pk} {self.operation}'
+
+    def natural_key(self):
+        return (self.id, )
+
+    class Meta:
+        verbose_name = 'AE Change Log'
+        ordering = ('id', )
@@ -3,7 +3,6 @@ from django.db.models.deletion import PROTECT
 from django.urls.base import reverse
 from django.utils.safestring import mark_safe
 from edc_action_item.model_mixins import ActionItemModelMixin
-from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
 from edc_base.model_validators import date_not_future
 from edc_base.sites import CurrentSiteManager
@@ -17,12 +16,15 @@ from edc_identifier.model_mixins import TrackingIdentifierModelMixin
 from ..action_items import AeFollowupAction
 from ..admin_site import ambition_ae_admin
 from ..choices import AE_OUTCOME, AE_GRADE_SIMPLE
-from ..managers import AeManager
+from ..managers import AeManager, CompactedHistoricalRecords
+from ..model_mixins import AeGradeLevelModelMixin, InstrumentedModelMixin
+from ..model_mixins import LoadedValuesModelMixin
+from ..natural_keys import natural_key_prefetch
 from .ae_initial import AeInitial
 
 
-class AeFollowup(ActionItemModelMixin,
-                 NonUniqueSubjectIdentifierFieldMixin,
+class AeFollowup(InstrumentedModelMixin, LoadedValuesModelMixin, AeGradeLevelModelMixin,
+                 ActionItemModelMixin, NonUniqueSubjectIdentifierFieldMixin,
                  TrackingIdentifierModelMixin, SiteModelMixin, BaseUuidModel):
 
     action_cls = AeFollowupAction
@@ -68,14 +70,16 @@ class AeFollowup(ActionItemModelMixin,
 
     objects = AeManager()
 
-    history = HistoricalRecords()
+    history = CompactedHistoricalRecords()
 
     def save(self, *args, **kwargs):
         self.subject_identifier = self.ae_initial.subject_identifier
         super().save(*args, **kwargs)
 
     def natural_key(self):
-        return (self.report_datetime, ) + self.ae_initial.natural_key()
+        ae_initial = (
+            natural_key_prefetch.get_ae_initial(self.ae_initial_id) or self.ae_initial)
+        return (self.report_datetime, ) + ae_initial.natural_key()
 
     @property
     def next(self):
@@ -97,11 +101,22 @@ class AeFollowup(ActionItemModelMixin,
     def initial(self):
         """Returns a shortened action identifier.
         """
+        return self.get_initial_link()
+
+    @classmethod
+    def get_changelist_url(cls):
+        url_name = '_'.join(cls._meta.label_lower.split('.'))
+        namespace = ambition_ae_admin.name
+        return reverse(f'{namespace}:{url_name}_changelist')
+
+    def get_initial_link(self, changelist_url=None):
+        """Returns a shortened action identifier linked to the
+        changelist filtered on the AE initial.
+
+        Pass `changelist_url` to avoid reversing the URL per instance.
+        """
         if self.ae_initial:
-            url_name = '_'.join(self._meta.label_lower.split('.'))
-            namespace = ambition_ae_admin.name
-            url = reverse(
-                f'{namespace}:{url_name}_changelist')
+            url = changelist_url or self.get_changelist_url()
             return mark_safe(
                 f'<a data-toggle="tooltip" title="go to ae initial report" '
                 f'href="{url}?q={self.ae_initial.tracking_identifier}">'
@@ -122,3 +137,16 @@ class AeFollowup(ActionItemModelMixin,
 
     class Meta:
         verbose_name = 'AE Follow-up Report'
+        indexes = [
+            models.Index(
+                fields=['ae_initial', 'report_datetime'],
+                name='aefollowup_initial_rdt_idx'),
+            models.Index(
+                fields=['subject_identifier', 'report_datetime'],
+                name='aefollowup_subject_rdt_idx'),
+            models.Index(
+                fields=['site', 'ae_grade'],
+                name='aefollowup_site_grade_idx'),
+            models.Index(
+                fields=['site', 'ae_grade_level'],
+                name='aefollowup_site_level_idx')]
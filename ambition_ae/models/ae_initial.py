@@ -3,24 +3,25 @@ from django.db import models
 from django.utils.safestring import mark_safe
 from edc_action_item.model_mixins import ActionItemModelMixin
 from edc_base.model_fields import OtherCharField
-from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
 from edc_base.sites import CurrentSiteManager, SiteModelMixin
 from edc_base.model_validators import datetime_not_future
 from edc_constants.choices import YES_NO, YES_NO_NA, YES_NO_UNKNOWN
 from edc_constants.constants import NOT_APPLICABLE, UNKNOWN
-from edc_identifier.managers import TrackingIdentifierManager
 from edc_identifier.model_mixins import NonUniqueSubjectIdentifierFieldMixin
 from edc_identifier.model_mixins import TrackingIdentifierModelMixin
 
 from ..action_items import AeInitialAction
 from ..choices import STUDY_DRUG_RELATIONSHIP, SAE_REASONS, AE_CLASSIFICATION
-from ..model_mixins import AeModelMixin
+from ..choices import AE_GRADE, AE_OUTCOME
+from ..managers import AeInitialManager, CompactedHistoricalRecords
+from ..model_mixins import AeModelMixin, AeGradeLevelModelMixin, InstrumentedModelMixin
+from ..model_mixins import LoadedValuesModelMixin
 
 
-class AeInitial(AeModelMixin, ActionItemModelMixin,
-                TrackingIdentifierModelMixin, NonUniqueSubjectIdentifierFieldMixin,
-                SiteModelMixin, BaseUuidModel):
+class AeInitial(InstrumentedModelMixin, LoadedValuesModelMixin, AeModelMixin,
+                AeGradeLevelModelMixin, ActionItemModelMixin, TrackingIdentifierModelMixin,
+                NonUniqueSubjectIdentifierFieldMixin, SiteModelMixin, BaseUuidModel):
 
     tracking_identifier_prefix = 'AE'
 
@@ -143,11 +144,42 @@ class AeInitial(AeModelMixin, ActionItemModelMixin,
             'AEs ≥ Grade 4 or SAE must be reported to the Trial '
             'Management Group (TMG) within 24 hours'))
 
+    # current state from the follow-up reports, set on every save
+    # and when a follow-up is saved, see `current_state.py`
+    latest_followup_id = models.UUIDField(
+        null=True,
+        editable=False)
+
+    current_grade = models.CharField(
+        max_length=25,
+        choices=AE_GRADE,
+        null=True,
+        editable=False)
+
+    current_outcome = models.CharField(
+        max_length=25,
+        choices=AE_OUTCOME,
+        null=True,
+        editable=False)
+
+    is_closed = models.BooleanField(
+        default=False,
+        editable=False)
+
+    closed_datetime = models.DateTimeField(
+        null=True,
+        editable=False)
+
     on_site = CurrentSiteManager()
 
-    objects = TrackingIdentifierManager()
+    objects = AeInitialManager()
+
+    history = CompactedHistoricalRecords()
 
-    history = HistoricalRecords()
+    # the columns read by __str__ and description, for example
+    # AeInitial.objects.only(*AeInitial.description_fields)
+    str_fields = ('tracking_identifier', 'ae_grade')
+    description_fields = str_fields + ('ae_description', )
 
     def __str__(self):
         return f'{self.tracking_identifier[-9:]} Grade {self.ae_grade}'
@@ -164,3 +196,22 @@ class AeInitial(AeModelMixin, ActionItemModelMixin,
 
     class Meta:
         verbose_name = 'AE Initial Report'
+        indexes = [
+            models.Index(
+                fields=['subject_identifier', 'report_datetime'],
+                name='aeinitial_subject_rdt_idx'),
+            models.Index(
+                fields=['site', 'ae_grade', 'sae'],
+                name='aeinitial_site_grade_sae_idx'),
+            models.Index(
+                fields=['site', 'susar'],
+                name='aeinitial_site_susar_idx'),
+            models.Index(
+                fields=['site', 'report_datetime'],
+                name='aeinitial_site_rdt_idx'),
+            models.Index(
+                fields=['site', 'is_closed', 'current_grade'],
+                name='aeinitial_site_state_idx'),
+            models.Index(
+                fields=['site', 'ae_grade_level'],
+                name='aeinitial_site_level_idx')]
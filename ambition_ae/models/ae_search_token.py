@@ -0,0 +1,28 @@
+from django.db import models
+
+
+class AeSearchToken(models.Model):
+
+    """A row of the inverted index of the AE narrative fields, the
+    number of times a token occurs in an AE report, see
+    `search_index.py`.
+    """
+
+    model = models.CharField(max_length=50)
+
+    object_pk = models.CharField(max_length=50)
+
+    token = models.CharField(max_length=50)
+
+    count = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f'{self.model} {self.object_pk} {self.token}'
+
+    class Meta:
+        verbose_name = 'AE Search Token'
+        unique_together = ('model', 'object_pk', 'token')
+        indexes = [
+            models.Index(
+                fields=['model', 'token'],
+                name='aesearchtoken_model_token_idx')]
@@ -2,7 +2,6 @@ from django.db import models
 from django.db.models.deletion import PROTECT
 from edc_action_item.model_mixins import ActionItemModelMixin
 from edc_base.model_fields import OtherCharField
-from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel, ReportStatusModelMixin
 from edc_base.model_validators.date import datetime_not_future
 from edc_base.sites import CurrentSiteManager, SiteModelMixin
@@ -12,13 +11,15 @@ from edc_identifier.model_mixins import TrackingIdentifierModelMixin
 
 from ..action_items import AeTmgAction
 from ..choices import AE_CLASSIFICATION
-from ..managers import AeManager
+from ..managers import AeManager, CompactedHistoricalRecords
+from ..model_mixins import InstrumentedModelMixin, LoadedValuesModelMixin
+from ..natural_keys import natural_key_prefetch
 from .ae_initial import AeInitial
 
 
-class AeTmg(ActionItemModelMixin, TrackingIdentifierModelMixin,
-            NonUniqueSubjectIdentifierFieldMixin, ReportStatusModelMixin,
-            SiteModelMixin, BaseUuidModel):
+class AeTmg(InstrumentedModelMixin, LoadedValuesModelMixin, ActionItemModelMixin,
+            TrackingIdentifierModelMixin, NonUniqueSubjectIdentifierFieldMixin,
+            ReportStatusModelMixin, SiteModelMixin, BaseUuidModel):
 
     action_cls = AeTmgAction
     tracking_identifier_prefix = 'AT'
@@ -71,14 +72,16 @@ class AeTmg(ActionItemModelMixin, TrackingIdentifierModelMixin,
 
     objects = AeManager()
 
-    history = HistoricalRecords()
+    history = CompactedHistoricalRecords()
 
     def save(self, *args, **kwargs):
         self.subject_identifier = self.ae_initial.subject_identifier
         super().save(*args, **kwargs)
 
     def natural_key(self):
-        return (self.report_datetime, ) + self.ae_initial.natural_key()
+        ae_initial = (
+            natural_key_prefetch.get_ae_initial(self.ae_initial_id) or self.ae_initial)
+        return (self.report_datetime, ) + ae_initial.natural_key()
     natural_key.dependencies = ['ambition_ae.ae_initial', 'sites.Site']
 
     @property
@@ -87,3 +90,13 @@ class AeTmg(ActionItemModelMixin, TrackingIdentifierModelMixin,
 
     class Meta:
         verbose_name = 'AE TMG Report'
+        indexes = [
+            models.Index(
+                fields=['ae_initial', 'report_datetime'],
+                name='aetmg_initial_rdt_idx'),
+            models.Index(
+                fields=['subject_identifier', 'report_datetime'],
+                name='aetmg_subject_rdt_idx'),
+            models.Index(
+                fields=['site', 'report_status'],
+                name='aetmg_site_status_idx')]
@@ -0,0 +1,44 @@
+from django.db import models
+
+
+class CompactedHistoryFieldManager(models.Manager):
+
+    def get_by_natural_key(self, history_model, history_id, field_name):
+        return self.get(
+            history_model=history_model, history_id=history_id,
+            field_name=field_name)
+
+
+class CompactedHistoryField(models.Model):
+
+    """A text field of a historical record cleared by the history
+    compactor because it was unchanged from an earlier record, see
+    `history_compaction.py`.
+
+    The value is read from the record `source_history_id` of the
+    same historical model.
+    """
+
+    history_model = models.CharField(max_length=50)
+
+    history_id = models.CharField(max_length=50)
+
+    field_name = models.CharField(max_length=50)
+
+    source_history_id = models.CharField(max_length=50)
+
+    objects = CompactedHistoryFieldManager()
+
+    def __str__(self):
+        return f'{self.history_model} {self.history_id} {self.field_name}'
+
+    def natural_key(self):
+        return (self.history_model, self.history_id, self.field_name)
+
+    class Meta:
+        verbose_name = 'Compacted History Field'
+        unique_together = ('history_model', 'history_id', 'field_name')
+        indexes = [
+            models.Index(
+                fields=['history_model', 'source_history_id'],
+                name='compactedhist_source_idx')]
@@ -1,7 +1,6 @@
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
 from edc_action_item.model_mixins import ActionItemModelMixin
-from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
 from edc_base.sites import CurrentSiteManager, SiteModelMixin
 from edc_base.model_validators import date_not_future
@@ -13,10 +12,13 @@ from edc_identifier.model_mixins import TrackingIdentifierModelMixin
 
 from ..action_items import RecurrenceOfSymptomsAction
 from ..choices import DR_OPINION, STEROIDS_CHOICES, YES_NO_ALREADY_ARV
+from ..managers import CompactedHistoricalRecords
+from ..model_mixins import InstrumentedModelMixin, LoadedValuesModelMixin
 from .list_models import Neurological, MeningitisSymptom, AntibioticTreatment
 
 
-class RecurrenceSymptom(NonUniqueSubjectIdentifierFieldMixin,
+class RecurrenceSymptom(InstrumentedModelMixin, LoadedValuesModelMixin,
+                        NonUniqueSubjectIdentifierFieldMixin,
                         ActionItemModelMixin, TrackingIdentifierModelMixin,
                         SiteModelMixin, BaseUuidModel):
 
@@ -174,7 +176,7 @@ class RecurrenceSymptom(NonUniqueSubjectIdentifierFieldMixin,
 
     objects = TrackingIdentifierManager()
 
-    history = HistoricalRecords()
+    history = CompactedHistoricalRecords()
 
     def natural_key(self):
         return (self.tracking_identifier, )
@@ -182,3 +184,7 @@ class RecurrenceSymptom(NonUniqueSubjectIdentifierFieldMixin,
     class Meta:
         verbose_name = 'Recurrence of Symptoms'
         verbose_name_plural = 'Recurrence of Symptoms'
+        indexes = [
+            models.Index(
+                fields=['subject_identifier', 'report_datetime'],
+                name='recurrencesym_subject_rdt_idx')]
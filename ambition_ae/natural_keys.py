@@ -0,0 +1,132 @@
+import json
+import threading
+
+from contextlib import contextmanager
+from django.apps import apps as django_apps
+from django.utils.dateparse import parse_datetime
+
+
+AE_INITIAL_MODEL = 'ambition_ae.aeinitial'
+NON_AE_INITIAL_MODELS = ['ambition_ae.aefollowup', 'ambition_ae.aetmg']
+
+
+class NaturalKeyPrefetch:
+
+    """A thread-local store of instances fetched in bulk for
+    natural key lookups.
+
+    While active, `AeInitial.objects.get_by_natural_key` and
+    `AeManager.get_by_natural_key` look here first and fall back to
+    a query.
+
+        with natural_key_prefetch.prefetch_serialized(objects):
+            for obj in serializers.deserialize(...):
+                ...
+
+    Incoming sync transactions are prefetched in batches, see
+    `sync_models.prefetch_natural_keys`.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    @property
+    def store(self):
+        return getattr(self._local, 'store', None)
+
+    @property
+    def active(self):
+        return self.store is not None
+
+    def get(self, model=None, natural_key=None):
+        """Returns a prefetched instance or None.
+        """
+        try:
+            return self.store[model][natural_key]
+        except (KeyError, TypeError):
+            return None
+
+    def get_ae_initial(self, pk=None):
+        try:
+            return self.store['ae_initial_by_pk'][pk]
+        except (KeyError, TypeError):
+            return None
+
+    def update(self, natural_keys=None):
+        """Fetches instances in bulk for a dictionary of
+        {model: [natural_key, ...]} and adds them to the store.
+        """
+        store = self.store
+        ae_initial_cls = django_apps.get_model(AE_INITIAL_MODEL)
+        tracking_identifiers = set(
+            natural_key[0] for natural_key in natural_keys.get(AE_INITIAL_MODEL, []))
+        for model in NON_AE_INITIAL_MODELS:
+            tracking_identifiers.update(
+                natural_key[1] for natural_key in natural_keys.get(model, []))
+        ae_initials = ae_initial_cls.objects.get_by_natural_keys(
+            (tracking_identifier, ) for tracking_identifier in tracking_identifiers)
+        store.setdefault(AE_INITIAL_MODEL, {}).update(ae_initials)
+        store.setdefault('ae_initial_by_pk', {}).update(
+            {obj.pk: obj for obj in ae_initials.values()})
+        for model in NON_AE_INITIAL_MODELS:
+            if natural_keys.get(model):
+                model_cls = django_apps.get_model(model)
+                store.setdefault(model, {}).update(
+                    model_cls.objects.get_by_natural_keys(natural_keys.get(model)))
+
+    @contextmanager
+    def prefetch(self, natural_keys=None):
+        """A context manager that prefetches instances for a
+        dictionary of {model: [natural_key, ...]}.
+        """
+        started = not self.active
+        if started:
+            self._local.store = {}
+        try:
+            self.update(natural_keys)
+            yield self
+        finally:
+            if started:
+                self._local.store = None
+
+    def prefetch_serialized(self, objects=None):
+        """A context manager that prefetches instances for the natural
+        keys of a list of serialized objects, as dictionaries or JSON
+        text, with natural keys.
+        """
+        if isinstance(objects, str):
+            objects = json.loads(objects)
+        return self.prefetch(get_natural_keys(objects))
+
+
+def get_natural_keys(objects=None):
+    """Returns a dictionary of {model: [natural_key, ...]} for the AE
+    models in a list of serialized objects, including the AeInitial
+    referred to by the `ae_initial` foreign key of any object, for
+    example of a historical record.
+    """
+    natural_keys = {}
+    for obj in objects:
+        model = obj.get('model')
+        fields = obj.get('fields', {})
+        ae_initial = fields.get('ae_initial')
+        if not isinstance(ae_initial, (list, tuple)):
+            # not serialized with natural foreign keys
+            ae_initial = None
+        if ae_initial:
+            natural_keys.setdefault(AE_INITIAL_MODEL, []).append(
+                (ae_initial[0], ))
+        if model == AE_INITIAL_MODEL:
+            natural_key = (fields.get('tracking_identifier'), )
+        elif model in NON_AE_INITIAL_MODELS and ae_initial:
+            report_datetime = fields.get('report_datetime')
+            if isinstance(report_datetime, str):
+                report_datetime = parse_datetime(report_datetime)
+            natural_key = (report_datetime, ae_initial[0])
+        else:
+            continue
+        natural_keys.setdefault(model, []).append(natural_key)
+    return natural_keys
+
+
+natural_key_prefetch = NaturalKeyPrefetch()
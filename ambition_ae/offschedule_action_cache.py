@@ -0,0 +1,84 @@
+from django.core.cache import cache
+from edc_visit_schedule.models.subject_schedule_history import SubjectScheduleHistory
+from edc_visit_schedule.site_visit_schedules import site_visit_schedules
+
+from .action_graph import action_graph
+
+
+class OffscheduleActionCache:
+
+    """A subject-scoped cache of a subject's schedules used to
+    resolve the action class of the offschedule model.
+
+    Caches, per subject, a tuple of (onschedule_datetime,
+    offschedule_datetime, offschedule_model) for each schedule in
+    SubjectScheduleHistory. Filtering by report_datetime is done
+    in memory, see `SubjectScheduleHistory.objects.onschedules`.
+
+    Entries are invalidated by the save/delete signals on
+    SubjectScheduleHistory, see `signals.py`.
+    """
+
+    key_prefix = 'ambition_ae.offschedule_action_cache'
+    timeout = 3600
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(hits={self.hits}, misses={self.misses})'
+
+    def get_key(self, subject_identifier=None):
+        return f'{self.key_prefix}.{subject_identifier}'
+
+    def get_schedules(self, subject_identifier=None):
+        """Returns a tuple of schedules for this subject, from the
+        cache if possible.
+        """
+        key = self.get_key(subject_identifier)
+        schedules = self.cache.get(key)
+        if schedules is None:
+            self.misses += 1
+            schedules = self.fetch_schedules(subject_identifier)
+            self.cache.set(key, schedules, self.timeout)
+        else:
+            self.hits += 1
+        return schedules
+
+    def fetch_schedules(self, subject_identifier=None):
+        schedules = []
+        for obj in SubjectScheduleHistory.objects.filter(
+                subject_identifier=subject_identifier).order_by('onschedule_datetime'):
+            _, schedule = site_visit_schedules.get_by_onschedule_model(
+                onschedule_model=obj.onschedule_model)
+            schedules.append(
+                (obj.onschedule_datetime, obj.offschedule_datetime,
+                 schedule.offschedule_model))
+        return tuple(schedules)
+
+    def get_action_cls(self, subject_identifier=None, report_datetime=None):
+        """Returns the action class for the offschedule model of the
+        last schedule the subject is on relative to report_datetime
+        or None.
+        """
+        action_cls = None
+        for onschedule_datetime, offschedule_datetime, offschedule_model in (
+                self.get_schedules(subject_identifier)):
+            if (onschedule_datetime <= report_datetime
+                    and (offschedule_datetime is None
+                         or offschedule_datetime >= report_datetime)):
+                action_cls = action_graph.get_by_model(
+                    model=offschedule_model)
+        return action_cls
+
+    def invalidate(self, subject_identifier=None):
+        self.cache.delete(self.get_key(subject_identifier))
+
+    def reset_counters(self):
+        self.hits = 0
+        self.misses = 0
+
+
+offschedule_action_cache = OffscheduleActionCache(cache=cache)
@@ -0,0 +1,142 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Q
+from django.test.client import RequestFactory
+from functools import reduce
+from operator import or_
+
+from .admin import AeInitialAdmin, AeFollowupAdmin, AeTmgAdmin, RecurrenceSymptomAdmin
+from .admin_site import ambition_ae_admin
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from .workload import AeWorkloadGenerator
+
+
+EXPLAIN_PREFIX = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+    'mysql': 'EXPLAIN',
+    'postgresql': 'EXPLAIN',
+}
+
+
+def explain(queryset=None):
+    """Returns the rows of the database's query plan for a queryset.
+    """
+    sql, params = queryset.query.sql_with_params()
+    prefix = EXPLAIN_PREFIX.get(connection.vendor, 'EXPLAIN')
+    with connection.cursor() as cursor:
+        cursor.execute(f'{prefix} {sql}', params)
+        return [' '.join(str(col) for col in row) for row in cursor.fetchall()]
+
+
+def get_rule_queryset(queryset=None, rule=None):
+    """Returns a queryset of the rows of a queryset for which an
+    `ActionRule` fires.
+    """
+    queryset = queryset.filter(**{
+        f'{field_name}__in': sorted(values)
+        for field_name, values in rule.when.items()})
+    if rule.unless:
+        queryset = queryset.exclude(reduce(or_, [
+            Q(**{f'{field_name}__in': sorted(values)})
+            for field_name, values in rule.unless.items()]))
+    return queryset
+
+
+class QueryPlanBenchmark:
+
+    """Seeds a synthetic AE workload and reports the query plan and
+    timing of the queries the admin changelists and the next-action
+    rules run on the AE tables.
+
+    Each query is a page of the changelist of the model's admin, as
+    returned by `get_changelist_instance`, and, for the models whose
+    action has an `ActionRuleTable`, the page of the rows each rule
+    fires for.
+
+    With `compare`, the indexes declared in the models' Meta are
+    dropped, the queries run, and the indexes recreated, to report
+    before and after. Only use on a development database.
+    """
+
+    models = [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]
+    admins = {
+        AeInitial: AeInitialAdmin,
+        AeFollowup: AeFollowupAdmin,
+        AeTmg: AeTmgAdmin,
+        RecurrenceSymptom: RecurrenceSymptomAdmin}
+    repeat = 5
+
+    def __init__(self, repeat=None, seed=None):
+        self.repeat = repeat or self.repeat
+        self.random = random.Random(seed)
+
+    def seed(self, subjects=None):
+        """Generates the AE reports and action items of `subjects`
+        synthetic subjects, see `AeWorkloadGenerator`, and returns
+        a dictionary of the number of rows inserted by model.
+        """
+        return AeWorkloadGenerator(
+            subjects=subjects, seed=self.random.getrandbits(32),
+            subject_prefix=f'QP{self.random.getrandbits(24):06x}-').generate()
+
+    def get_changelist(self, model=None):
+        """Returns the changelist of the model's admin as shown to a
+        superuser.
+        """
+        request = RequestFactory().get('/')
+        request.user = User(is_active=True, is_superuser=True)
+        model_admin = self.admins[model](model, ambition_ae_admin)
+        return model_admin.get_changelist_instance(request)
+
+    def get_querysets(self):
+        """Returns a dictionary of the querysets to benchmark.
+        """
+        querysets = {}
+        for model in self.models:
+            model_name = model._meta.model_name
+            changelist = self.get_changelist(model)
+            page = slice(0, changelist.list_per_page)
+            querysets[f'{model_name} changelist'] = changelist.queryset[page]
+            rules = getattr(model.action_cls, 'next_action_rules', None)
+            for index, rule in enumerate(rules.rules if rules else []):
+                name = f'{model_name} changelist, rule {index}: {rule.action_name}'
+                querysets[name] = get_rule_queryset(changelist.queryset, rule)[page]
+        return querysets
+
+    def run_queries(self):
+        """Returns a list of (name, plan, milliseconds).
+        """
+        results = []
+        for name, queryset in self.get_querysets().items():
+            plan = explain(queryset)
+            start = time.perf_counter()
+            for _ in range(0, self.repeat):
+                list(queryset.all())
+            elapsed = (time.perf_counter() - start) * 1000 / self.repeat
+            results.append((name, plan, elapsed))
+        return results
+
+    def drop_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in self.models:
+                for index in model._meta.indexes:
+                    schema_editor.remove_index(model, index)
+
+    def create_indexes(self):
+        with connection.schema_editor() as schema_editor:
+            for model in self.models:
+                for index in model._meta.indexes:
+                    schema_editor.add_index(model, index)
+
+    def compare(self):
+        """Returns a tuple of results (without indexes, with indexes).
+        """
+        self.drop_indexes()
+        try:
+            before = self.run_queries()
+        finally:
+            self.create_indexes()
+        return before, self.run_queries()
@@ -0,0 +1,159 @@
+import math
+import re
+
+from collections import Counter
+from django.core.cache import cache as default_cache
+from django.db import transaction
+from django.db.models import Case, Count, ExpressionWrapper, F, FloatField, Sum, Value, When
+from itertools import islice
+
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from .models import AeSearchToken
+
+
+TOKEN_PATTERN = re.compile(r'\w+', re.UNICODE)
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'has',
+    'he', 'her', 'his', 'in', 'is', 'it', 'of', 'on', 'or', 'she', 'that',
+    'the', 'to', 'was', 'were', 'with'}
+
+
+def tokenize(text=None):
+    """Returns a list of the lowercase tokens of a text without stop
+    words or single characters.
+    """
+    return [
+        token[:50] for token in TOKEN_PATTERN.findall((text or '').lower())
+        if len(token) > 1 and token not in STOP_WORDS]
+
+
+class SearchIndex:
+
+    """An inverted index of the narrative text fields of the AE
+    models stored in `AeSearchToken`.
+
+    Instances are indexed by the save/delete signals, see
+    `signals.py`, or in bulk by `index_queryset`.
+
+    `search` returns the pks of the instances that contain all the
+    tokens of the query ranked by TF-IDF. The number of instances of
+    a model, the N of the IDF, is cached for `timeout` seconds.
+    """
+
+    fields = {
+        AeInitial: ['ae_description', 'ae_treatment'],
+        AeFollowup: ['relevant_history'],
+        AeTmg: ['ae_description', 'investigator_comments'],
+        RecurrenceSymptom: ['narrative_summary'],
+    }
+    batch_size = 500
+    key_prefix = 'ambition_ae.search_index'
+    timeout = 300
+
+    def __init__(self, cache=None):
+        self.cache = cache or default_cache
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    def is_indexed(self, model=None):
+        return model in self.fields
+
+    def get_tokens(self, model=None, values=None):
+        return Counter(
+            token for field in self.fields[model]
+            for token in tokenize(values.get(field)))
+
+    def get_search_tokens(self, model=None, pk=None, values=None):
+        return [
+            AeSearchToken(
+                model=model._meta.label_lower, object_pk=str(pk),
+                token=token, count=count)
+            for token, count in self.get_tokens(model, values).items()]
+
+    def index(self, instance=None):
+        """Replaces the tokens of a model instance unless none of
+        its indexed fields changed since it was loaded.
+        """
+        model = instance.__class__
+        if not instance.has_changed(self.fields[model]):
+            return
+        values = {field: getattr(instance, field) for field in self.fields[model]}
+        with transaction.atomic():
+            self.remove(instance)
+            AeSearchToken.objects.bulk_create(
+                self.get_search_tokens(model, instance.pk, values))
+
+    def remove(self, instance=None):
+        AeSearchToken.objects.filter(
+            model=instance._meta.label_lower, object_pk=str(instance.pk)).delete()
+
+    def index_queryset(self, queryset=None):
+        """Replaces the tokens of the instances of a queryset in
+        batches and returns the number of instances indexed.
+        """
+        model = queryset.model
+        label_lower = model._meta.label_lower
+        count = 0
+        rows = queryset.values('pk', *self.fields[model]).iterator()
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            with transaction.atomic():
+                AeSearchToken.objects.filter(
+                    model=label_lower,
+                    object_pk__in=[str(row['pk']) for row in batch]).delete()
+                AeSearchToken.objects.bulk_create([
+                    search_token for row in batch
+                    for search_token in self.get_search_tokens(model, row['pk'], row)])
+            count += len(batch)
+        return count
+
+    def rebuild(self, models=None):
+        """Rebuilds the index and returns a dictionary of the number
+        of instances indexed by model.
+        """
+        counts = {}
+        for model in models or self.fields:
+            AeSearchToken.objects.filter(model=model._meta.label_lower).delete()
+            counts[model._meta.label_lower] = self.index_queryset(model.objects.all())
+        return counts
+
+    def search(self, model=None, query=None, limit=None):
+        """Returns a list of (pk, score) of the instances of a model
+        that contain all the tokens of the query, best first.
+        """
+        tokens = sorted(set(tokenize(query)))
+        if not tokens:
+            return []
+        label_lower = model._meta.label_lower
+        search_tokens = AeSearchToken.objects.filter(model=label_lower, token__in=tokens)
+        document_frequency = dict(
+            search_tokens.values_list('token').annotate(Count('id')).order_by())
+        if len(document_frequency) < len(tokens):
+            return []
+        total = self.get_document_count(model) or 1
+        weights = [
+            When(token=token, then=ExpressionWrapper(
+                F('count') * Value(math.log(1 + total / document_frequency[token])),
+                output_field=FloatField()))
+            for token in tokens]
+        rows = search_tokens.values('object_pk').annotate(
+            matched=Count('token'),
+            score=Sum(Case(*weights, output_field=FloatField()))).filter(
+                matched=len(tokens)).order_by('-score', 'object_pk')
+        if limit:
+            rows = rows[:limit]
+        return [(row['object_pk'], row['score']) for row in rows]
+
+    def get_document_count(self, model=None):
+        """Returns the number of instances of a model on all sites,
+        as indexed by `rebuild`.
+        """
+        return self.cache.get_or_set(
+            f'{self.key_prefix}.{model._meta.label_lower}.count',
+            model.objects.count, self.timeout)
+
+
+search_index = SearchIndex()
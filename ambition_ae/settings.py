@@ -75,6 +75,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'edc_dashboard.middleware.DashboardMiddleware',
     'edc_subject_dashboard.middleware.DashboardMiddleware',
+    'ambition_ae.middleware.SubjectExistsCacheMiddleware',
+    'ambition_ae.middleware.QueryInstrumentationMiddleware',
 ]
 
 ROOT_URLCONF = 'ambition_ae.urls'
@@ -170,6 +172,17 @@ EDC_SYNC_FILES_REMOTE_HOST = None
 EDC_SYNC_FILES_USER = None
 EDC_SYNC_FILES_USB_VOLUME = None
 
+# query budgets by view name, action name or model label_lower,
+# see ambition_ae.instrumentation
+AE_QUERY_BUDGETS = {
+    'ambition_ae_admin:ambition_ae_aeinitial_changelist': 40,
+    'ambition_ae_admin:ambition_ae_aefollowup_changelist': 40,
+    'ambition_ae_admin:ambition_ae_aetmg_changelist': 40,
+    'ambition_ae_admin:ambition_ae_recurrencesymptom_changelist': 40,
+}
+AE_QUERY_BUDGETS_STRICT = False
+AE_METRICS_ENABLED = DEBUG
+
 COUNTRY = 'botswana'
 HOLIDAY_FILE = os.path.join(BASE_DIR, 'holidays.csv')
 
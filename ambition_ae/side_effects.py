@@ -0,0 +1,71 @@
+from .constants import SAVED, DELETED
+from .current_state import repair_current_state, set_current_state, update_current_state
+from .date_rollup import date_rollup
+from .facet_counts import facet_counts
+from .model_mixins import AeGradeLevelModelMixin, get_ae_grade_level
+from .models import AeChangeLog, AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from .search_index import search_index
+
+
+AE_MODELS = [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]
+
+
+def prepare_for_save(obj=None):
+    """Sets the columns of an AE model instance about to be saved
+    that are derived from its other columns.
+
+    Called by the pre_save signal, see `signals.py`, and by
+    `AeBulkImporter` before `bulk_create`.
+    """
+    if isinstance(obj, AeGradeLevelModelMixin):
+        obj.ae_grade_level = get_ae_grade_level(obj.ae_grade)
+    if isinstance(obj, AeInitial):
+        set_current_state(obj)
+
+
+def on_saved(model=None, objs=None, raw=None):
+    """Runs the side effects of saving a list of instances of an AE
+    model; logs the change, indexes the narrative text, updates the
+    current state of the AeInitial of a follow-up and invalidates the
+    admin caches.
+
+    Called by the post_save signal with one instance, see
+    `signals.py`, and by `AeBulkImporter` with a chunk of instances.
+    """
+    pks = [obj.pk for obj in objs]
+    AeChangeLog.objects.log_many(model._meta.label_lower, pks, SAVED)
+    if search_index.is_indexed(model):
+        if len(objs) == 1:
+            search_index.index(objs[0])
+        else:
+            search_index.index_queryset(model.objects.filter(pk__in=pks))
+    if model == AeFollowup and not raw:
+        update_ae_initials(objs)
+    date_rollup.invalidate(model)
+    facet_counts.invalidate(model)
+
+
+def on_deleted(model=None, objs=None):
+    """Runs the side effects of deleting a list of instances of an
+    AE model, see `on_saved`.
+    """
+    AeChangeLog.objects.log_many(
+        model._meta.label_lower, [obj.pk for obj in objs], DELETED)
+    if search_index.is_indexed(model):
+        for obj in objs:
+            search_index.remove(obj)
+    if model == AeFollowup:
+        update_ae_initials(objs)
+    date_rollup.invalidate(model)
+    facet_counts.invalidate(model)
+
+
+def update_ae_initials(ae_followups=None):
+    """Updates the current state of the AeInitial instances of a
+    list of follow-up reports.
+    """
+    ae_initial_ids = set(obj.ae_initial_id for obj in ae_followups)
+    if len(ae_initial_ids) == 1:
+        update_current_state(ae_initial_ids.pop())
+    else:
+        repair_current_state(AeInitial.objects.filter(pk__in=ae_initial_ids))
@@ -0,0 +1,59 @@
+from django.db.models.signals import pre_save, post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from edc_registration.models import RegisteredSubject
+from edc_visit_schedule.models.subject_schedule_history import SubjectScheduleHistory
+
+from .constants import SAVED
+from .models import AeChangeLog
+from .offschedule_action_cache import offschedule_action_cache
+from .side_effects import AE_MODELS, on_deleted, on_saved, prepare_for_save
+from .subject_exists_cache import subject_exists_cache
+
+
+@receiver(post_save, weak=False, sender=SubjectScheduleHistory,
+          dispatch_uid='subject_schedule_history_on_post_save')
+def subject_schedule_history_on_post_save(sender, instance, raw, created, **kwargs):
+    offschedule_action_cache.invalidate(instance.subject_identifier)
+
+
+@receiver(post_delete, weak=False, sender=SubjectScheduleHistory,
+          dispatch_uid='subject_schedule_history_on_post_delete')
+def subject_schedule_history_on_post_delete(sender, instance, using, **kwargs):
+    offschedule_action_cache.invalidate(instance.subject_identifier)
+
+
+@receiver(post_save, weak=False, sender=RegisteredSubject,
+          dispatch_uid='registered_subject_on_post_save')
+def registered_subject_on_post_save(sender, instance, raw, created, **kwargs):
+    subject_exists_cache.invalidate(instance.subject_identifier)
+
+
+@receiver(post_delete, weak=False, sender=RegisteredSubject,
+          dispatch_uid='registered_subject_on_post_delete')
+def registered_subject_on_post_delete(sender, instance, using, **kwargs):
+    subject_exists_cache.invalidate(instance.subject_identifier)
+
+
+@receiver(pre_save, weak=False, dispatch_uid='ae_on_pre_save')
+def ae_on_pre_save(sender, instance, raw, **kwargs):
+    if sender in AE_MODELS and not raw:
+        prepare_for_save(instance)
+
+
+@receiver(post_save, weak=False, dispatch_uid='ae_on_post_save')
+def ae_on_post_save(sender, instance, raw, created, **kwargs):
+    if sender in AE_MODELS:
+        on_saved(sender, [instance], raw=raw)
+
+
+@receiver(post_delete, weak=False, dispatch_uid='ae_on_post_delete')
+def ae_on_post_delete(sender, instance, using, **kwargs):
+    if sender in AE_MODELS:
+        on_deleted(sender, [instance])
+
+
+@receiver(m2m_changed, weak=False, dispatch_uid='change_log_on_m2m_changed')
+def change_log_on_m2m_changed(sender, instance, action, **kwargs):
+    if (action in ['post_add', 'post_remove', 'post_clear']
+            and instance.__class__ in AE_MODELS):
+        AeChangeLog.objects.log(instance, SAVED)
@@ -0,0 +1,140 @@
+import threading
+import time
+
+from collections import OrderedDict
+from contextlib import contextmanager
+from django.conf import settings
+from edc_registration.models import RegisteredSubject
+
+
+class SubjectExistsCache:
+
+    """A cache of whether a subject identifier exists in
+    RegisteredSubject.
+
+    Results are memoized for the duration of a request, see
+    `SubjectExistsCacheMiddleware`. If `timeout` is set, subjects that
+    exist are also kept in a process-wide LRU for `timeout` seconds.
+    Subjects that do not exist are not, so that a subject registered
+    by another process is found at once.
+
+    Entries are invalidated by the save/delete signals on
+    RegisteredSubject, see `signals.py`.
+    """
+
+    def __init__(self, timeout=None, maxsize=None):
+        self.timeout = timeout
+        self.maxsize = maxsize or 1024
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(timeout={self.timeout}, maxsize={self.maxsize})'
+
+    @property
+    def memo(self):
+        """Returns the memo of the current request or None.
+        """
+        return getattr(self._local, 'memo', None)
+
+    def start_request(self):
+        self._local.memo = {}
+
+    def end_request(self):
+        self._local.memo = None
+
+    @contextmanager
+    def memoized(self):
+        """A context manager that memoizes lookups unless already
+        within a request or another `memoized` block.
+        """
+        started = self.memo is None
+        if started:
+            self.start_request()
+        try:
+            yield self
+        finally:
+            if started:
+                self.end_request()
+
+    def get(self, subject_identifier=None):
+        """Returns True or False if cached, otherwise None.
+        """
+        memo = self.memo
+        if memo is not None and subject_identifier in memo:
+            return memo[subject_identifier]
+        if self.timeout:
+            with self._lock:
+                try:
+                    exists, expires = self._lru[subject_identifier]
+                except KeyError:
+                    return None
+                if expires < time.monotonic():
+                    del self._lru[subject_identifier]
+                    return None
+                self._lru.move_to_end(subject_identifier)
+            if memo is not None:
+                memo[subject_identifier] = exists
+            return exists
+        return None
+
+    def set(self, subject_identifier=None, exists=None):
+        memo = self.memo
+        if memo is not None:
+            memo[subject_identifier] = exists
+        if self.timeout and exists:
+            with self._lock:
+                self._lru[subject_identifier] = (
+                    exists, time.monotonic() + self.timeout)
+                self._lru.move_to_end(subject_identifier)
+                while len(self._lru) > self.maxsize:
+                    self._lru.popitem(last=False)
+
+    def exists(self, subject_identifier=None):
+        """Returns True if the subject identifier exists.
+        """
+        exists = self.get(subject_identifier)
+        if exists is None:
+            exists = RegisteredSubject.objects.filter(
+                subject_identifier=subject_identifier).exists()
+            self.set(subject_identifier, exists)
+        return exists
+
+    def get_missing(self, subject_identifiers=None):
+        """Returns the set of subject identifiers that do not exist
+        querying for those not cached in one query.
+        """
+        missing = set()
+        uncached = set()
+        for subject_identifier in set(subject_identifiers):
+            exists = self.get(subject_identifier)
+            if exists is None:
+                uncached.add(subject_identifier)
+            elif not exists:
+                missing.add(subject_identifier)
+        if uncached:
+            found = set(RegisteredSubject.objects.filter(
+                subject_identifier__in=uncached).values_list(
+                    'subject_identifier', flat=True))
+            for subject_identifier in uncached:
+                self.set(subject_identifier, subject_identifier in found)
+            missing.update(uncached - found)
+        return missing
+
+    def invalidate(self, subject_identifier=None):
+        memo = self.memo
+        if memo is not None:
+            memo.pop(subject_identifier, None)
+        with self._lock:
+            self._lru.pop(subject_identifier, None)
+
+    def clear(self):
+        if self.memo is not None:
+            self.memo.clear()
+        with self._lock:
+            self._lru.clear()
+
+
+subject_exists_cache = SubjectExistsCache(
+    timeout=getattr(settings, 'AMBITION_AE_SUBJECT_CACHE_TIMEOUT', None))
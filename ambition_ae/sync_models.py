@@ -1,3 +1,53 @@
+import json
+
 from edc_sync.site_sync_models import site_sync_models
+from functools import wraps
+
+from .natural_keys import natural_key_prefetch
+
+site_sync_models.register_for_app(
+    'ambition_ae', exclude_models=[
+        'ambition_ae.aechangelog', 'ambition_ae.aesearchtoken',
+        'ambition_ae.compactedhistoryfield'])
+
+
+def prefetch_natural_keys(deserialize_transactions):
+    """A decorator for `TransactionDeserializer.deserialize_transactions`
+    that resolves the natural keys of the AE models in a batch of
+    transactions in bulk before the batch is deserialized.
+
+    Each transaction holds one serialized instance, so without it
+    every AE foreign key in the batch is resolved with its own query.
+    Each transaction is decrypted once, the wrapped call reads the
+    decrypted text through `aes_decrypt`.
+
+    Applied in `AppConfig.ready`.
+    """
+    if getattr(deserialize_transactions, 'prefetches_natural_keys', False):
+        return deserialize_transactions
+
+    @wraps(deserialize_transactions)
+    def wrapper(deserializer, transactions=None, **kwargs):
+        aes_decrypt = deserializer.aes_decrypt
+        decrypted = {
+            transaction.tx: aes_decrypt(cipher_text=transaction.tx)
+            for transaction in transactions}
+
+        def get_decrypted(cipher_text=None):
+            try:
+                return decrypted[cipher_text]
+            except KeyError:
+                return aes_decrypt(cipher_text=cipher_text)
 
-site_sync_models.register_for_app('ambition_ae')
+        objects = []
+        for json_text in decrypted.values():
+            objects.extend(json.loads(json_text))
+        deserializer.aes_decrypt = get_decrypted
+        try:
+            with natural_key_prefetch.prefetch_serialized(objects):
+                return deserialize_transactions(
+                    deserializer, transactions=transactions, **kwargs)
+        finally:
+            deserializer.aes_decrypt = aes_decrypt
+    wrapper.prefetches_natural_keys = True
+    return wrapper
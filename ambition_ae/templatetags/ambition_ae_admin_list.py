@@ -0,0 +1,25 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+
+from ..date_rollup import RollupQuerySet
+
+register = template.Library()
+
+
+class RollupChangeList:
+
+    """Wraps a changelist so that the date hierarchy reads its
+    dates from the cached rollup.
+    """
+
+    def __init__(self, cl=None):
+        self.cl = cl
+        self.queryset = RollupQuerySet(cl.queryset)
+
+    def __getattr__(self, name):
+        return getattr(self.cl, name)
+
+
+@register.inclusion_tag('admin/date_hierarchy.html')
+def rollup_date_hierarchy(cl):
+    return date_hierarchy(RollupChangeList(cl))
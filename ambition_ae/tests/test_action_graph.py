@@ -0,0 +1,46 @@
+from ambition_prn.action_items import DEATH_REPORT_ACTION
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase
+from edc_action_item import site_action_items
+
+from ..action_graph import ActionGraph, action_graph
+from ..action_items import AE_INITIAL_ACTION, AE_TMG_ACTION
+from ..action_items import AeInitialAction, AeTmgAction
+
+
+class DummyRegistry:
+
+    def __init__(self, *action_classes):
+        self.registry = {action_cls.name: action_cls for action_cls in action_classes}
+
+    def get_by_model(self, model=None):
+        return None
+
+
+class TestActionGraph(TestCase):
+
+    def test_built_on_ready(self):
+        self.assertTrue(action_graph.built)
+        self.assertEqual(action_graph.missing, [])
+        self.assertEqual(action_graph.get(AE_TMG_ACTION), AeTmgAction)
+        self.assertEqual(
+            action_graph.get(DEATH_REPORT_ACTION),
+            site_action_items.get(DEATH_REPORT_ACTION))
+        self.assertEqual(
+            action_graph.get_by_model('ambition_ae.aeinitial'), AeInitialAction)
+        self.assertIn(AE_TMG_ACTION, action_graph.edges[AE_INITIAL_ACTION])
+
+    def test_frozen(self):
+        with self.assertRaises(TypeError):
+            action_graph.actions['dummy'] = AeTmgAction
+
+    def test_missing_target_raises(self):
+        graph = ActionGraph(registry=DummyRegistry(AeInitialAction)).build()
+        self.assertIn((AE_INITIAL_ACTION, AE_TMG_ACTION), graph.missing)
+        self.assertRaises(ImproperlyConfigured, graph.validate)
+        self.assertRaises(ImproperlyConfigured, graph.get, AE_TMG_ACTION)
+
+    def test_unknown_model(self):
+        graph = ActionGraph(registry=DummyRegistry(AeInitialAction))
+        self.assertIsNone(graph.get_by_model('ambition_ae.dummy'))
+        self.assertTrue(graph.built)
@@ -0,0 +1,109 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.test import TestCase, override_settings
+from edc_constants.constants import YES, NO, DEAD, NOT_APPLICABLE
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from edc_reportable import GRADE3, GRADE4, GRADE5
+from model_mommy import mommy
+
+from ..action_items import AE_INITIAL_ACTION, AeInitialAction, AeTmgAction
+from ..action_items import G4_BRANCH, G5_DEATH_BRANCH, SAE_G3_BRANCH, RECURRENCE_BRANCH
+from ..instrumentation import Histogram, instrumentation, time_action_hook
+from .test_action_rules import DummyModel
+
+
+class TestHistogram(TestCase):
+
+    def test_observe(self):
+        histogram = Histogram(buckets=(0.1, 1.0))
+        histogram.observe(0.05)
+        histogram.observe(0.1)
+        histogram.observe(0.5)
+        histogram.observe(2.0)
+        self.assertEqual(histogram.count, 4)
+        self.assertAlmostEqual(histogram.sum, 2.65)
+        self.assertEqual(
+            histogram.cumulative_counts(),
+            [(0.1, 2), (1.0, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.as_dict()['buckets'][-1], ('+Inf', 4))
+
+
+class DummyAction:
+
+    name = 'dummy'
+
+    @time_action_hook('close_action_item_on_save')
+    def close_action_item_on_save(self):
+        return True
+
+
+class DummyActionOverride(DummyAction):
+
+    @time_action_hook('close_action_item_on_save')
+    def close_action_item_on_save(self):
+        return not super().close_action_item_on_save()
+
+
+class TestTimedActionHooks(TestCase):
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def test_override_timed_once(self):
+        self.assertFalse(DummyActionOverride().close_action_item_on_save())
+        self.assertEqual(instrumentation.histograms[
+            ('close_action_item_on_save', 'dummy', 'none')].count, 1)
+
+    def test_subclass_override_timed(self):
+        self.assertEqual(
+            AeTmgAction.close_action_item_on_save.timed_hook,
+            'close_action_item_on_save')
+
+
+class TestActionBranches(TestCase):
+
+    def branches(self, **kwargs):
+        options = dict(ae_grade=GRADE3, sae=NO, sae_reason=NOT_APPLICABLE,
+                       ae_cm_recurrence=NO)
+        options.update(**kwargs)
+        return AeInitialAction.next_action_rules.get_branches(DummyModel(**options))
+
+    def test_branches(self):
+        self.assertEqual(self.branches(), ())
+        self.assertEqual(self.branches(ae_grade=GRADE4), (G4_BRANCH, ))
+        self.assertEqual(self.branches(sae=YES), (SAE_G3_BRANCH, ))
+        self.assertEqual(self.branches(ae_grade=GRADE5), (G5_DEATH_BRANCH, ))
+        self.assertEqual(self.branches(sae_reason=DEAD), (G5_DEATH_BRANCH, ))
+        self.assertEqual(
+            self.branches(ae_grade=GRADE4, ae_cm_recurrence=YES),
+            (G4_BRANCH, RECURRENCE_BRANCH))
+
+
+@override_settings(AE_QUERY_BUDGETS={}, AE_QUERY_BUDGETS_STRICT=False)
+class TestActionLatency(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        instrumentation.reset()
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+
+    def test_hooks_timed_by_branch(self):
+        mommy.make_recipe(
+            'ambition_ae.aeinitial', subject_identifier=self.subject_identifier,
+            ae_grade=GRADE4, sae=NO, ae_cm_recurrence=NO)
+        histogram = instrumentation.histograms[
+            ('get_next_actions', AE_INITIAL_ACTION, G4_BRANCH)]
+        self.assertGreaterEqual(histogram.count, 1)
+        self.assertIn(
+            ('append_to_next_if_required', AE_INITIAL_ACTION, G4_BRANCH),
+            instrumentation.histograms)
+        hooks = [h['hook'] for h in instrumentation.dump_histograms()]
+        self.assertIn('close_action_item_on_save', hooks)
+        self.assertIn('ambition_ae_action_hook_seconds_bucket{hook="get_next_actions"',
+                      instrumentation.render())
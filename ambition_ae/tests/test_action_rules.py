@@ -0,0 +1,105 @@
+from ambition_prn.action_items import DEATH_REPORT_ACTION
+from django.test import TestCase, tag
+from edc_constants.constants import YES, NO, DEAD, NOT_APPLICABLE, UNKNOWN
+from edc_constants.constants import LOST_TO_FOLLOWUP
+from edc_reportable import GRADE3, GRADE4, GRADE5
+
+from ..action_items import AE_FOLLOWUP_ACTION, AE_TMG_ACTION
+from ..action_items import AeInitialAction, AeFollowupAction
+from ..action_items import RECURRENCE_OF_SYMPTOMS_ACTION
+from ..action_rules import ActionRule, ActionRuleTable, ActionRuleError
+
+
+class DummyModel:
+
+    def __init__(self, **kwargs):
+        for k, v in kwargs.items():
+            setattr(self, k, v)
+
+
+class TestActionRules(TestCase):
+
+    def ae_initial_action_names(self, **kwargs):
+        options = dict(ae_grade=GRADE3, sae=NO, sae_reason=NOT_APPLICABLE,
+                       ae_cm_recurrence=NO)
+        options.update(**kwargs)
+        return AeInitialAction.next_action_rules.get_action_names(
+            DummyModel(**options))
+
+    def ae_followup_action_names(self, **kwargs):
+        options = dict(followup=YES, ae_grade=NOT_APPLICABLE,
+                       outcome='continuing/update')
+        options.update(**kwargs)
+        return AeFollowupAction.next_action_rules.get_action_names(
+            DummyModel(**options))
+
+    def test_rule_refers_to_unknown_field_raises(self):
+        self.assertRaises(
+            ActionRuleError,
+            ActionRuleTable,
+            fields=(('sae', ((YES, 'Yes'), (NO, 'No'))), ),
+            rules=(ActionRule('blah', when=dict(ae_grade=[GRADE4])), ))
+
+    def test_table_is_compiled(self):
+        rules = AeInitialAction.next_action_rules
+        self.assertIn((GRADE4, NO, NOT_APPLICABLE, NO), rules.lookup)
+        self.assertIn((GRADE5, YES, DEAD, UNKNOWN), rules.lookup)
+
+    def test_ae_initial_g3(self):
+        self.assertEqual(
+            self.ae_initial_action_names(), (AE_FOLLOWUP_ACTION, ))
+
+    def test_ae_initial_g3_sae(self):
+        self.assertEqual(
+            self.ae_initial_action_names(sae=YES),
+            (AE_FOLLOWUP_ACTION, AE_TMG_ACTION))
+
+    def test_ae_initial_g4(self):
+        self.assertEqual(
+            self.ae_initial_action_names(ae_grade=GRADE4),
+            (AE_FOLLOWUP_ACTION, AE_TMG_ACTION))
+
+    def test_ae_initial_g5(self):
+        self.assertEqual(
+            self.ae_initial_action_names(ae_grade=GRADE5),
+            (DEATH_REPORT_ACTION, AE_TMG_ACTION))
+
+    def test_ae_initial_sae_reason_dead(self):
+        self.assertEqual(
+            self.ae_initial_action_names(
+                ae_grade=GRADE4, sae=YES, sae_reason=DEAD),
+            (DEATH_REPORT_ACTION, AE_TMG_ACTION))
+
+    def test_ae_initial_recurrence(self):
+        self.assertEqual(
+            self.ae_initial_action_names(ae_cm_recurrence=YES),
+            (AE_FOLLOWUP_ACTION, RECURRENCE_OF_SYMPTOMS_ACTION))
+
+    def test_ae_initial_value_not_in_table(self):
+        self.assertEqual(
+            self.ae_initial_action_names(ae_cm_recurrence='blah'),
+            (AE_FOLLOWUP_ACTION, ))
+
+    def test_ae_followup(self):
+        self.assertEqual(
+            self.ae_followup_action_names(), (AE_FOLLOWUP_ACTION, ))
+        self.assertEqual(
+            self.ae_followup_action_names(followup=NO), ())
+
+    def test_ae_followup_g4(self):
+        self.assertEqual(
+            self.ae_followup_action_names(ae_grade=GRADE4),
+            (AE_FOLLOWUP_ACTION, AE_TMG_ACTION))
+
+    def test_ae_followup_dead(self):
+        self.assertEqual(
+            self.ae_followup_action_names(followup=NO, outcome=DEAD),
+            (DEATH_REPORT_ACTION, AE_TMG_ACTION))
+        self.assertEqual(
+            self.ae_followup_action_names(followup=NO, ae_grade=GRADE5),
+            (DEATH_REPORT_ACTION, AE_TMG_ACTION))
+
+    def test_ae_followup_ltfu_not_in_table(self):
+        self.assertEqual(
+            self.ae_followup_action_names(
+                followup=NO, outcome=LOST_TO_FOLLOWUP), ())
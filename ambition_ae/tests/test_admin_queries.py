@@ -0,0 +1,189 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.conf import settings
+from django.contrib.sites.models import Site
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings, tag
+from django.test.client import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from edc_base.utils import get_utcnow
+from edc_constants.constants import NO, YES
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+from uuid import uuid4
+
+from ..admin import AeFollowupAdmin, AeInitialAdmin, AeTmgAdmin, RecurrenceSymptomAdmin
+from ..admin_site import ambition_ae_admin
+from ..bulk_import import AeBulkImporter
+from ..constants import GRADE4, MODERATE
+from ..models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from ..models import AntibioticTreatment, MeningitisSymptom, Neurological
+
+
+class AdminQueriesTestMixin:
+
+    """Seeds rows with `AeBulkImporter` and counts the queries
+    needed to render a changelist with every row on one page.
+    """
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        self.factory = RequestFactory()
+        self.importer = AeBulkImporter()
+
+    def ae_initial_record(self, **kwargs):
+        record = dict(
+            subject_identifier=self.subject_identifier,
+            ae_classification='anaemia',
+            regimen='single_dose',
+            ae_description='A description of this event',
+            ae_grade=GRADE4,
+            ae_intensity=MODERATE,
+            ae_study_relation_possibility=NO,
+            ambisome_relation='not_related',
+            fluconazole_relation='not_related',
+            amphotericin_b_relation='not_related',
+            flucytosine_relation='not_related',
+            ae_cause=NO,
+            ae_treatment='Some special treatment',
+            ae_cm_recurrence=NO,
+            sae=NO,
+            susar=NO)
+        record.update(**kwargs)
+        return record
+
+    def make_ae_initials(self, count=None):
+        records = [self.ae_initial_record() for _ in range(0, count)]
+        self.importer.import_records(AeInitial, records)
+        return self.importer.imported[AeInitial._meta.label_lower][-count:]
+
+    def make_ae_followups(self, count=None):
+        tracking_identifiers = self.make_ae_initials(count)
+        self.importer.import_records(
+            AeFollowup,
+            [dict(ae_initial=tracking_identifier,
+                  outcome='continuing/update',
+                  outcome_date=get_utcnow().date(),
+                  relevant_history='history',
+                  followup=YES)
+             for tracking_identifier in tracking_identifiers])
+
+    def make_ae_tmgs(self, count=None):
+        tracking_identifiers = self.make_ae_initials(count)
+        self.importer.import_records(
+            AeTmg,
+            [dict(ae_initial=tracking_identifier,
+                  ae_classification='anaemia',
+                  ae_description='A description of this event')
+             for tracking_identifier in tracking_identifiers])
+
+    def make_recurrence_symptoms(self, count=None):
+        site = Site.objects.get_current()
+        objs = [mommy.prepare_recipe(
+            'ambition_ae.recurrencesymptom',
+            subject_identifier=self.subject_identifier,
+            tracking_identifier=uuid4().hex,
+            site=site) for _ in range(0, count)]
+        RecurrenceSymptom.objects.bulk_create(objs)
+        for field_name, list_model in [
+                ('meningitis_symptom', MeningitisSymptom),
+                ('neurological', Neurological),
+                ('antibiotic_treatment', AntibioticTreatment)]:
+            list_obj = list_model.objects.all()[0]
+            through = getattr(RecurrenceSymptom, field_name).through
+            through.objects.bulk_create([
+                through(**{'recurrencesymptom_id': obj.pk,
+                           f'{list_model._meta.model_name}_id': list_obj.pk})
+                for obj in RecurrenceSymptom.objects.filter(
+                    tracking_identifier__in=[o.tracking_identifier for o in objs])])
+
+    def assert_changelist_queries_constant(self, model_admin=None, make=None):
+        """Asserts rendering the changelist runs the same number of
+        queries at 10, 100 and 1000 rows, within the query budget of
+        the changelist view, see `AE_QUERY_BUDGETS`.
+
+        The first render warms the caches kept for the life of the
+        process, for example of the current site.
+        """
+        opts = model_admin.model._meta
+        budget = settings.AE_QUERY_BUDGETS[
+            f'{model_admin.admin_site.name}:{opts.app_label}_{opts.model_name}_changelist']
+        make(10)
+        self.render_changelist(model_admin, rows=10)
+        with CaptureQueriesContext(connection) as context:
+            self.render_changelist(model_admin, rows=10)
+        queries = len(context.captured_queries)
+        self.assertLessEqual(queries, budget)
+        make(90)
+        with self.assertNumQueries(queries):
+            self.render_changelist(model_admin, rows=100)
+        make(900)
+        with self.assertNumQueries(queries):
+            self.render_changelist(model_admin, rows=1000)
+
+    def render_changelist(self, model_admin=None, rows=None):
+        """Renders the changelist view, including the dashboard
+        column, with all rows on one page and the admin caches, for
+        example the date hierarchy, cleared.
+        """
+        caches['default'].clear()
+        model_admin.list_per_page = 1000
+        request = self.factory.get('/')
+        request.user = self.user
+        response = model_admin.changelist_view(request)
+        response.render()
+        self.assertEqual(len(response.context_data['cl'].result_list), rows)
+        self.assertContains(response, f'/dashboard/subject/{self.subject_identifier}/')
+        return response
+
+
+@override_settings(ROOT_URLCONF='ambition_ae.tests.urls')
+class TestAdminQueries(AdminQueriesTestMixin, AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def test_ae_followup_changelist_queries(self):
+        self.assert_changelist_queries_constant(
+            model_admin=AeFollowupAdmin(AeFollowup, ambition_ae_admin),
+            make=self.make_ae_followups)
+
+    def test_ae_tmg_changelist_queries(self):
+        self.assert_changelist_queries_constant(
+            model_admin=AeTmgAdmin(AeTmg, ambition_ae_admin),
+            make=self.make_ae_tmgs)
+
+    def test_recurrence_symptom_changelist_queries(self):
+        self.assert_changelist_queries_constant(
+            model_admin=RecurrenceSymptomAdmin(
+                RecurrenceSymptom, ambition_ae_admin),
+            make=self.make_recurrence_symptoms)
+
+    def test_ae_initial_changelist_queries(self):
+        self.assert_changelist_queries_constant(
+            model_admin=AeInitialAdmin(AeInitial, ambition_ae_admin),
+            make=self.make_ae_initials)
+
+    def test_changelist_defers_text_fields(self):
+        self.make_ae_followups(1)
+        request = self.factory.get('/')
+        request.user = self.user
+        model_admin = AeFollowupAdmin(AeFollowup, ambition_ae_admin)
+        obj = model_admin.get_changelist_instance(request).get_queryset(request)[0]
+        self.assertIn('relevant_history', obj.get_deferred_fields())
+        self.assertIn('ae_treatment', obj.ae_initial.get_deferred_fields())
+
+    def test_ae_initial_str_from_projected_row(self):
+        self.make_ae_initials(1)
+        with self.assertNumQueries(1):
+            obj = AeInitial.objects.only(*AeInitial.description_fields).get()
+            str(obj)
+            obj.description
@@ -463,3 +463,42 @@ class TestAeAndActions(AmbitionTestCaseMixin, TestCase):
             parent_reference_identifier=ae_initial.tracking_identifier,
             parent_model='ambition_ae.aeinitial',
             reference_model='ambition_ae.aetmg')
+
+    def test_ae_initial_resave_deletes_stale_tmg_action(self):
+        ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_grade=GRADE4,
+            sae=NO)
+        opts = dict(
+            parent_reference_identifier=ae_initial.tracking_identifier,
+            reference_model='ambition_ae.aetmg',
+            status=NEW)
+        self.assertEqual(ActionItem.objects.filter(**opts).count(), 1)
+        ae_initial = AeInitial.objects.get(pk=ae_initial.pk)
+        ae_initial.ae_grade = GRADE3
+        ae_initial.save()
+        self.assertEqual(ActionItem.objects.filter(**opts).count(), 0)
+        self.assertEqual(ActionItem.objects.filter(
+            parent_reference_identifier=ae_initial.tracking_identifier,
+            reference_model='ambition_ae.aefollowup',
+            status=NEW).count(), 1)
+
+    def test_ae_followup_resave_deletes_stale_followup_action(self):
+        ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier)
+        ae_followup = mommy.make_recipe(
+            'ambition_ae.aefollowup',
+            ae_initial=ae_initial,
+            subject_identifier=self.subject_identifier,
+            followup=YES)
+        opts = dict(
+            parent_reference_identifier=ae_followup.tracking_identifier,
+            reference_model='ambition_ae.aefollowup',
+            status=NEW)
+        self.assertEqual(ActionItem.objects.filter(**opts).count(), 1)
+        ae_followup = AeFollowup.objects.get(pk=ae_followup.pk)
+        ae_followup.followup = NO
+        ae_followup.save()
+        self.assertEqual(ActionItem.objects.filter(**opts).count(), 0)
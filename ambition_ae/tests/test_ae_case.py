@@ -0,0 +1,68 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.test import TestCase
+from edc_constants.constants import NO, YES
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..ae_case import get_ae_cases
+from ..constants import GRADE3, GRADE4
+
+
+class TestAeCase(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifiers = ['12345', '67890']
+        for subject_identifier in self.subject_identifiers:
+            RegisteredSubject.objects.create(
+                subject_identifier=subject_identifier)
+            for _ in range(0, 2):
+                ae_initial = mommy.make_recipe(
+                    'ambition_ae.aeinitial',
+                    subject_identifier=subject_identifier,
+                    ae_grade=GRADE3,
+                    ae_cm_recurrence=NO)
+                mommy.make_recipe(
+                    'ambition_ae.aefollowup',
+                    ae_initial=ae_initial,
+                    subject_identifier=subject_identifier,
+                    ae_grade=GRADE4,
+                    followup=YES)
+
+    def test_queries(self):
+        with self.assertNumQueries(4):
+            ae_cases = get_ae_cases(self.subject_identifiers)
+        self.assertEqual(
+            [len(ae_cases[s]) for s in self.subject_identifiers], [2, 2])
+
+    def test_tree(self):
+        ae_case = get_ae_cases(['12345'])['12345'][0]
+        self.assertEqual(len(ae_case.followups), 1)
+        self.assertEqual(ae_case.ae_grade, GRADE3)
+        self.assertEqual(ae_case.current_grade, GRADE4)
+        self.assertTrue(ae_case.is_open)
+
+    def test_closed(self):
+        ae_case = get_ae_cases(['12345'])['12345'][0]
+        mommy.make_recipe(
+            'ambition_ae.aefollowup',
+            ae_initial_id=ae_case.pk,
+            subject_identifier='12345',
+            followup=NO)
+        ae_case = get_ae_cases(['12345'])['12345'][0]
+        self.assertFalse(ae_case.is_open)
+        self.assertEqual(ae_case.outcome, ae_case.followups[-1].outcome)
+
+    def test_read_only(self):
+        ae_case = get_ae_cases(['12345'])['12345'][0]
+        self.assertRaises(AttributeError, setattr, ae_case, 'ae_grade', GRADE4)
+        self.assertRaises(AttributeError, setattr, ae_case, 'other', 1)
+        self.assertIsInstance(ae_case.followups, tuple)
+
+    def test_no_cases(self):
+        self.assertEqual(get_ae_cases(['99999']), {'99999': ()})
@@ -0,0 +1,65 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import RequestFactory
+from edc_constants.constants import NO, NOT_APPLICABLE, YES
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..admin import AeInitialAdmin
+from ..admin_site import ambition_ae_admin
+from ..constants import GRADE3, GRADE4, GRADE5
+from ..models import AeInitial, AeFollowup
+
+
+class TestAeGradeLevel(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        for ae_grade in [GRADE3, GRADE4, GRADE5]:
+            mommy.make_recipe(
+                'ambition_ae.aeinitial',
+                subject_identifier=self.subject_identifier,
+                ae_grade=ae_grade,
+                ae_cm_recurrence=NO)
+
+    def test_level_set_on_save(self):
+        self.assertEqual(
+            sorted(AeInitial.objects.values_list('ae_grade_level', flat=True)),
+            [3, 4, 5])
+        obj = AeInitial.objects.get(ae_grade=GRADE3)
+        obj.ae_grade = GRADE4
+        obj.save()
+        obj.refresh_from_db()
+        self.assertEqual(obj.ae_grade_level, 4)
+
+    def test_followup_not_applicable(self):
+        obj = mommy.make_recipe(
+            'ambition_ae.aefollowup',
+            ae_initial=AeInitial.objects.get(ae_grade=GRADE3),
+            subject_identifier=self.subject_identifier,
+            ae_grade=NOT_APPLICABLE,
+            followup=YES)
+        self.assertIsNone(AeFollowup.objects.get(pk=obj.pk).ae_grade_level)
+
+    def test_range_query(self):
+        self.assertEqual(
+            AeInitial.objects.filter(ae_grade_level__gte=4).count(), 2)
+
+    def test_admin_filter(self):
+        request = RequestFactory().get('/', {'ae_grade_level': '4'})
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        changelist = model_admin.get_changelist_instance(request)
+        self.assertEqual(
+            set(changelist.get_queryset(request).values_list(
+                'ae_grade', flat=True)), {GRADE4, GRADE5})
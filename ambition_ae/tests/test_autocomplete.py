@@ -0,0 +1,55 @@
+import json
+
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.core.cache import caches
+from django.test import TestCase
+from edc_list_data.site_list_data import site_list_data
+
+from ..admin import AeInitialAdmin, AeTmgAdmin
+from ..admin_site import ambition_ae_admin
+from ..models import AeInitial, AeTmg
+from .test_admin_queries import AdminQueriesTestMixin
+
+
+class TestAeInitialAutocomplete(AdminQueriesTestMixin, AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.make_ae_initials(3)
+        self.model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+
+    def autocomplete(self, term=None):
+        request = self.factory.get('/', {'term': term})
+        request.user = self.user
+        response = self.model_admin.autocomplete_view(request)
+        return json.loads(response.content.decode())
+
+    def test_tracking_identifier_prefix(self):
+        obj = AeInitial.objects.first()
+        data = self.autocomplete(obj.tracking_identifier[:-1].lower())
+        self.assertEqual(data['results'], [{'id': str(obj.pk), 'text': str(obj)}])
+
+    def test_subject_identifier(self):
+        data = self.autocomplete(self.subject_identifier)
+        self.assertEqual(len(data['results']), 3)
+        self.assertEqual(self.autocomplete('99999')['results'], [])
+
+    def test_cached(self):
+        data = self.autocomplete(self.subject_identifier)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.autocomplete(self.subject_identifier), data)
+
+    def test_tmg_form_field_uses_autocomplete(self):
+        request = self.factory.get('/')
+        request.user = self.user
+        model_admin = AeTmgAdmin(AeTmg, ambition_ae_admin)
+        formfield = model_admin.formfield_for_foreignkey(
+            AeTmg._meta.get_field('ae_initial'), request)
+        self.assertEqual(formfield.queryset.count(), 3)
+        self.assertEqual(formfield.widget.__class__.__name__, 'AutocompleteSelect')
@@ -0,0 +1,35 @@
+from django.test import TestCase
+
+from ..benchmarks.benchmark import check_budget, measure
+from ..benchmarks.compare import compare
+from ..models import AeInitial
+
+
+class TestBenchmark(TestCase):
+
+    def test_measure(self):
+        result = measure(lambda: list(AeInitial.objects.all()), repeat=3)
+        self.assertEqual(result['runs'], 3)
+        self.assertEqual(result['queries'], 1)
+        self.assertLessEqual(result['min_ms'], result['max_ms'])
+
+    def test_measure_setup_not_counted(self):
+        result = measure(
+            lambda count: None, setup=lambda: AeInitial.objects.count())
+        self.assertEqual(result['queries'], 0)
+
+    def test_check_budget(self):
+        result = dict(queries=10, median_ms=50.0)
+        self.assertEqual(check_budget(result, dict(queries=10, median_ms=50.0)), [])
+        self.assertEqual(len(check_budget(result, dict(queries=9, median_ms=40.0))), 2)
+        self.assertEqual(
+            check_budget(result, dict(median_ms=40.0), time_factor=2.0), [])
+        self.assertEqual(check_budget(result, None), [])
+
+    def test_compare(self):
+        old = dict(results={'a': dict(queries=5, median_ms=10.0)})
+        new = dict(results={'a': dict(queries=6, median_ms=10.5),
+                            'b': dict(queries=1, median_ms=1.0)})
+        self.assertEqual(compare(old, new), [('a', 'queries', 5, 6)])
+        self.assertEqual(
+            compare(old, new, tolerance=0.01)[1], ('a', 'median_ms', 10.0, 10.5))
@@ -0,0 +1,111 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from edc_action_item.models import SubjectDoesNotExist
+from edc_action_item.models.action_item import ActionItem
+from edc_constants.constants import CLOSED, NEW, NO
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+
+from ..bulk_import import AeBulkImporter, BulkImportError
+from ..constants import GRADE4, MODERATE
+from ..models import AeInitial, AeFollowup
+
+
+class TestBulkImport(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+
+    def ae_initial_record(self, **kwargs):
+        record = dict(
+            subject_identifier=self.subject_identifier,
+            ae_classification='anaemia',
+            regimen='single_dose',
+            ae_description='A description of this event',
+            ae_grade=GRADE4,
+            ae_intensity=MODERATE,
+            ae_study_relation_possibility=NO,
+            ambisome_relation='not_related',
+            fluconazole_relation='not_related',
+            amphotericin_b_relation='not_related',
+            flucytosine_relation='not_related',
+            ae_cause=NO,
+            ae_treatment='Some special treatment',
+            ae_cm_recurrence=NO,
+            sae=NO,
+            susar=NO)
+        record.update(**kwargs)
+        return record
+
+    def test_import_without_actions(self):
+        importer = AeBulkImporter(chunk_size=2)
+        count = importer.import_records(
+            AeInitial, [self.ae_initial_record() for _ in range(0, 5)])
+        self.assertEqual(count, 5)
+        self.assertEqual(AeInitial.objects.filter(
+            subject_identifier=self.subject_identifier).count(), 5)
+        self.assertEqual(ActionItem.objects.filter(
+            subject_identifier=self.subject_identifier).count(), 0)
+
+    def test_import_invalid_subject(self):
+        importer = AeBulkImporter()
+        self.assertRaises(
+            SubjectDoesNotExist,
+            importer.import_records,
+            AeInitial, [self.ae_initial_record(subject_identifier='blahblah')])
+
+    def test_import_followup_invalid_ae_initial(self):
+        importer = AeBulkImporter()
+        self.assertRaises(
+            BulkImportError,
+            importer.import_records,
+            AeFollowup, [dict(ae_initial='blahblah')])
+
+    def test_reconcile_matches_save(self):
+        importer = AeBulkImporter(chunk_size=2)
+        importer.import_records(
+            AeInitial, [self.ae_initial_record() for _ in range(0, 3)])
+        self.assertEqual(importer.reconcile(), 3)
+        for ae_initial in AeInitial.objects.all():
+            self.assertIsNotNone(ae_initial.action_identifier)
+            ActionItem.objects.get(
+                reference_identifier=ae_initial.tracking_identifier,
+                reference_model='ambition_ae.aeinitial',
+                status=CLOSED)
+            ActionItem.objects.get(
+                parent_reference_identifier=ae_initial.tracking_identifier,
+                parent_model='ambition_ae.aeinitial',
+                reference_model='ambition_ae.aefollowup',
+                status=NEW)
+            ActionItem.objects.get(
+                parent_reference_identifier=ae_initial.tracking_identifier,
+                parent_model='ambition_ae.aeinitial',
+                reference_model='ambition_ae.aetmg',
+                status=NEW)
+
+    def test_reconcile_queries_do_not_grow_with_rows(self):
+        """Asserts reconcile runs the same queries for 2 and 6 rows,
+        apart from allocating one identifier per new action item.
+        """
+        counts = []
+        for n in [2, 6]:
+            importer = AeBulkImporter(chunk_size=10)
+            importer.import_records(
+                AeInitial, [self.ae_initial_record() for _ in range(0, n)])
+            with CaptureQueriesContext(connection) as context:
+                self.assertEqual(importer.reconcile(), n)
+            counts.append(len([
+                query for query in context.captured_queries
+                if 'edc_identifier_identifiermodel' not in query['sql']]))
+        self.assertEqual(counts[0], counts[1])
+        self.assertEqual(ActionItem.objects.filter(
+            reference_model='ambition_ae.aeinitial', status=CLOSED).count(), 8)
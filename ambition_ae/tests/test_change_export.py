@@ -0,0 +1,122 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from datetime import timedelta
+from django.test import TestCase
+from edc_base.utils import get_utcnow
+from edc_constants.constants import NO
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..change_export import AeChangeExporter, loads
+from ..constants import SAVED, DELETED
+from ..models import AeChangeLog, AeFollowup, AeInitial
+
+
+class TestChangeExport(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+
+    def make_ae_initial(self):
+        return mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_cm_recurrence=NO)
+
+    def test_save_and_delete_logged(self):
+        ae_initial = self.make_ae_initial()
+        self.assertTrue(AeChangeLog.objects.filter(
+            model='ambition_ae.aeinitial', object_pk=str(ae_initial.pk),
+            operation=SAVED).exists())
+        pk = ae_initial.pk
+        AeInitial.objects.get(pk=pk).delete()
+        self.assertTrue(AeChangeLog.objects.filter(
+            model='ambition_ae.aeinitial', object_pk=str(pk),
+            operation=DELETED).exists())
+
+    def test_export_latest_change_only(self):
+        ae_initial = self.make_ae_initial()
+        ae_initial.save()
+        ae_initial.save()
+        payload = AeChangeExporter(lag=0).export_batch(cursor=0)
+        ae_initials = [
+            obj for obj in payload.get('objects')
+            if obj.get('model') == 'ambition_ae.aeinitial']
+        self.assertEqual(len(ae_initials), 1)
+        self.assertEqual(payload.get('cursor'), AeChangeLog.objects.last().id)
+
+    def test_export_from_cursor(self):
+        self.make_ae_initial()
+        cursor = AeChangeLog.objects.last().id
+        self.assertIsNone(AeChangeExporter(lag=0).export_batch(cursor=cursor))
+        ae_initial = self.make_ae_initial()
+        payload = AeChangeExporter(lag=0).export_batch(cursor=cursor)
+        self.assertIn(
+            ae_initial.tracking_identifier,
+            [obj.get('fields').get('tracking_identifier')
+             for obj in payload.get('objects')])
+
+    def test_export_deleted(self):
+        ae_initial = self.make_ae_initial()
+        mommy.make_recipe(
+            'ambition_ae.aefollowup',
+            ae_initial=ae_initial,
+            subject_identifier=self.subject_identifier,
+            followup=NO)
+        cursor = AeChangeLog.objects.last().id
+        obj = AeFollowup.objects.get(ae_initial=ae_initial)
+        pk = str(obj.pk)
+        obj.delete()
+        payload = AeChangeExporter(lag=0).export_batch(cursor=cursor)
+        self.assertEqual(payload.get('objects'), [])
+        self.assertEqual(
+            payload.get('deleted'), [dict(model='ambition_ae.aefollowup', pk=pk)])
+
+    def test_batches(self):
+        for _ in range(0, 3):
+            self.make_ae_initial()
+        count = AeChangeLog.objects.count()
+        exporter = AeChangeExporter(batch_size=2, lag=0)
+        payloads = list(exporter.iter_batches(cursor=0))
+        self.assertEqual(len(payloads), (count + 1) // 2)
+        self.assertEqual(payloads[-1].get('cursor'), AeChangeLog.objects.last().id)
+
+    def test_lag(self):
+        self.make_ae_initial()
+        self.assertIsNone(AeChangeExporter(lag=3600).export_batch(cursor=0))
+
+    def test_default_lag(self):
+        self.make_ae_initial()
+        exporter = AeChangeExporter()
+        self.assertGreater(exporter.lag, 0)
+        self.assertIsNone(exporter.export_batch(cursor=0))
+        AeChangeLog.objects.update(
+            created=get_utcnow() - timedelta(seconds=exporter.lag + 1))
+        payload = exporter.export_batch(cursor=0)
+        self.assertEqual(payload.get('cursor'), AeChangeLog.objects.last().id)
+
+    def test_prune(self):
+        for _ in range(0, 2):
+            self.make_ae_initial()
+        cursor = AeChangeLog.objects.first().id
+        count = AeChangeLog.objects.count()
+        self.assertEqual(
+            AeChangeLog.objects.prune(
+                cursor=cursor, before=get_utcnow() - timedelta(days=1)), 0)
+        self.assertEqual(AeChangeLog.objects.prune(cursor=cursor), 1)
+        self.assertEqual(AeChangeLog.objects.count(), count - 1)
+        self.assertFalse(AeChangeLog.objects.filter(id__lte=cursor).exists())
+
+    def test_compress(self):
+        self.make_ae_initial()
+        exporter = AeChangeExporter(compress=True, lag=0)
+        payload = exporter.export_batch(cursor=0)
+        self.assertEqual(loads(exporter.dumps(payload)).get('cursor'),
+                         payload.get('cursor'))
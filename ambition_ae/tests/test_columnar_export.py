@@ -0,0 +1,91 @@
+import shutil
+import tempfile
+
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.contrib.sites.models import Site
+from django.test import TestCase
+from edc_constants.constants import NO, YES
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..columnar_export import AeColumnarExporter, ColumnarExportError, read_table
+from ..constants import GRADE4
+from ..models import AeInitial, MeningitisSymptom
+
+
+class TestColumnarExport(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        for _ in range(0, 5):
+            mommy.make_recipe(
+                'ambition_ae.aeinitial',
+                subject_identifier=self.subject_identifier,
+                ae_grade=GRADE4,
+                sae=YES,
+                ae_cm_recurrence=NO)
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_invalid_output_dir(self):
+        self.assertRaises(
+            ColumnarExportError, AeColumnarExporter, output_dir='/does/not/exist')
+
+    def test_export_chunks(self):
+        manifest = AeColumnarExporter(
+            output_dir=self.output_dir, chunk_size=2).export()
+        table = manifest['tables']['ambition_ae.aeinitial']
+        self.assertEqual(table['rows'], 5)
+        self.assertEqual(len(table['chunks']), 3)
+        self.assertIn('ambition_ae.historicalaeinitial', manifest['tables'])
+
+    def test_export_all_sites(self):
+        site = Site.objects.create(domain='other.example.com', name='other')
+        mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_cm_recurrence=NO,
+            site=site)
+        manifest = AeColumnarExporter(output_dir=self.output_dir).export()
+        self.assertEqual(manifest['tables']['ambition_ae.aeinitial']['rows'], 6)
+        rows = list(read_table(self.output_dir, 'ambition_ae.aeinitial'))
+        self.assertEqual(
+            set(row['site_id'] for row in rows), {Site.objects.get_current().pk, site.pk})
+
+    def test_choices_dictionary_encoded(self):
+        manifest = AeColumnarExporter(output_dir=self.output_dir).export()
+        dictionary = manifest['tables']['ambition_ae.aeinitial']['dictionaries']['ae_grade']
+        rows = list(read_table(self.output_dir, 'ambition_ae.aeinitial'))
+        self.assertEqual(
+            set(dictionary[row['ae_grade']][0] for row in rows), {GRADE4})
+        rows = list(read_table(self.output_dir, 'ambition_ae.aeinitial', decode=True))
+        self.assertEqual(
+            [row['tracking_identifier'] for row in rows],
+            list(AeInitial.objects.order_by('pk').values_list(
+                'tracking_identifier', flat=True)))
+        self.assertEqual(set(row['ae_grade'] for row in rows), {GRADE4})
+
+    def test_m2m_selections(self):
+        obj = mommy.make_recipe(
+            'ambition_ae.recurrencesymptom',
+            subject_identifier=self.subject_identifier)
+        list_obj = MeningitisSymptom.objects.all()[0]
+        obj.meningitis_symptom.add(list_obj)
+        AeColumnarExporter(output_dir=self.output_dir, history=False).export()
+        rows = list(read_table(
+            self.output_dir, 'ambition_ae.recurrencesymptom.meningitis_symptom',
+            decode=True))
+        self.assertEqual(
+            [(row['recurrencesymptom_id'], row['meningitissymptom__short_name'])
+             for row in rows],
+            [(str(obj.pk), list_obj.short_name)])
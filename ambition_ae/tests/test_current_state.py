@@ -0,0 +1,94 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.test import TestCase
+from edc_constants.constants import NO, YES, NOT_APPLICABLE
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..constants import GRADE3, GRADE4
+from ..current_state import repair_current_state
+from ..models import AeInitial
+
+
+class TestCurrentState(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_grade=GRADE3,
+            ae_cm_recurrence=NO)
+
+    def make_followup(self, **kwargs):
+        return mommy.make_recipe(
+            'ambition_ae.aefollowup',
+            ae_initial=self.ae_initial,
+            subject_identifier=self.subject_identifier,
+            **kwargs)
+
+    def get_state(self):
+        return AeInitial.objects.filter(pk=self.ae_initial.pk).values(
+            'latest_followup_id', 'current_grade', 'current_outcome',
+            'is_closed', 'closed_datetime')[0]
+
+    def test_initial(self):
+        state = self.get_state()
+        self.assertEqual(state['current_grade'], GRADE3)
+        self.assertIsNone(state['latest_followup_id'])
+        self.assertFalse(state['is_closed'])
+
+    def test_followup(self):
+        followup = self.make_followup(ae_grade=GRADE4, followup=YES)
+        state = self.get_state()
+        self.assertEqual(state['latest_followup_id'], followup.pk)
+        self.assertEqual(state['current_grade'], GRADE4)
+        self.assertEqual(state['current_outcome'], followup.outcome)
+        self.assertFalse(state['is_closed'])
+
+    def test_closed_and_reopened(self):
+        self.make_followup(ae_grade=GRADE4, followup=YES)
+        followup = self.make_followup(ae_grade=NOT_APPLICABLE, followup=NO)
+        state = self.get_state()
+        self.assertTrue(state['is_closed'])
+        self.assertEqual(state['closed_datetime'], followup.report_datetime)
+        self.assertEqual(state['current_grade'], GRADE4)
+        followup.delete()
+        self.assertFalse(self.get_state()['is_closed'])
+
+    def test_resave_of_stale_instance(self):
+        ae_initial = self.ae_initial
+        self.make_followup(ae_grade=GRADE4, followup=NO)
+        state = self.get_state()
+        self.assertTrue(state['is_closed'])
+        ae_initial.save()
+        self.assertEqual(self.get_state(), state)
+        self.assertTrue(ae_initial.is_closed)
+
+    def test_initial_grade_changed(self):
+        self.ae_initial.ae_grade = GRADE4
+        self.ae_initial.save()
+        self.assertEqual(self.get_state()['current_grade'], GRADE4)
+
+    def test_repair(self):
+        self.make_followup(ae_grade=GRADE4, followup=YES)
+        self.make_followup(ae_grade=NOT_APPLICABLE, followup=NO)
+        state = self.get_state()
+        AeInitial.objects.update(
+            latest_followup_id=None, current_grade=None, current_outcome=None,
+            is_closed=False, closed_datetime=None)
+        repair_current_state(AeInitial.objects.all())
+        self.assertEqual(self.get_state(), state)
+
+    def test_open_grade4_query(self):
+        self.make_followup(ae_grade=GRADE4, followup=YES)
+        self.assertEqual(
+            AeInitial.objects.filter(
+                is_closed=False, current_grade=GRADE4).count(), 1)
@@ -0,0 +1,66 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.core.cache import caches
+from django.db.models import Q
+from django.test import TestCase
+from edc_constants.constants import NO, YES
+from edc_list_data.site_list_data import site_list_data
+
+from ..admin import AeInitialAdmin
+from ..admin_site import ambition_ae_admin
+from ..facet_counts import facet_counts
+from ..models import AeInitial
+from .test_admin_queries import AdminQueriesTestMixin
+
+
+class TestFacetCounts(AdminQueriesTestMixin, AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.make_ae_initials(5)
+        self.model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+
+    def get_changelist(self, **params):
+        request = self.factory.get('/', params)
+        request.user = self.user
+        return self.model_admin.get_changelist_instance(request)
+
+    def get_choices(self, changelist=None, field_path=None):
+        for spec in changelist.filter_specs:
+            if getattr(spec, 'field_path', None) == field_path:
+                return [choice['display'] for choice in spec.choices(changelist)]
+        return None
+
+    def test_counts(self):
+        lookups = {YES: Q(sae=YES), NO: Q(sae=NO)}
+        counts = facet_counts.get_counts(AeInitial.objects.all(), lookups, 10)
+        self.assertEqual(
+            counts,
+            {YES: AeInitial.objects.filter(sae=YES).count(),
+             NO: AeInitial.objects.filter(sae=NO).count()})
+
+    def test_one_query_for_all_filters(self):
+        changelist = self.get_changelist()
+        with self.assertNumQueries(2):
+            # site lookup and the aggregate
+            choices = self.get_choices(changelist, 'sae')
+        self.assertIn(f'Yes ({AeInitial.objects.filter(sae=YES).count()})', choices)
+        with self.assertNumQueries(0):
+            self.get_choices(changelist, 'susar')
+
+    def test_cached_and_invalidated(self):
+        queryset = AeInitial.objects.all()
+        lookups = {YES: Q(sae=YES)}
+        count = facet_counts.get_counts(queryset, lookups, 10)[YES]
+        with self.assertNumQueries(0):
+            facet_counts.get_counts(queryset, lookups, 10)
+        obj = AeInitial.objects.filter(sae=NO).first() or AeInitial.objects.first()
+        obj.sae = YES if obj.sae == NO else NO
+        obj.save()
+        self.assertNotEqual(
+            facet_counts.get_counts(queryset, lookups, 10)[YES], count)
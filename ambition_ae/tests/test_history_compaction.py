@@ -0,0 +1,92 @@
+import shutil
+import tempfile
+
+from ambition_rando.tests import AmbitionTestCaseMixin
+from datetime import timedelta
+from django.test import TestCase
+from edc_base.utils import get_utcnow
+from edc_constants.constants import NO
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..columnar_export import AeColumnarExporter, read_table
+from ..history_compaction import HistoryCompactor, restore_compacted, as_of
+from ..models import AeInitial, CompactedHistoryField
+
+
+class TestHistoryCompaction(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_description='a long description',
+            ae_cm_recurrence=NO)
+        for ae_treatment in ['treatment 1', 'treatment 1', 'treatment 2']:
+            self.ae_initial.ae_treatment = ae_treatment
+            self.ae_initial.save()
+
+    def get_versions(self):
+        return [
+            {field: getattr(obj, field) for field in ['ae_description', 'ae_treatment']}
+            for obj in restore_compacted(
+                AeInitial.history.filter(id=self.ae_initial.pk).order_by(
+                    'history_date'))]
+
+    def test_compact_and_restore(self):
+        versions = self.get_versions()
+        counts = HistoryCompactor(model=AeInitial).compact()
+        self.assertGreater(counts['compacted'], 0)
+        self.assertIn('', AeInitial.history.values_list('ae_description', flat=True))
+        self.assertEqual(self.get_versions(), versions)
+
+    def test_compact_is_idempotent(self):
+        HistoryCompactor(model=AeInitial).compact()
+        count = CompactedHistoryField.objects.count()
+        counts = HistoryCompactor(model=AeInitial).compact()
+        self.assertEqual(counts['compacted'], 0)
+        self.assertEqual(CompactedHistoryField.objects.count(), count)
+
+    def test_squash_machine_generated(self):
+        AeInitial.history.filter(id=self.ae_initial.pk).update(history_user=None)
+        versions = self.get_versions()
+        HistoryCompactor(model=AeInitial).compact()
+        counts = HistoryCompactor(
+            model=AeInitial,
+            squash_before=get_utcnow() + timedelta(days=1)).compact()
+        self.assertEqual(counts['squashed'], len(versions) - 2)
+        self.assertEqual(self.get_versions(), [versions[0], versions[-1]])
+
+    def test_as_of(self):
+        HistoryCompactor(model=AeInitial).compact()
+        obj = as_of(AeInitial, self.ae_initial.pk, get_utcnow())
+        self.assertEqual(obj.ae_description, 'a long description')
+        self.assertEqual(obj.ae_treatment, 'treatment 2')
+
+    def test_history_as_of_and_instance(self):
+        HistoryCompactor(model=AeInitial).compact()
+        obj = self.ae_initial.history.as_of(get_utcnow())
+        self.assertEqual(obj.ae_description, 'a long description')
+        for history_obj in AeInitial.history.filter(id=self.ae_initial.pk):
+            self.assertEqual(
+                history_obj.instance.ae_description, 'a long description')
+
+    def test_columnar_export(self):
+        HistoryCompactor(model=AeInitial).compact()
+        output_dir = tempfile.mkdtemp()
+        try:
+            AeColumnarExporter(output_dir=output_dir, chunk_size=2).export()
+            rows = list(read_table(output_dir, 'ambition_ae.historicalaeinitial'))
+        finally:
+            shutil.rmtree(output_dir)
+        self.assertEqual(
+            set(row['ae_description'] for row in rows), {'a long description'})
@@ -0,0 +1,109 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.cache import caches
+from django.core.exceptions import PermissionDenied
+from django.http import Http404
+from django.test import TestCase
+from django.test.client import RequestFactory
+from edc_constants.constants import NO
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..admin import AeInitialAdmin
+from ..admin_site import ambition_ae_admin
+from ..constants import GRADE4, GRADE5
+from ..history_diff import get_history_diffs
+from ..models import AeInitial
+
+
+class TestHistoryDiff(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        caches['default'].clear()
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_grade=GRADE4,
+            ae_cm_recurrence=NO)
+        self.ae_initial.ae_grade = GRADE5
+        self.ae_initial.save()
+
+    def test_diffs(self):
+        queryset = AeInitial.history.filter(id=self.ae_initial.pk)
+        diffs = get_history_diffs(queryset, 0, queryset.count())
+        self.assertEqual(len(diffs), queryset.count())
+        self.assertEqual(diffs[-1].changes, [])
+        changes = {name: (old, new) for name, old, new in diffs[0].changes}
+        old, new = changes['Severity of AE']
+        self.assertTrue(old.startswith('Grade 4'))
+        self.assertTrue(new.startswith('Grade 5'))
+
+    def test_diffs_cached(self):
+        queryset = AeInitial.history.filter(id=self.ae_initial.pk)
+        changes = get_history_diffs(queryset, 0, 1)[0].changes
+        diff = get_history_diffs(queryset, 0, 1)[0]
+        with self.assertNumQueries(0):
+            self.assertEqual(diff.changes, changes)
+
+    def test_diffs_page(self):
+        for _ in range(0, 5):
+            self.ae_initial.save()
+        queryset = AeInitial.history.filter(id=self.ae_initial.pk)
+        diffs = get_history_diffs(queryset, 2, 4)
+        self.assertEqual(len(diffs), 2)
+        self.assertIsNotNone(diffs[-1].previous)
+
+    def test_history_view(self):
+        for _ in range(0, 30):
+            self.ae_initial.save()
+        request = RequestFactory().get('/', {'p': 2})
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        response = model_admin.history_view(request, str(self.ae_initial.pk))
+        self.assertEqual(response.context_data['page_obj'].number, 2)
+        self.assertEqual(
+            len(response.context_data['history_diffs']),
+            model_admin.history_list_per_page)
+
+    def test_history_view_other_site(self):
+        site = Site.objects.create(domain='other.example.com', name='other')
+        ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            site=site)
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        self.assertRaises(
+            Http404, model_admin.history_view, request, str(ae_initial.pk))
+
+    def test_history_view_deleted(self):
+        pk = self.ae_initial.pk
+        AeInitial.objects.filter(pk=pk).delete()
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        response = model_admin.history_view(request, str(pk))
+        self.assertTrue(response.context_data['history_diffs'])
+
+    def test_history_view_permission(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_user('user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        self.assertRaises(
+            PermissionDenied, model_admin.history_view, request, str(self.ae_initial.pk))
+        self.assertRaises(
+            PermissionDenied, model_admin.history_view, request, '999999')
@@ -0,0 +1,89 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..action_items import AE_INITIAL_ACTION
+from ..instrumentation import ACTION, SAVE, VIEW, QueryBudgetExceeded
+from ..instrumentation import instrumentation
+from ..middleware import QueryInstrumentationMiddleware
+from ..models import AeInitial
+from ..views.metrics_view import MetricsView
+
+
+@override_settings(AE_QUERY_BUDGETS={}, AE_QUERY_BUDGETS_STRICT=True)
+class TestInstrumentation(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        instrumentation.reset()
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+
+    def test_counts_queries_of_nested_blocks(self):
+        with instrumentation.instrument(VIEW, 'outer') as outer:
+            AeInitial.objects.count()
+            with instrumentation.instrument(SAVE, 'inner') as inner:
+                AeInitial.objects.count()
+        self.assertEqual(outer.queries, 2)
+        self.assertEqual(inner.queries, 1)
+        self.assertEqual(instrumentation.totals[(VIEW, 'outer')]['calls'], 1)
+        self.assertEqual(instrumentation.totals[(SAVE, 'inner')]['queries'], 1)
+        self.assertGreaterEqual(outer.elapsed_seconds, outer.db_seconds)
+
+    def test_save_and_next_actions(self):
+        mommy.make_recipe(
+            'ambition_ae.aeinitial', subject_identifier=self.subject_identifier)
+        save = instrumentation.totals[(SAVE, AeInitial._meta.label_lower)]
+        action = instrumentation.totals[(ACTION, AE_INITIAL_ACTION)]
+        self.assertEqual(save['calls'], 1)
+        self.assertGreater(save['queries'], 0)
+        self.assertGreaterEqual(action['calls'], 1)
+
+    def test_budget(self):
+        with self.assertRaises(QueryBudgetExceeded):
+            with instrumentation.instrument(VIEW, 'view', budget=1):
+                AeInitial.objects.count()
+                AeInitial.objects.count()
+        with override_settings(AE_QUERY_BUDGETS={'view': 2}):
+            with instrumentation.instrument(VIEW, 'view'):
+                AeInitial.objects.count()
+                AeInitial.objects.count()
+        self.assertEqual(instrumentation.totals[(VIEW, 'view')]['budget_exceeded'], 1)
+
+    def test_middleware(self):
+        def get_response(request):
+            AeInitial.objects.count()
+            return HttpResponse()
+        middleware = QueryInstrumentationMiddleware(get_response)
+        middleware(RequestFactory().get('/admin/ambition_ae/aeinitial/'))
+        self.assertEqual(
+            instrumentation.totals[
+                (VIEW, 'ambition_ae_admin:ambition_ae_aeinitial_changelist')]['queries'], 1)
+
+    def test_middleware_skips_other_views(self):
+        def get_response(request):
+            self.assertEqual(instrumentation.stack, [])
+            return HttpResponse()
+        middleware = QueryInstrumentationMiddleware(get_response)
+        middleware(RequestFactory().get('/metrics/'))
+        middleware(RequestFactory().get('/not-a-url/'))
+        self.assertEqual(list(instrumentation.totals), [])
+
+    def test_metrics_view(self):
+        with instrumentation.instrument(VIEW, 'view'):
+            AeInitial.objects.count()
+        request = RequestFactory().get('/metrics/')
+        with override_settings(AE_METRICS_ENABLED=True):
+            response = MetricsView.as_view()(request)
+        self.assertIn(
+            'ambition_ae_queries_total{kind="view",name="view"} 1',
+            response.content.decode())
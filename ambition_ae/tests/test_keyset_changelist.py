@@ -0,0 +1,90 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.core.cache import caches
+from django.db.models import Min
+from django.test import TestCase
+from unittest.mock import patch
+from edc_list_data.site_list_data import site_list_data
+
+from ..admin import AeInitialAdmin
+from ..admin import keyset_changelist
+from ..admin.keyset_changelist import AFTER_VAR, BEFORE_VAR, get_estimated_count
+from ..admin_site import ambition_ae_admin
+from ..date_rollup import date_rollup
+from ..models import AeInitial
+from .test_admin_queries import AdminQueriesTestMixin
+
+
+class TestKeysetChangeList(AdminQueriesTestMixin, AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        super().setUp()
+        caches['default'].clear()
+        self.make_ae_initials(25)
+        self.model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+
+    def get_changelist(self, **params):
+        request = self.factory.get('/', params)
+        request.user = self.user
+        return self.model_admin.get_changelist_instance(request)
+
+    def test_pages(self):
+        changelist = self.get_changelist()
+        self.assertTrue(changelist.keyset_pagination)
+        self.assertIsNone(changelist.previous_cursor)
+        pks = [obj.pk for obj in changelist.result_list]
+        while changelist.next_cursor:
+            changelist = self.get_changelist(**{AFTER_VAR: changelist.next_cursor})
+            pks.extend(obj.pk for obj in changelist.result_list)
+        self.assertEqual(changelist.keyset_fields, ('tracking_identifier', 'id'))
+        self.assertEqual(
+            pks, list(AeInitial.objects.order_by(
+                *self.model_admin.ordering, '-id').values_list('pk', flat=True)))
+
+    def test_default_keyset_ordering(self):
+        self.model_admin.ordering = ['-tracking_identifier', 'report_datetime']
+        changelist = self.get_changelist()
+        self.assertEqual(changelist.keyset_fields, ('modified', 'id'))
+        next_page = self.get_changelist(**{AFTER_VAR: changelist.next_cursor})
+        self.assertEqual(
+            [obj.pk for obj in changelist.result_list + next_page.result_list],
+            list(AeInitial.objects.order_by(
+                '-modified', '-id').values_list('pk', flat=True)[:20]))
+
+    def test_previous_page(self):
+        first = self.get_changelist()
+        second = self.get_changelist(**{AFTER_VAR: first.next_cursor})
+        previous = self.get_changelist(**{BEFORE_VAR: second.previous_cursor})
+        self.assertEqual(previous.result_list, list(first.result_list))
+
+    def test_sorted_by_column_uses_offset(self):
+        changelist = self.get_changelist(o='1')
+        self.assertFalse(changelist.keyset_pagination)
+
+    def test_estimated_count(self):
+        self.assertEqual(
+            get_estimated_count(AeInitial.objects.all(), 100), (25, True))
+        self.assertEqual(
+            get_estimated_count(AeInitial.objects.filter(sae='No'), 10), (10, False))
+
+    def test_estimated_count_filtered_queryset(self):
+        queryset = AeInitial.on_site.all()
+        self.assertTrue(queryset.query.where)
+        with patch.object(keyset_changelist, 'get_query_estimate', return_value=500):
+            self.assertEqual(get_estimated_count(queryset, 10), (500, False))
+        with patch.object(keyset_changelist, 'get_table_estimate', return_value=500):
+            self.assertEqual(get_estimated_count(queryset, 10), (10, False))
+
+    def test_date_rollup_cached(self):
+        queryset = AeInitial.objects.all()
+        first = date_rollup.aggregate(queryset, first=Min('modified'))
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                date_rollup.aggregate(queryset, first=Min('modified')), first)
+        self.make_ae_initials(1)
+        with self.assertNumQueries(1):
+            date_rollup.aggregate(queryset, first=Min('modified'))
@@ -0,0 +1,106 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.core import serializers
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from edc_constants.constants import NO
+from edc_device.constants import NODE_SERVER
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from edc_sync.models import OutgoingTransaction
+from edc_sync.transaction import TransactionDeserializer
+from model_mommy import mommy
+
+from ..models import AeFollowup, AeInitial
+from ..natural_keys import natural_key_prefetch, get_natural_keys
+
+
+class TestNaturalKeyPrefetch(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.ae_initial = mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier)
+        for _ in range(0, 3):
+            mommy.make_recipe(
+                'ambition_ae.aefollowup',
+                ae_initial=self.ae_initial,
+                subject_identifier=self.subject_identifier,
+                followup=NO)
+        self.natural_keys = [
+            obj.natural_key() for obj in AeFollowup.objects.all()]
+
+    def test_get_by_natural_keys(self):
+        with self.assertNumQueries(1):
+            objs = AeFollowup.objects.get_by_natural_keys(self.natural_keys)
+        self.assertEqual(set(objs), set(self.natural_keys))
+        for natural_key, obj in objs.items():
+            self.assertEqual(
+                obj, AeFollowup.objects.get_by_natural_key(*natural_key))
+
+    def test_get_by_natural_keys_ae_initial(self):
+        objs = AeInitial.objects.get_by_natural_keys(
+            [self.ae_initial.natural_key()])
+        self.assertEqual(objs, {self.ae_initial.natural_key(): self.ae_initial})
+
+    def test_prefetch(self):
+        with natural_key_prefetch.prefetch(
+                {'ambition_ae.aefollowup': self.natural_keys}):
+            with self.assertNumQueries(0):
+                for natural_key in self.natural_keys:
+                    AeFollowup.objects.get_by_natural_key(*natural_key)
+                AeInitial.objects.get_by_natural_key(
+                    *self.ae_initial.natural_key())
+        self.assertFalse(natural_key_prefetch.active)
+
+    def test_get_natural_keys_from_serialized(self):
+        json_text = serializers.serialize(
+            'json', AeFollowup.objects.all(),
+            use_natural_foreign_keys=True, use_natural_primary_keys=True)
+        with natural_key_prefetch.prefetch_serialized(json_text):
+            self.assertTrue(natural_key_prefetch.active)
+        natural_keys = get_natural_keys(
+            serializers.serialize(
+                'python', AeFollowup.objects.all(),
+                use_natural_foreign_keys=True))
+        self.assertEqual(len(natural_keys.get('ambition_ae.aefollowup')), 3)
+
+    def test_deserialize_transactions_prefetches(self):
+        transactions = OutgoingTransaction.objects.filter(
+            tx_name__in=['ambition_ae.aefollowup', 'ambition_ae.historicalaefollowup'])
+        self.assertGreaterEqual(transactions.count(), 3)
+        deserializer = TransactionDeserializer(
+            allow_self=True, override_role=NODE_SERVER)
+        with CaptureQueriesContext(connection) as context:
+            deserializer.deserialize_transactions(
+                transactions=transactions, deserialize_only=True)
+        ae_initial_queries = [
+            query for query in context.captured_queries
+            if 'FROM "ambition_ae_aeinitial"' in query['sql']]
+        self.assertEqual(len(ae_initial_queries), 1)
+
+    def test_deserialize_transactions_decrypts_once(self):
+        transactions = OutgoingTransaction.objects.filter(
+            tx_name__in=['ambition_ae.aefollowup', 'ambition_ae.historicalaefollowup'])
+        deserializer = TransactionDeserializer(
+            allow_self=True, override_role=NODE_SERVER)
+        aes_decrypt = deserializer.aes_decrypt
+        cipher_texts = []
+
+        def counting_aes_decrypt(cipher_text=None):
+            cipher_texts.append(cipher_text)
+            return aes_decrypt(cipher_text=cipher_text)
+
+        deserializer.aes_decrypt = counting_aes_decrypt
+        deserializer.deserialize_transactions(
+            transactions=transactions, deserialize_only=True)
+        self.assertEqual(len(cipher_texts), transactions.count())
+        self.assertEqual(deserializer.aes_decrypt, counting_aes_decrypt)
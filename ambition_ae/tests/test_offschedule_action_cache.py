@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TestCase, tag
+from edc_base.utils import get_utcnow
+from edc_visit_schedule.models import SubjectScheduleHistory
+
+from ..offschedule_action_cache import OffscheduleActionCache
+
+
+class TestOffscheduleActionCache(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.subject_identifier = '12345'
+        self.offschedule_action_cache = OffscheduleActionCache(cache=cache)
+
+    def test_hits_and_misses(self):
+        action_cache = self.offschedule_action_cache
+        self.assertIsNone(action_cache.get_action_cls(
+            subject_identifier=self.subject_identifier,
+            report_datetime=get_utcnow()))
+        self.assertEqual(action_cache.misses, 1)
+        self.assertEqual(action_cache.hits, 0)
+        self.assertIsNone(action_cache.get_action_cls(
+            subject_identifier=self.subject_identifier,
+            report_datetime=get_utcnow()))
+        self.assertEqual(action_cache.misses, 1)
+        self.assertEqual(action_cache.hits, 1)
+
+    def test_invalidate(self):
+        action_cache = self.offschedule_action_cache
+        action_cache.get_schedules(self.subject_identifier)
+        action_cache.invalidate(self.subject_identifier)
+        action_cache.get_schedules(self.subject_identifier)
+        self.assertEqual(action_cache.misses, 2)
+
+    def test_invalidated_on_subject_schedule_history_save(self):
+        action_cache = self.offschedule_action_cache
+        action_cache.get_schedules(self.subject_identifier)
+        key = action_cache.get_key(self.subject_identifier)
+        self.assertIsNotNone(cache.get(key))
+        SubjectScheduleHistory.objects.create(
+            subject_identifier=self.subject_identifier,
+            visit_schedule_name='visit_schedule',
+            schedule_name='schedule',
+            onschedule_model='ambition_prn.onschedule',
+            offschedule_model='ambition_prn.studyterminationconclusion',
+            onschedule_datetime=get_utcnow())
+        self.assertIsNone(cache.get(key))
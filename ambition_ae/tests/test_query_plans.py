@@ -0,0 +1,53 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.test import TestCase
+from edc_list_data.site_list_data import site_list_data
+
+from ..action_items import AE_TMG_ACTION, AeInitialAction
+from ..constants import GRADE4
+from ..models import AeInitial
+from ..query_plans import QueryPlanBenchmark, get_rule_queryset
+
+
+class TestQueryPlans(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        self.benchmark = QueryPlanBenchmark(repeat=1, seed=1)
+        self.counts = self.benchmark.seed(subjects=10)
+
+    def test_rule_queryset(self):
+        for rule in AeInitialAction.next_action_rules.rules:
+            expected = set(
+                obj.pk for obj in AeInitial.objects.all() if rule.matches(
+                    {field_name: getattr(obj, field_name)
+                     for field_name in rule.field_names}))
+            self.assertEqual(
+                set(get_rule_queryset(AeInitial.objects.all(), rule).values_list(
+                    'pk', flat=True)), expected)
+
+    def test_querysets(self):
+        querysets = self.benchmark.get_querysets()
+        self.assertEqual(
+            querysets['aeinitial changelist'].count(),
+            min(self.counts['ambition_ae.aeinitial'], 10))
+        self.assertIn('aefollowup changelist', querysets)
+        self.assertEqual(
+            querysets['aetmg changelist'].exists(), bool(self.counts['ambition_ae.aetmg']))
+        rule_index = [
+            index for index, rule in enumerate(AeInitialAction.next_action_rules.rules)
+            if rule.when == {'ae_grade': {GRADE4}}][0]
+        name = f'aeinitial changelist, rule {rule_index}: {AE_TMG_ACTION}'
+        for obj in querysets[name]:
+            self.assertEqual(obj.ae_grade, GRADE4)
+
+    def test_run_queries(self):
+        results = self.benchmark.run_queries()
+        self.assertEqual(
+            [name for name, _, _ in results], list(self.benchmark.get_querysets()))
+        for _, plan, elapsed in results:
+            self.assertTrue(plan)
+            self.assertGreaterEqual(elapsed, 0)
@@ -0,0 +1,118 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.contrib.auth.models import User
+from django.contrib.sites.models import Site
+from django.core.cache import caches
+from django.test import TestCase
+from django.test.client import RequestFactory
+from edc_constants.constants import NO
+from edc_list_data.site_list_data import site_list_data
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+
+from ..admin import AeInitialAdmin
+from ..admin_site import ambition_ae_admin
+from ..models import AeInitial, AeSearchToken
+from ..search_index import search_index, tokenize
+
+
+class TestSearchIndex(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def setUp(self):
+        caches['default'].clear()
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+        self.anaemia = self.make_ae_initial(
+            'Severe anaemia, anaemia worsening', 'Blood transfusion')
+        self.rash = self.make_ae_initial(
+            'Rash on the arms', 'Antihistamine and blood tests')
+
+    def make_ae_initial(self, ae_description=None, ae_treatment=None):
+        return mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_description=ae_description,
+            ae_treatment=ae_treatment,
+            ae_cm_recurrence=NO)
+
+    def test_tokenize(self):
+        self.assertEqual(tokenize('The rash, on the ARMS!'), ['rash', 'arms'])
+
+    def test_search(self):
+        self.assertEqual(
+            [pk for pk, _ in search_index.search(AeInitial, 'anaemia')],
+            [str(self.anaemia.pk)])
+        self.assertEqual(search_index.search(AeInitial, 'fever'), [])
+
+    def test_search_all_tokens(self):
+        self.assertEqual(
+            [pk for pk, _ in search_index.search(AeInitial, 'blood rash')],
+            [str(self.rash.pk)])
+
+    def test_ranked(self):
+        other = self.make_ae_initial('anaemia', 'iron')
+        self.assertEqual(
+            [pk for pk, _ in search_index.search(AeInitial, 'anaemia')],
+            [str(self.anaemia.pk), str(other.pk)])
+
+    def test_reindexed_on_save_and_delete(self):
+        self.rash.ae_description = 'Fever'
+        self.rash.save()
+        self.assertEqual(
+            [pk for pk, _ in search_index.search(AeInitial, 'fever')],
+            [str(self.rash.pk)])
+        self.assertEqual(search_index.search(AeInitial, 'arms'), [])
+
+    def test_not_reindexed_if_unchanged(self):
+        pks = set(AeSearchToken.objects.values_list('pk', flat=True))
+        rash = AeInitial.objects.get(pk=self.rash.pk)
+        rash.save()
+        self.assertEqual(set(AeSearchToken.objects.values_list('pk', flat=True)), pks)
+        rash.ae_treatment = 'Calamine'
+        rash.save()
+        self.assertEqual(
+            [pk for pk, _ in search_index.search(AeInitial, 'calamine')],
+            [str(self.rash.pk)])
+
+    def test_document_count_cached(self):
+        search_index.search(AeInitial, 'anaemia')
+        with self.assertNumQueries(2):
+            search_index.search(AeInitial, 'anaemia')
+
+    def test_document_count_all_sites(self):
+        mommy.make_recipe(
+            'ambition_ae.aeinitial',
+            subject_identifier=self.subject_identifier,
+            ae_cm_recurrence=NO,
+            site=Site.objects.create(domain='other.example.com', name='other'))
+        self.assertEqual(search_index.get_document_count(AeInitial), 3)
+
+    def test_rebuild(self):
+        count = AeSearchToken.objects.count()
+        AeSearchToken.objects.all().delete()
+        search_index.rebuild([AeInitial])
+        self.assertEqual(AeSearchToken.objects.count(), count)
+
+    def test_admin_search(self):
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        queryset, _ = model_admin.get_search_results(
+            request, AeInitial.objects.all(), 'transfusion')
+        self.assertEqual(list(queryset), [self.anaemia])
+
+    def test_admin_search_ordered_by_rank(self):
+        other = self.make_ae_initial('anaemia', 'iron')
+        request = RequestFactory().get('/')
+        request.user = User.objects.create_superuser(
+            'user_login', 'u@example.com', 'pass')
+        model_admin = AeInitialAdmin(AeInitial, ambition_ae_admin)
+        queryset, _ = model_admin.get_search_results(
+            request, AeInitial.objects.order_by('-modified'), 'anaemia')
+        self.assertEqual(list(queryset)[:2], [self.anaemia, other])
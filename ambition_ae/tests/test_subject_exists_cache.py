@@ -0,0 +1,72 @@
+from django.test import TestCase, tag
+from edc_registration.models import RegisteredSubject
+
+from ..subject_exists_cache import SubjectExistsCache
+
+
+class TestSubjectExistsCache(TestCase):
+
+    def setUp(self):
+        self.subject_identifier = '12345'
+        RegisteredSubject.objects.create(
+            subject_identifier=self.subject_identifier)
+
+    def test_exists(self):
+        subject_exists_cache = SubjectExistsCache()
+        self.assertTrue(subject_exists_cache.exists(self.subject_identifier))
+        self.assertFalse(subject_exists_cache.exists('blahblah'))
+
+    def test_not_memoized_outside_request(self):
+        subject_exists_cache = SubjectExistsCache()
+        with self.assertNumQueries(2):
+            subject_exists_cache.exists(self.subject_identifier)
+            subject_exists_cache.exists(self.subject_identifier)
+
+    def test_memoized(self):
+        subject_exists_cache = SubjectExistsCache()
+        with subject_exists_cache.memoized():
+            with self.assertNumQueries(1):
+                subject_exists_cache.exists(self.subject_identifier)
+                subject_exists_cache.exists(self.subject_identifier)
+        self.assertIsNone(subject_exists_cache.memo)
+
+    def test_lru(self):
+        subject_exists_cache = SubjectExistsCache(timeout=60)
+        with self.assertNumQueries(1):
+            subject_exists_cache.exists(self.subject_identifier)
+            subject_exists_cache.exists(self.subject_identifier)
+
+    def test_lru_maxsize(self):
+        RegisteredSubject.objects.create(subject_identifier='54321')
+        subject_exists_cache = SubjectExistsCache(timeout=60, maxsize=1)
+        subject_exists_cache.exists(self.subject_identifier)
+        subject_exists_cache.exists('54321')
+        self.assertIsNone(subject_exists_cache.get(self.subject_identifier))
+        self.assertTrue(subject_exists_cache.get('54321'))
+
+    def test_lru_does_not_keep_missing(self):
+        subject_exists_cache = SubjectExistsCache(timeout=60)
+        self.assertFalse(subject_exists_cache.exists('54321'))
+        self.assertIsNone(subject_exists_cache.get('54321'))
+        RegisteredSubject.objects.create(subject_identifier='54321')
+        self.assertTrue(subject_exists_cache.exists('54321'))
+
+    def test_get_missing(self):
+        subject_exists_cache = SubjectExistsCache(timeout=60)
+        with self.assertNumQueries(1):
+            missing = subject_exists_cache.get_missing(
+                [self.subject_identifier, 'blahblah'])
+            self.assertEqual(missing, {'blahblah'})
+        with self.assertNumQueries(1):
+            missing = subject_exists_cache.get_missing(
+                [self.subject_identifier, 'blahblah'])
+            self.assertEqual(missing, {'blahblah'})
+        with self.assertNumQueries(0):
+            missing = subject_exists_cache.get_missing([self.subject_identifier])
+            self.assertEqual(missing, set())
+
+    def test_invalidate(self):
+        subject_exists_cache = SubjectExistsCache(timeout=60)
+        subject_exists_cache.exists(self.subject_identifier)
+        subject_exists_cache.invalidate(self.subject_identifier)
+        self.assertIsNone(subject_exists_cache.get(self.subject_identifier))
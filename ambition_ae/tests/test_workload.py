@@ -0,0 +1,51 @@
+from ambition_rando.tests import AmbitionTestCaseMixin
+from django.test import TestCase
+from edc_constants.constants import NO, YES
+from edc_list_data.site_list_data import site_list_data
+
+from ..constants import GRADE4, GRADE5
+from ..models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+from ..workload import AeWorkloadGenerator, WorkloadError, parse_weights
+
+
+class TestWorkload(AmbitionTestCaseMixin, TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        site_list_data.autodiscover()
+        super().setUpClass()
+
+    def test_parse_weights(self):
+        self.assertEqual(parse_weights('3:60, 4:40'), {'3': 60.0, '4': 40.0})
+        self.assertRaises(WorkloadError, parse_weights, '3-60')
+        self.assertRaises(WorkloadError, parse_weights, '2:60')
+
+    def test_reproducible(self):
+        cases = []
+        for _ in range(0, 2):
+            generator = AeWorkloadGenerator(seed=5)
+            cases.append([
+                (case['ae_initial']['ae_grade'], case['ae_initial']['sae'],
+                 len(case['ae_followups']), len(case['ae_tmgs']))
+                for case in generator.get_cases('WL0000001')])
+        self.assertEqual(cases[0], cases[1])
+
+    def test_generate_follows_action_rules(self):
+        generator = AeWorkloadGenerator(
+            subjects=20, seed=1, recurrence_rate=0.5, chunk_size=7, actions=False)
+        counts = generator.generate()
+        self.assertEqual(counts['ambition_ae.aeinitial'], AeInitial.objects.count())
+        self.assertEqual(counts['ambition_ae.aefollowup'], AeFollowup.objects.count())
+        for obj in AeInitial.objects.filter(ae_grade__in=[GRADE4, GRADE5]):
+            self.assertTrue(AeTmg.objects.filter(ae_initial=obj).exists())
+        for obj in AeInitial.objects.filter(ae_grade=GRADE5):
+            self.assertFalse(AeFollowup.objects.filter(ae_initial=obj).exists())
+        for obj in AeInitial.objects.exclude(ae_grade=GRADE5):
+            followups = list(AeFollowup.objects.filter(
+                ae_initial=obj).order_by('report_datetime'))
+            self.assertTrue(followups)
+            self.assertTrue(all(f.followup == YES for f in followups[:-1]))
+        self.assertEqual(
+            RecurrenceSymptom.objects.count(),
+            AeInitial.objects.filter(ae_cm_recurrence=YES).count())
+        self.assertTrue(AeInitial.objects.filter(ae_cm_recurrence=NO).exists())
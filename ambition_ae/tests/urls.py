@@ -0,0 +1,16 @@
+from django.urls.conf import include, path
+from django.views.generic.base import View
+
+from ..admin_site import ambition_ae_admin
+
+# stands in for the subject dashboard of ambition-dashboard so the
+# `dashboard` column of the changelists can be reversed
+dashboard_urlpatterns = ([
+    path('subject/<str:subject_identifier>/', View.as_view(),
+         name='subject_dashboard_url'),
+], 'ambition_dashboard')
+
+urlpatterns = [
+    path('admin/', ambition_ae_admin.urls),
+    path('dashboard/', include(dashboard_urlpatterns)),
+]
@@ -3,11 +3,13 @@ from django.urls.conf import path
 from django.views.generic.base import RedirectView
 
 from .admin_site import ambition_ae_admin
+from .views.metrics_view import MetricsView
 
 app_name = 'ambition_ae'
 
 urlpatterns = [
     path('admin/', ambition_ae_admin.urls),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
     path('', RedirectView.as_view(url='admin/'), name='home_url'),
 ]
 
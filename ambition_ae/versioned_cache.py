@@ -0,0 +1,35 @@
+from django.core.cache import cache as default_cache
+
+
+class VersionedCache:
+
+    """A base class for caches of query results of the AE models
+    whose keys include a version of the model.
+
+    `invalidate` bumps the version of a model, so entries cached
+    before the last change are no longer read and expire with the
+    timeout. It is called by the save/delete side effects of the AE
+    models, see `side_effects.py`.
+    """
+
+    key_prefix = None
+    timeout = 300
+
+    def __init__(self, cache=None):
+        self.cache = cache or default_cache
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    def get_version_key(self, model=None):
+        return f'{self.key_prefix}.{model._meta.label_lower}.version'
+
+    def get_version(self, model=None):
+        return self.cache.get_or_set(self.get_version_key(model), 1, None)
+
+    def invalidate(self, model=None):
+        key = self.get_version_key(model)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
@@ -0,0 +1,19 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.generic.base import View
+
+from ..instrumentation import instrumentation
+
+
+class MetricsView(View):
+
+    """Returns the instrumentation totals in the Prometheus text
+    format if settings.AE_METRICS_ENABLED.
+    """
+
+    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+
+    def get(self, request, *args, **kwargs):
+        if not getattr(settings, 'AE_METRICS_ENABLED', False):
+            raise Http404()
+        return HttpResponse(instrumentation.render(), content_type=self.content_type)
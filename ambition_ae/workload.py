@@ -0,0 +1,316 @@
+import random
+
+from datetime import datetime, timedelta
+from django.db.models.fields.related import ManyToManyField
+from django.utils.timezone import utc
+from edc_action_item.model_mixins import ActionItemModelMixin
+from edc_base.model_mixins import BaseUuidModel
+from edc_base.sites.site_model_mixin import SiteModelMixin
+from edc_constants.constants import CLOSED, DEAD, LOST_TO_FOLLOWUP, NO, NOT_APPLICABLE, YES
+from edc_identifier.model_mixins import TrackingIdentifierModelMixin
+from edc_registration.models import RegisteredSubject
+from model_mommy import mommy
+from types import SimpleNamespace
+
+from .action_items import AE_FOLLOWUP_ACTION, AE_TMG_ACTION
+from .action_items import AeFollowupAction, AeInitialAction
+from .action_items import RECURRENCE_OF_SYMPTOMS_ACTION
+from .bulk_import import AeBulkImporter
+from .choices import AE_CLASSIFICATION, SAE_REASONS
+from .constants import GRADE3, GRADE4, GRADE5
+from .mommy_recipes import aefollowup, aeinitial, fake
+from .models import AeInitial, AeFollowup, AeTmg, RecurrenceSymptom
+
+
+class WorkloadError(Exception):
+    pass
+
+
+def parse_weights(value=None):
+    """Returns a dictionary of {grade: weight} from a string
+    like "3:60,4:30,5:10".
+    """
+    weights = {}
+    try:
+        for item in value.split(','):
+            grade, weight = item.split(':')
+            weights[grade.strip()] = float(weight)
+    except ValueError:
+        raise WorkloadError(
+            f'Invalid weights. Expected "grade:weight,...". Got {value}.')
+    unknown = set(weights) - {GRADE3, GRADE4, GRADE5}
+    if unknown:
+        raise WorkloadError(f'Invalid grade. Got {sorted(unknown)}.')
+    return weights
+
+
+class AeWorkloadGenerator:
+
+    """Generates a synthetic AE dataset: subjects, each with AE
+    initial reports, their follow-up chains, TMG and recurrence of
+    symptoms reports.
+
+    The reports of each AE follow the next-action rules of
+    `AeInitialAction` and `AeFollowupAction`, for example a TMG report
+    is added for a Grade 4 AE and the follow-up chain ends when a
+    follow-up is not required. Death and off-study reports belong to
+    other apps and are not generated.
+
+    Records start from the attributes of the recipes in
+    `mommy_recipes.py` and are written with `AeBulkImporter`. The
+    dataset is the same for the same `seed` and options except for
+    the tracking identifiers.
+
+        generator = AeWorkloadGenerator(subjects=1000, seed=1)
+        generator.generate()
+    """
+
+    chunk_size = 500
+    default_grade_weights = {GRADE3: 60, GRADE4: 30, GRADE5: 10}
+    closed_outcomes = ['recovered', 'recovering', 'not_recovered',
+                       'recovered_with_sequelae', LOST_TO_FOLLOWUP]
+
+    def __init__(self, subjects=None, seed=None, subject_prefix=None,
+                 max_aes=None, max_followups=None, grade_weights=None,
+                 sae_rate=None, death_rate=None, recurrence_rate=None,
+                 grade_increase_rate=None, start_date=None, days=None,
+                 chunk_size=None, actions=None):
+        self.subjects = subjects or 10
+        self.seed = 0 if seed is None else seed
+        self.subject_prefix = subject_prefix or 'WL'
+        self.max_aes = max_aes or 2
+        self.max_followups = max_followups or 4
+        self.grade_weights = grade_weights or self.default_grade_weights
+        self.sae_rate = 0.3 if sae_rate is None else sae_rate
+        self.death_rate = 0.05 if death_rate is None else death_rate
+        self.recurrence_rate = 0.1 if recurrence_rate is None else recurrence_rate
+        self.grade_increase_rate = (
+            0.1 if grade_increase_rate is None else grade_increase_rate)
+        self.start_datetime = datetime.combine(
+            start_date or datetime(2018, 1, 1).date(),
+            datetime.min.time()).replace(tzinfo=utc)
+        self.days = days or 365
+        self.chunk_size = chunk_size or self.chunk_size
+        self.actions = True if actions is None else actions
+        self.rng = random.Random(self.seed)
+        self.importer = AeBulkImporter(chunk_size=self.chunk_size)
+        self.counts = {
+            model._meta.label_lower: 0
+            for model in [AeInitial, AeFollowup, AeTmg, RecurrenceSymptom]}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(subjects={self.subjects}, seed={self.seed})'
+
+    def generate(self):
+        """Generates the dataset in chunks of subjects and returns a
+        dictionary of the number of rows inserted by model.
+        """
+        # model_mommy and the faker instance of the recipes use their
+        # own random generators
+        random.seed(self.seed)
+        fake.seed_instance(self.seed)
+        subject_identifiers = [
+            f'{self.subject_prefix}{n:07d}' for n in range(1, self.subjects + 1)]
+        for index in range(0, len(subject_identifiers), self.chunk_size):
+            self.generate_subjects(
+                subject_identifiers[index:index + self.chunk_size])
+        return self.counts
+
+    def generate_subjects(self, subject_identifiers=None):
+        self.register_subjects(subject_identifiers)
+        cases = [
+            case for subject_identifier in subject_identifiers
+            for case in self.get_cases(subject_identifier)]
+        self.import_records(AeInitial, [case['ae_initial'] for case in cases])
+        tracking_identifiers = self.importer.imported[
+            AeInitial._meta.label_lower][-len(cases):]
+        tmgs, followups = [], []
+        for case, tracking_identifier in zip(cases, tracking_identifiers):
+            for record in case['ae_tmgs']:
+                tmgs.append(dict(record, ae_initial=tracking_identifier))
+            for record in case['ae_followups']:
+                followups.append(dict(record, ae_initial=tracking_identifier))
+        self.import_records(AeTmg, tmgs)
+        self.import_records(AeFollowup, followups)
+        recurrence_symptoms = [
+            self.get_recurrence_symptom(case['recurrence_symptom'])
+            for case in cases if case['recurrence_symptom']]
+        if recurrence_symptoms:
+            self.import_records(RecurrenceSymptom, recurrence_symptoms)
+            self.add_m2m(self.importer.imported[
+                RecurrenceSymptom._meta.label_lower][-len(recurrence_symptoms):])
+        if self.actions:
+            self.importer.reconcile()
+        else:
+            for tracking_identifiers in self.importer.imported.values():
+                tracking_identifiers.clear()
+
+    def import_records(self, model=None, records=None):
+        if records:
+            self.counts[model._meta.label_lower] += self.importer.import_records(
+                model, records)
+
+    def register_subjects(self, subject_identifiers=None):
+        existing = set(RegisteredSubject.objects.filter(
+            subject_identifier__in=subject_identifiers).values_list(
+                'subject_identifier', flat=True))
+        RegisteredSubject.objects.bulk_create([
+            RegisteredSubject(subject_identifier=subject_identifier)
+            for subject_identifier in subject_identifiers
+            if subject_identifier not in existing])
+
+    def get_grade(self):
+        grades = sorted(self.grade_weights)
+        return self.rng.choices(
+            grades, weights=[self.grade_weights[grade] for grade in grades])[0]
+
+    def get_cases(self, subject_identifier=None):
+        """Returns a list of AE cases for a subject, each a
+        dictionary of the records of the AE in report order.
+
+        No further AEs are reported for a subject once an AE ends
+        in death.
+        """
+        cases = []
+        report_datetime = self.start_datetime + timedelta(
+            minutes=self.rng.randrange(self.days * 24 * 60))
+        for _ in range(0, self.rng.randint(1, self.max_aes)):
+            case = self.get_case(subject_identifier, report_datetime)
+            cases.append(case)
+            if case['dead']:
+                break
+            report_datetime = case['last_report_datetime'] + timedelta(
+                days=self.rng.randint(7, 60))
+        return cases
+
+    def get_case(self, subject_identifier=None, report_datetime=None):
+        ae_grade = self.get_grade()
+        sae = YES if ae_grade == GRADE5 or self.rng.random() < self.sae_rate else NO
+        if sae == NO:
+            sae_reason = NOT_APPLICABLE
+        elif ae_grade == GRADE5 or self.rng.random() < self.death_rate:
+            sae_reason = DEAD
+        else:
+            sae_reason = self.rng.choice([
+                value for value, _ in SAE_REASONS
+                if value not in [NOT_APPLICABLE, DEAD]])
+        ae_initial = dict(
+            aeinitial.attr_mapping,
+            subject_identifier=subject_identifier,
+            report_datetime=report_datetime,
+            ae_awareness_date=report_datetime.date(),
+            ae_classification=self.rng.choice(AE_CLASSIFICATION)[0],
+            ae_description=fake.sentence(nb_words=12),
+            ae_treatment=fake.sentence(nb_words=8),
+            ae_grade=ae_grade,
+            sae=sae,
+            sae_reason=sae_reason,
+            ae_cm_recurrence=YES if self.rng.random() < self.recurrence_rate else NO)
+        action_names = AeInitialAction.next_action_rules.get_action_names(
+            SimpleNamespace(**ae_initial))
+        ae_tmgs = []
+        if AE_TMG_ACTION in action_names:
+            ae_tmgs.append(self.get_ae_tmg(ae_initial, report_datetime))
+        ae_followups = []
+        if AE_FOLLOWUP_ACTION in action_names:
+            ae_followups = self.get_ae_followups(ae_initial, ae_tmgs)
+        reports = [ae_initial] + ae_tmgs + ae_followups
+        return dict(
+            ae_initial=ae_initial,
+            ae_tmgs=ae_tmgs,
+            ae_followups=ae_followups,
+            recurrence_symptom=(
+                ae_initial if RECURRENCE_OF_SYMPTOMS_ACTION in action_names else None),
+            dead=(ae_grade == GRADE5 or sae_reason == DEAD
+                  or any(r['outcome'] == DEAD for r in ae_followups)),
+            last_report_datetime=max(r['report_datetime'] for r in reports))
+
+    def get_ae_followups(self, ae_initial=None, ae_tmgs=None):
+        """Returns a list of follow-up records, appending the TMG
+        records the follow-ups trigger to `ae_tmgs`.
+        """
+        ae_followups = []
+        report_datetime = ae_initial['report_datetime']
+        current_grade = ae_initial['ae_grade']
+        for index in range(0, self.max_followups):
+            report_datetime += timedelta(days=self.rng.randint(3, 14))
+            last = (index == self.max_followups - 1 or self.rng.random() < 0.4)
+            if self.rng.random() < self.death_rate:
+                ae_grade, outcome = GRADE5, DEAD
+            elif current_grade == GRADE3 and self.rng.random() < self.grade_increase_rate:
+                ae_grade, outcome = GRADE4, 'continuing/update'
+            else:
+                ae_grade = NOT_APPLICABLE
+                outcome = (self.rng.choice(self.closed_outcomes) if last
+                           else 'continuing/update')
+            current_grade = ae_grade if ae_grade != NOT_APPLICABLE else current_grade
+            record = dict(
+                aefollowup.attr_mapping,
+                report_datetime=report_datetime,
+                outcome=outcome,
+                outcome_date=report_datetime.date(),
+                ae_grade=ae_grade,
+                relevant_history=fake.sentence(nb_words=12),
+                followup=NO if last or outcome == DEAD else YES)
+            ae_followups.append(record)
+            action_names = AeFollowupAction.next_action_rules.get_action_names(
+                SimpleNamespace(**record))
+            if AE_TMG_ACTION in action_names:
+                ae_tmgs.append(self.get_ae_tmg(ae_initial, report_datetime))
+            if AE_FOLLOWUP_ACTION not in action_names:
+                break
+        return ae_followups
+
+    def get_ae_tmg(self, ae_initial=None, report_datetime=None):
+        report_datetime = report_datetime + timedelta(hours=self.rng.randint(4, 72))
+        return dict(
+            report_datetime=report_datetime,
+            ae_received_datetime=report_datetime,
+            clinical_review_datetime=report_datetime,
+            ae_classification=ae_initial['ae_classification'],
+            ae_description=ae_initial['ae_description'],
+            investigator_comments=fake.sentence(nb_words=10),
+            report_status=CLOSED)
+
+    def get_recurrence_symptom(self, ae_initial=None):
+        """Returns a record for a RecurrenceSymptom prepared, not
+        saved, from its recipe, without the fields of the base model
+        mixins which are set by `AeBulkImporter` and `reconcile()`.
+        """
+        exclude = [
+            field.attname for mixin in [
+                ActionItemModelMixin, TrackingIdentifierModelMixin,
+                SiteModelMixin, BaseUuidModel]
+            for field in mixin._meta.fields]
+        obj = mommy.prepare_recipe(
+            'ambition_ae.recurrencesymptom',
+            subject_identifier=ae_initial['subject_identifier'],
+            report_datetime=ae_initial['report_datetime'] + timedelta(
+                days=self.rng.randint(1, 14)),
+            narrative_summary=fake.sentence(nb_words=15))
+        return {
+            field.attname: getattr(obj, field.attname)
+            for field in RecurrenceSymptom._meta.concrete_fields
+            if field.attname not in exclude}
+
+    def add_m2m(self, tracking_identifiers=None):
+        """Adds one to three list model rows to each m2m field of the
+        RecurrenceSymptom instances with one bulk insert per field.
+        """
+        pks = list(RecurrenceSymptom.objects.filter(
+            tracking_identifier__in=tracking_identifiers).order_by(
+                'report_datetime', 'subject_identifier').values_list('pk', flat=True))
+        for field in RecurrenceSymptom._meta.get_fields():
+            if not isinstance(field, ManyToManyField):
+                continue
+            list_pks = list(field.related_model.objects.order_by(
+                'name').values_list('pk', flat=True))
+            if not list_pks:
+                continue
+            through = field.remote_field.through
+            source, target = field.m2m_field_name(), field.m2m_reverse_field_name()
+            through.objects.bulk_create([
+                through(**{f'{source}_id': pk, f'{target}_id': list_pk})
+                for pk in pks
+                for list_pk in self.rng.sample(
+                    list_pks, min(len(list_pks), self.rng.randint(1, 3)))])